@@ -0,0 +1,51 @@
+# benchmarks/bench_bcrypt_import.py
+"""Hachage bcrypt d'un import d'utilisateurs: série, threads, processus
+
+bcrypt libère le GIL: le pool de threads doit passer à l'échelle avec les
+cœurs comme le pool de processus, sans le coût de démarrage (spawn) ni la
+sérialisation. Sur une machine à un cœur, les trois se valent.
+
+    python benchmarks/bench_bcrypt_import.py --users 64 --rounds 10 --workers 4
+"""
+import argparse
+import os
+import time
+
+from common import print_table
+import csv_processor
+from worker_pool import LazyPool
+
+
+def run(label, passwords, rounds, pool=None):
+    start = time.perf_counter()
+    if pool is None:
+        [csv_processor._hash_password(password, rounds) for password in passwords]
+    else:
+        with pool.executor() as executor:
+            list(executor.map(csv_processor._hash_password, passwords, [rounds] * len(passwords)))
+    elapsed = time.perf_counter() - start
+    return [label, len(passwords), elapsed, len(passwords) / elapsed]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=64)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    passwords = [f"motdepasse{i}" for i in range(args.users)]
+    threads = LazyPool(args.workers, processes=False, name='bench-threads')
+    processes = LazyPool(args.workers, processes=True, name='bench-processes')
+    rows = [
+        run('série', passwords, args.rounds),
+        run(f'threads x{args.workers}', passwords, args.rounds, threads),
+        # Premier lot: inclut le démarrage des processus (spawn)
+        run(f'processus x{args.workers} (froid)', passwords, args.rounds, processes),
+        run(f'processus x{args.workers}', passwords, args.rounds, processes),
+    ]
+    print(f"{os.cpu_count()} cœur(s), coût bcrypt {args.rounds}")
+    print_table(['exécution', 'mots de passe', 'durée (s)', 'hachages/s'], rows)
+
+
+if __name__ == '__main__':
+    main()
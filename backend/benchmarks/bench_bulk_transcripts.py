@@ -0,0 +1,72 @@
+# benchmarks/bench_bulk_transcripts.py
+"""Bulletins d'une classe: un appel par élève contre le rendu groupé
+
+generate_class_transcripts tourne sur une base factice (une requête) avec
+1 à `--workers` processus de rendu, en ZIP puis en PDF unique; la ligne de
+référence rend les bulletins un par un comme l'ancien parcours (une
+connexion et deux requêtes par élève). Le gain du pool suit le nombre de cœurs.
+
+    python benchmarks/bench_bulk_transcripts.py --students 30 --workers 1 2 4
+"""
+import argparse
+import os
+import time
+from unittest import mock
+
+from common import LatencyConnection, LatencyCursor, fake_transcripts, print_table, school_logo
+import pdf_generator
+from config import BULK_REPORT_CONFIG
+from worker_pool import LazyPool
+
+
+def per_student(records, latency):
+    """Référence: une connexion et deux requêtes par élève, rendu en série"""
+    students = {}
+    for record in records:
+        students.setdefault(record['student_id'], []).append(record)
+    for rows in students.values():
+        time.sleep(latency * 3)
+        student = {key: rows[0][key] for key in ('nom', 'prenom', 'class_name')}
+        pdf_generator._render_transcript(student, rows, 'admin')
+
+
+def grouped(records, latency, output):
+    conn = LatencyConnection(LatencyCursor(lambda sql, params: records, latency))
+    with mock.patch.object(pdf_generator, 'get_read_connection', return_value=conn):
+        return pdf_generator.generate_class_transcripts(1, 'admin', output=output)
+
+
+def measure(label, fn, students):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    return [label, students, elapsed, students / elapsed]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=30)
+    parser.add_argument('--grades', type=int, default=8)
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument('--latency', type=float, default=0.0005)
+    args = parser.parse_args()
+    school_logo()
+    records = fake_transcripts(args.students, args.grades)
+    # Styles et logo préparés hors mesure, comme dans un serveur déjà chaud
+    per_student(records[:1], 0)
+
+    rows = [measure('un bulletin par appel', lambda: per_student(records, args.latency), args.students),
+            measure('PDF unique', lambda: grouped(records, args.latency, 'pdf'), args.students)]
+    for workers in args.workers:
+        BULK_REPORT_CONFIG['workers'] = workers
+        pdf_generator._bulk_pool = LazyPool(workers, name='bench-bulk')
+        # Premier appel: démarrage des processus, non compté
+        grouped(records[:args.grades], args.latency, 'zip')
+        rows.append(measure(f'ZIP, {workers} processus', lambda: grouped(records, args.latency, 'zip'),
+                            args.students))
+    print(f"{os.cpu_count()} cœur(s)")
+    print_table(['rendu', 'bulletins', 'durée (s)', 'bulletins/s'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# benchmarks/bench_compression.py
+"""Compression des réponses JSON: taille et coût CPU par encodage
+
+Pour des listes JSON de tailles typiques (/api/users, /api/grades), compare
+l'identité aux encodages disponibles (gzip; br et zstd si brotli /
+zstandard sont installés) aux niveaux de COMPRESSION_CONFIG. Le temps de
+transfert est estimé pour un lien de `--mbps` Mbit/s.
+
+    python benchmarks/bench_compression.py --rows 100 1000 10000 --mbps 20
+"""
+import argparse
+import datetime
+
+from common import print_table, timed
+from compression import _AVAILABLE, compress
+from json_stream import dumps
+
+
+def payload(rows):
+    return dumps([
+        {'id': i, 'subject': f"Matière {i % 12}", 'grade': 8 + i % 12, 'evaluation_date': datetime.date(2026, 3, 1 + i % 28),
+         'teacher': f"Alex Prof{i % 30}", 'class_name': f"3{'ABCD'[i % 4]}", 'status': 'Actif'}
+        for i in range(rows)
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--mbps', type=float, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    print(f"Encodages disponibles: {', '.join(_AVAILABLE)}")
+    table = []
+    for rows in args.rows:
+        body = payload(rows)
+        wire = lambda size: size * 8 / (args.mbps * 1e6) * 1000
+        table.append([rows, 'identité', len(body) / 1024, 1.0, 0.0, wire(len(body))])
+        for encoding in _AVAILABLE:
+            compressed = compress(body, encoding)
+            cpu = timed(lambda: compress(body, encoding), args.repeat) * 1000
+            table.append([rows, encoding, len(compressed) / 1024, len(body) / len(compressed), cpu,
+                          cpu + wire(len(compressed))])
+    print_table(['lignes', 'encodage', 'Ko', 'ratio', 'CPU (ms)', f"CPU + envoi à {args.mbps:g} Mbit/s (ms)"],
+                table)
+
+
+if __name__ == '__main__':
+    main()
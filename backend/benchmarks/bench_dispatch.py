@@ -0,0 +1,124 @@
+# benchmarks/bench_dispatch.py
+"""Routage: table compilée contre chaîne de conditions, et connexions par 404
+
+1. Router.match sur la table de server.py, comparé à une chaîne de
+   conditions testées dans l'ordre (l'ancien do_GET/do_POST), pour la
+   première route, la dernière et un chemin inconnu.
+2. Requêtes authentifiées vers un chemin inconnu et vers une route d'un
+   autre rôle passées au dispatcher: connexions MySQL empruntées (l'ancien
+   code en prenait une avant de chercher la route).
+
+    python benchmarks/bench_dispatch.py
+"""
+import argparse
+import io
+import re
+import timeit
+import warnings
+from datetime import datetime, timedelta
+from email.message import Message
+from unittest import mock
+
+import jwt
+
+from common import print_table
+import server
+
+
+def registered_routes():
+    routes = [route for route in server.ROUTES._exact.values()]
+    stack = [server.ROUTES._root]
+    while stack:
+        node = stack.pop()
+        routes.extend(node.routes.values())
+        stack.extend(node.children.values())
+        if node.param:
+            stack.append(node.param[1])
+    return routes
+
+
+def if_chain(routes):
+    """Équivalent d'une suite de `if path == ...` / regex, testée dans l'ordre"""
+    compiled = [(route.method, re.compile('^' + re.sub(r'<(\w+)>', r'(?P<\1>[^/]+)', route.pattern) + '$'), route)
+                for route in routes]
+
+    def match(method, path):
+        for route_method, pattern, route in compiled:
+            if route_method == method:
+                found = pattern.match(path)
+                if found:
+                    return route, found.groupdict()
+        return None, {}
+    return match
+
+
+def bench_match(number):
+    routes = registered_routes()
+    chain = if_chain(routes)
+    first, last = routes[0], routes[-1]
+    cases = [
+        ('première route', first.method, first.pattern),
+        ('dernière route', last.method, re.sub(r'<\w+>', '42', last.pattern)),
+        ('chemin inconnu', 'GET', '/api/inconnu'),
+    ]
+    rows = []
+    for label, method, path in cases:
+        assert server.ROUTES.match(method, path)[0] is chain(method, path)[0]
+        table = timeit.timeit(lambda: server.ROUTES.match(method, path), number=number) / number
+        linear = timeit.timeit(lambda: chain(method, path), number=number) / number
+        rows.append([label, len(routes), linear * 1e9, table * 1e9])
+    print_table(['cas', 'routes', 'chaîne (ns)', 'table (ns)'], rows)
+
+
+class _Handler(server.RESTRequestHandler):
+    """Handler sans socket (voir tests/test_dispatch.py)"""
+
+    def __init__(self, method, path, authorization):
+        self.command, self.path = method, path
+        self.request_version, self.requestline = 'HTTP/1.1', f'{method} {path} HTTP/1.1'
+        self.client_address, self.close_connection = ('127.0.0.1', 0), False
+        self.headers = Message()
+        self.headers['Authorization'] = authorization
+        self.rfile, self.wfile = io.BytesIO(), io.BytesIO()
+
+    def log_message(self, *args):
+        pass
+
+
+def bench_connections(requests):
+    exp = datetime.utcnow() + timedelta(minutes=5)
+    student = 'Bearer ' + jwt.encode({'sub': '1', 'role': 'student', 'exp': exp}, server.SECRET_KEY)
+    borrowed = {'n': 0}
+
+    def connect(*args, **kwargs):
+        borrowed['n'] += 1
+        raise AssertionError("connexion empruntée")
+
+    rows = []
+    with mock.patch.object(server, 'get_connection', connect), \
+            mock.patch.object(server, 'get_read_connection', connect), \
+            mock.patch.object(server.RESTRequestHandler, '_db_connection', lambda self: connect()):
+        for label, path in (('chemin inconnu', '/api/inconnu'), ('route d\'un autre rôle', '/api/users')):
+            borrowed['n'] = 0
+            for _ in range(requests):
+                handler = _Handler('GET', path, student)
+                handler.do_GET()
+                assert handler.wfile.getvalue().startswith(b'HTTP/1.1 404')
+            rows.append([label, requests, requests, borrowed['n']])
+    print_table(['requête', 'requêtes', 'connexions (avant)', 'connexions'], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=1000)
+    args = parser.parse_args()
+    # Clé de développement trop courte pour HMAC: sans objet ici
+    warnings.simplefilter('ignore')
+    bench_match(args.number)
+    print()
+    bench_connections(args.requests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_grade_import.py
+"""Import CSV de notes: résolution groupée contre deux SELECT par ligne
+
+process_grades_csv tourne contre une base factice où chaque requête
+coûte `--latency` secondes (aller-retour MySQL); l'ancienne boucle, deux
+SELECT par ligne puis executemany, est rejouée sur la même base. Le nombre
+de requêtes domine: il passe de 3 par ligne à quelques dizaines par import.
+
+    python benchmarks/bench_grade_import.py --rows 1000 10000 --latency 0.0002
+"""
+import argparse
+import csv
+import io
+from datetime import datetime
+from unittest import mock
+
+from common import LatencyConnection, LatencyCursor, print_table, timed
+import csv_processor
+
+STUDENTS = 2000
+SUBJECTS = 12
+
+
+def make_csv(rows):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['student_email', 'subject_name', 'grade', 'comments'])
+    for i in range(rows):
+        writer.writerow([f"eleve{i % STUDENTS}@ecole.fr", f"Matière {i % SUBJECTS}", i % 21, 'RAS'])
+    return out.getvalue()
+
+
+def answer(sql, params):
+    """Réponses de la base factice: tous les élèves et matières existent"""
+    if 'email IN' in sql:
+        return [{'id': int(email[5:].split('@')[0]) + 1, 'lookup_key': email} for email in params]
+    if 'name IN' in sql:
+        return [{'id': int(name.split()[-1]) + 1, 'lookup_key': name} for name in params[1:]]
+    if 'class_id FROM users' in sql:
+        return [{'id': student_id, 'class_id': student_id % 40 + 1} for student_id in params]
+    if 'WHERE email = %s' in sql:
+        return [{'id': int(params[0][5:].split('@')[0]) + 1}]
+    if 'WHERE s.name = %s' in sql:
+        return [{'id': int(params[0].split()[-1]) + 1}]
+    return []
+
+
+def baseline_import(csv_data, conn):
+    """Boucle d'origine: deux SELECT par ligne, puis executemany"""
+    cursor = conn.cursor(dictionary=True)
+    grades_to_insert = []
+    for row in csv.DictReader(io.StringIO(csv_data)):
+        grade = float(row['grade'])
+        cursor.execute("SELECT id FROM users WHERE email = %s AND role = 'student'",
+                       (row['student_email'].lower(),))
+        student = cursor.fetchone()
+        cursor.execute("SELECT s.id FROM subjects s WHERE s.name = %s AND s.teacher_id = %s",
+                       (row['subject_name'].strip(), 1))
+        subject = cursor.fetchone()
+        grades_to_insert.append((student['id'], subject['id'], grade, row['comments'][:255],
+                                 datetime.now().date()))
+    cursor.executemany("INSERT INTO grades (student_id, subject_id, grade, comments, evaluation_date) "
+                       "VALUES (%s, %s, %s, %s, %s)", grades_to_insert)
+    conn.commit()
+
+
+def run(rows, latency, repeat):
+    csv_data = make_csv(rows)
+    results = []
+    for label, importer in (('par ligne', baseline_import), ('groupé', None)):
+        cursor = LatencyCursor(answer, latency)
+        conn = LatencyConnection(cursor)
+        if importer is None:
+            def importer(data, conn):
+                with mock.patch.object(csv_processor, 'get_connection', return_value=conn), \
+                        mock.patch.object(csv_processor, 'touch_students'):
+                    result = csv_processor.process_grades_csv(data, teacher_id=1)
+                assert result['success'], result.get('errors', [])[:3]
+        duration = timed(lambda: importer(csv_data, conn), repeat)
+        results.append([rows, label, cursor.queries // repeat, duration, rows / duration])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--latency', type=float, default=0.0002)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+    table = [line for rows in args.rows for line in run(rows, args.latency, args.repeat)]
+    print_table(['lignes', 'stratégie', 'requêtes', 'durée (s)', 'lignes/s'], table)
+
+
+if __name__ == '__main__':
+    main()
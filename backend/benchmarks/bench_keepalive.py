@@ -0,0 +1,67 @@
+# benchmarks/bench_keepalive.py
+"""Connexions persistantes: une connexion par requête contre réutilisation
+
+Le vrai RESTRequestHandler (HTTP/1.1) sert /api/health sur un port local.
+`--clients` clients envoient chacun `--requests` requêtes, en ouvrant une
+connexion TCP par requête (comportement HTTP/1.0 d'origine) ou en gardant
+la même. Sur la boucle locale la poignée de main ne coûte presque rien:
+derrière nginx ou TLS l'écart est plus grand.
+
+    python benchmarks/bench_keepalive.py --clients 8 --requests 200
+"""
+import argparse
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import print_table
+from http_pool import create_server
+import server
+
+
+def per_request(port, requests):
+    for _ in range(requests):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        conn.request('GET', '/api/health', headers={'Connection': 'close'})
+        assert conn.getresponse().read()
+        conn.close()
+
+
+def reused(port, requests):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    for _ in range(requests):
+        conn.request('GET', '/api/health')
+        assert conn.getresponse().read()
+    conn.close()
+
+
+class QuietHandler(server.RESTRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+    # Une connexion persistante occupe un worker: un worker par client
+    httpd = create_server(QuietHandler, '127.0.0.1', 0, workers=args.clients, queue_size=64)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    port = httpd.server_address[1]
+    total = args.clients * args.requests
+    rows = []
+    for label, client in (('une connexion par requête', per_request), ('connexion réutilisée', reused)):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.clients) as pool:
+            list(pool.map(lambda _: client(port, args.requests), range(args.clients)))
+        elapsed = time.perf_counter() - start
+        rows.append([label, total, elapsed, total / elapsed, elapsed / total * 1000])
+    httpd.shutdown()
+    httpd.server_close()
+    print_table(['client', 'requêtes', 'durée (s)', 'req/s', 'ms/requête'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/bench_list_counts.py
+"""Listes avec effectifs: sous-requête corrélée contre jointure groupée
+
+Nécessite MySQL (DB_CONFIG). Les tables classes, users et subjects sont
+recréées en tables TEMPORARY, qui masquent les vraies pour cette seule
+session: aucune donnée existante n'est lue ni modifiée. Avec `--classes`
+classes et `--users` comptes, les anciennes requêtes (un COUNT par ligne)
+sont comparées aux ListQuery de server.py, liste complète et première page.
+
+    python benchmarks/bench_list_counts.py --classes 500 --users 50000
+"""
+import argparse
+
+from common import mysql_connection, print_table, timed
+import server
+
+OLD_CLASSES = """SELECT id, name, level, academic_year,
+       (SELECT COUNT(*) FROM users WHERE class_id=classes.id AND role='student') AS student_count
+FROM classes"""
+
+OLD_TEACHERS = """SELECT id, nom, prenom, email,
+       (SELECT COUNT(*) FROM subjects WHERE teacher_id=users.id) AS subject_count
+FROM users WHERE role='teacher'"""
+
+
+def seed(cursor, classes, users, subjects_per_class):
+    cursor.execute("""CREATE TEMPORARY TABLE classes (
+        id INT PRIMARY KEY AUTO_INCREMENT, name VARCHAR(255) UNIQUE NOT NULL,
+        level VARCHAR(50) NOT NULL, academic_year VARCHAR(9) NOT NULL) ENGINE=InnoDB""")
+    cursor.execute("""CREATE TEMPORARY TABLE users (
+        id INT PRIMARY KEY AUTO_INCREMENT, role ENUM('admin', 'teacher', 'student') NOT NULL,
+        nom VARCHAR(255), prenom VARCHAR(255), email VARCHAR(255), class_id INT,
+        INDEX idx_class_id (class_id), INDEX idx_class_role (class_id, role)) ENGINE=InnoDB""")
+    cursor.execute("""CREATE TEMPORARY TABLE subjects (
+        id INT PRIMARY KEY AUTO_INCREMENT, name VARCHAR(255) NOT NULL, teacher_id INT NOT NULL,
+        class_id INT NOT NULL, INDEX idx_teacher (teacher_id), INDEX idx_class (class_id)) ENGINE=InnoDB""")
+    cursor.executemany("INSERT INTO classes (name, level, academic_year) VALUES (%s, %s, %s)",
+                       [(f"C{i}", 'Seconde', '2026-2027') for i in range(classes)])
+    teachers = max(1, users // 50)
+    cursor.executemany(
+        "INSERT INTO users (role, nom, prenom, email, class_id) VALUES (%s, %s, %s, %s, %s)",
+        [('teacher', f"Prof{i}", 'Alex', f"prof{i}@ecole.fr", None) for i in range(teachers)]
+        + [('student', f"Nom{i}", 'Sam', f"eleve{i}@ecole.fr", i % classes + 1)
+           for i in range(users - teachers)]
+    )
+    cursor.executemany("INSERT INTO subjects (name, teacher_id, class_id) VALUES (%s, %s, %s)",
+                       [(f"Matière {i}", i % teachers + 1, i // subjects_per_class + 1)
+                        for i in range(classes * subjects_per_class)])
+    cursor.execute("ANALYZE TABLE classes, users, subjects")
+    cursor.fetchall()
+
+
+def dependent_subqueries(cursor, sql, params=()):
+    cursor.execute("EXPLAIN " + sql, params)
+    return sum(1 for row in cursor.fetchall() if 'DEPENDENT' in (row['select_type'] or ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--classes', type=int, default=500)
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--subjects-per-class', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    conn = mysql_connection()
+    cursor = conn.cursor(dictionary=True)
+    seed(cursor, args.classes, args.users, args.subjects_per_class)
+
+    def run_sql(sql):
+        cursor.execute(sql)
+        cursor.fetchall()
+
+    def run_list(query, limit):
+        if limit is None:
+            list(query.iter_rows(cursor))
+        else:
+            query.fetch_page(cursor, limit=limit)
+
+    rows = []
+    for label, old, query in (('classes', OLD_CLASSES, server.CLASSES), ('enseignants', OLD_TEACHERS, server.TEACHERS)):
+        rows.append([label, 'COUNT corrélé', dependent_subqueries(cursor, old),
+                     timed(lambda: run_sql(old), args.repeat) * 1000])
+        for limit in (None, 100):
+            rows.append([label, f"jointure groupée ({'tout' if limit is None else f'page de {limit}'})", '',
+                         timed(lambda: run_list(query, limit), args.repeat) * 1000])
+    print_table(['liste', 'requête', 'sous-requêtes dépendantes', 'ms'], rows)
+    cursor.close()
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
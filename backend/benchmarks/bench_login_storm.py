@@ -0,0 +1,134 @@
+# benchmarks/bench_login_storm.py
+"""Rafale de connexions: occupation du pool MySQL et écritures de last_login
+
+`--logins` connexions simultanées passent par un pool de `--pool`
+connexions factices (`--latency` s par requête). L'ancien handler gardait
+sa connexion pendant bcrypt puis écrivait last_login ligne à ligne; le
+nouveau la rend avant bcrypt (PasswordChecker) et regroupe les écritures
+(LastLoginRecorder). Pendant la rafale, une requête ordinaire mesure son
+attente d'une connexion.
+
+    python benchmarks/bench_login_storm.py --logins 32 --pool 4 --rounds 10
+"""
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import bcrypt
+
+from common import LatencyConnection, LatencyCursor, print_table
+import login
+
+
+class Pool:
+    """Pool de connexions factices: mesure l'attente et la durée d'emprunt"""
+
+    def __init__(self, size, latency):
+        self._slots = threading.BoundedSemaphore(size)
+        self.latency = latency
+        self.updates = 0
+        self.held = []
+        self._lock = threading.Lock()
+
+    def connect(self, answer=lambda sql, params: []):
+        self._slots.acquire()
+        pool, borrowed = self, time.perf_counter()
+
+        class Cursor(LatencyCursor):
+            def execute(self, sql, params=()):
+                if sql.startswith('UPDATE'):
+                    with pool._lock:
+                        pool.updates += 1
+                super().execute(sql, params)
+
+        class Connection(LatencyConnection):
+            def close(self):
+                with pool._lock:
+                    pool.held.append(time.perf_counter() - borrowed)
+                pool._slots.release()
+
+        return Connection(Cursor(answer, self.latency))
+
+
+def old_login(pool, user, password):
+    conn = pool.connect(lambda sql, params: [user])
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute('SELECT id,password_hash,role FROM users WHERE username=%s', ('eleve',))
+        found = cursor.fetchone()
+        assert bcrypt.checkpw(password.encode(), found['password_hash'].encode())
+        cursor.execute('UPDATE users SET last_login=NOW() WHERE id=%s', (found['id'],))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def new_login(pool, user, password, checker, recorder):
+    conn = pool.connect(lambda sql, params: [user])
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute('SELECT id,password_hash,role FROM users WHERE username=%s', ('eleve',))
+        found = cursor.fetchone()
+    finally:
+        conn.close()
+    assert checker.check(password, found['password_hash'])
+    recorder.record(found['id'])
+
+
+def probe(pool, stop, waits):
+    """Requête ordinaire: une lecture toutes les 10 ms pendant la rafale"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        conn = pool.connect()
+        waits.append(time.perf_counter() - start)
+        conn.cursor().execute('SELECT 1')
+        conn.close()
+        time.sleep(0.01)
+
+
+def run(label, args, password_hash, login_fn, finish=lambda: None):
+    pool = Pool(args.pool, args.latency)
+    stop, waits = threading.Event(), []
+    prober = threading.Thread(target=probe, args=(pool, stop, waits))
+    prober.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.logins) as clients:
+        list(clients.map(lambda i: login_fn(pool, {'id': i, 'password_hash': password_hash, 'role': 'student'}),
+                         range(args.logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    prober.join()
+    with mock.patch.object(login, 'get_connection', pool.connect):
+        finish()
+    return [label, elapsed, statistics.mean(pool.held) * 1000, max(waits) * 1000, pool.updates]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=32)
+    parser.add_argument('--pool', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.0005)
+    args = parser.parse_args()
+    password = 'motdepasse'
+    password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt(args.rounds)).decode()
+
+    checker = login.PasswordChecker(args.workers, max_pending=args.logins)
+    # Pas d'écriture périodique pendant la mesure: un seul flush à la fin
+    recorder = login.LastLoginRecorder(flush_interval=3600)
+    rows = [
+        run('connexion gardée pendant bcrypt', args, password_hash,
+            lambda pool, user: old_login(pool, user, password)),
+        run(f'bcrypt hors connexion ({args.workers} threads)', args, password_hash,
+            lambda pool, user: new_login(pool, user, password, checker, recorder), recorder.flush),
+    ]
+    print_table(['login', 'durée (s)', 'emprunt moyen (ms)', 'attente max autre requête (ms)', 'UPDATE'],
+                rows)
+
+
+if __name__ == '__main__':
+    main()
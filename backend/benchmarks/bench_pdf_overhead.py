@@ -0,0 +1,47 @@
+# benchmarks/bench_pdf_overhead.py
+"""Coût fixe d'un bulletin: styles et logo construits à chaque PDF ou une fois
+
+La version « à chaque PDF » reconstruit la feuille de styles et insère le
+logo pleine résolution (600x600), que ReportLab recompresse dans chaque
+document; la version actuelle réutilise les styles et le logo réduit.
+
+    python benchmarks/bench_pdf_overhead.py --repeat 10
+"""
+import argparse
+from unittest import mock
+
+from reportlab.platypus import Image
+
+from common import fake_transcripts, print_table, school_logo, timed
+import pdf_generator
+
+
+def render(student, grades):
+    pdf_generator._render_transcript(student, grades, 'teacher')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--grades', type=int, default=6)
+    args = parser.parse_args()
+    logo = school_logo()
+    grades = fake_transcripts(1, args.grades)
+    student = {'id': 1, 'nom': 'Nom1', 'prenom': 'Prénom1', 'class_name': '3A'}
+
+    def uncached():
+        size = pdf_generator.PDF_CONFIG['logo_size']
+        with mock.patch.object(pdf_generator, '_create_styles', pdf_generator._create_styles.__wrapped__), \
+                mock.patch.object(pdf_generator, '_create_logo', lambda: Image(logo, width=size, height=size)):
+            render(student, grades)
+
+    render(student, grades)  # Styles et logo réduit mis en cache
+    rows = []
+    for label, fn in (('à chaque PDF', uncached), ('une fois par processus', lambda: render(student, grades))):
+        duration = timed(fn, args.repeat)
+        rows.append([label, duration * 1000, 1 / duration])
+    print_table(['styles et logo', 'ms/PDF', 'PDF/s'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_server_workers.py
+"""Débit du PooledHTTPServer selon le nombre de threads
+
+Un handler qui attend `--delay` secondes (une requête MySQL lente) est
+servi par 1, 4 puis 16 threads; `--clients` clients concurrents envoient
+chacun `--requests` requêtes. Avec un seul thread le débit plafonne à
+1/delay req/s; il doit croître avec le pool tant que la file ne rejette rien.
+
+    python benchmarks/bench_server_workers.py --delay 0.02 --clients 32
+"""
+import argparse
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+
+from common import print_table
+from http_pool import create_server
+
+
+def make_handler(delay):
+    class SlowHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(delay)
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return SlowHandler
+
+
+def client(port, requests):
+    ok = rejected = 0
+    for _ in range(requests):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        try:
+            conn.request('GET', '/')
+            status = conn.getresponse().status
+            ok += status == 200
+            rejected += status == 503
+        except OSError:
+            rejected += 1
+        finally:
+            conn.close()
+    return ok, rejected
+
+
+def run(workers, args):
+    server = create_server(make_handler(args.delay), '127.0.0.1', 0, workers, args.queue_size)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as pool:
+        results = list(pool.map(lambda _: client(port, args.requests), range(args.clients)))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+    ok = sum(r[0] for r in results)
+    rejected = sum(r[1] for r in results)
+    return [workers, ok, rejected, elapsed, ok / elapsed]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--delay', type=float, default=0.02)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=10)
+    parser.add_argument('--queue-size', type=int, default=64)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    args = parser.parse_args()
+    rows = [run(workers, args) for workers in args.workers]
+    print_table(['workers', 'ok', '503', 'durée (s)', 'req/s'], rows)
+
+
+if __name__ == '__main__':
+    main()
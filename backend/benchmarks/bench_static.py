@@ -0,0 +1,99 @@
+# benchmarks/bench_static.py
+"""Fichiers statiques: lecture à chaque requête contre cache mémoire et sendfile
+
+Le vrai RESTRequestHandler sert un petit fichier JS (gardé en mémoire,
+gzip si accepté) et un gros fichier (sendfile), avec et sans revalidation
+If-None-Match. La référence est l'ancien handler: open() + read() du
+fichier entier à chaque requête, sans ETag ni compression.
+
+    python benchmarks/bench_static.py --requests 500
+"""
+import argparse
+import http.client
+import os
+import tempfile
+import threading
+import time
+
+from common import print_table
+from http_pool import create_server
+from static_files import StaticFiles
+import server
+
+
+class QuietHandler(server.RESTRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class ReadEveryTimeHandler(QuietHandler):
+    """Ancien comportement: fichier relu en entier à chaque requête"""
+
+    def _send_static(self, path):
+        with open(os.path.join(server.static_files.root, path.lstrip('/')), 'rb') as f:
+            body = f.read()
+        self._set_headers(200, self._guess_mime_type(path), len(body))
+        self.wfile.write(body)
+
+
+def make_root(small_kb, large_mb):
+    root = tempfile.mkdtemp(prefix='bench-static-')
+    os.makedirs(os.path.join(root, 'static'))
+    with open(os.path.join(root, 'static', 'app.js'), 'w') as f:
+        line = "function afficherNotes(eleve) { return eleve.notes.map(n => n.valeur); }\n"
+        f.write(line * (small_kb * 1024 // len(line)))
+    with open(os.path.join(root, 'static', 'video.mp4'), 'wb') as f:
+        f.write(os.urandom(large_mb * 1024 * 1024))
+    return root
+
+
+def fetch(port, path, requests, headers):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    received = 0
+    etag = None
+    for _ in range(requests):
+        conn.request('GET', path, headers={**headers, **({'If-None-Match': etag} if etag else {})})
+        response = conn.getresponse()
+        received += len(response.read())
+        if 'If-None-Match' in headers:
+            etag = response.getheader('ETag')
+    conn.close()
+    return received
+
+
+def run(handler_class, service, case):
+    httpd = create_server(handler_class, '127.0.0.1', 0, workers=2, queue_size=16)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    label, path, headers, n = case
+    start = time.perf_counter()
+    received = fetch(httpd.server_address[1], path, n, headers)
+    elapsed = time.perf_counter() - start
+    httpd.shutdown()
+    httpd.server_close()
+    return [label, service, n, received / n / 1024, n / elapsed]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--small-kb', type=int, default=64)
+    parser.add_argument('--large-mb', type=int, default=8)
+    args = parser.parse_args()
+    server.static_files = StaticFiles(make_root(args.small_kb, args.large_mb))
+    large_requests = max(1, args.requests // 20)
+    cases = [
+        (f'app.js {args.small_kb} Ko', '/static/app.js', {}, args.requests),
+        (f'app.js {args.small_kb} Ko, gzip', '/static/app.js', {'Accept-Encoding': 'gzip'}, args.requests),
+        (f'app.js {args.small_kb} Ko, revalidation', '/static/app.js', {'If-None-Match': ''}, args.requests),
+        (f'video.mp4 {args.large_mb} Mo', '/static/video.mp4', {}, large_requests),
+    ]
+    rows = []
+    for case in cases:
+        rows.append(run(ReadEveryTimeHandler, 'relu à chaque requête', case))
+        rows.append(run(QuietHandler, 'cache / sendfile', case))
+    print_table(['fichier', 'service', 'requêtes', 'Ko reçus/requête', 'req/s'], rows)
+    print(server.static_files.stats())
+
+
+if __name__ == '__main__':
+    main()
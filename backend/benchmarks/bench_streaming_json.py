@@ -0,0 +1,73 @@
+# benchmarks/bench_streaming_json.py
+"""Export d'une liste complète: réponse en flux contre réponse construite en mémoire
+
+L'ancienne réponse lisait toutes les lignes (fetchall) puis encodait le
+tableau JSON entier avant d'envoyer le premier octet. En flux, les lignes
+sont lues par lots et iter_json_array émet des blocs d'environ 64 Ko: le
+pic mémoire ne dépend plus du nombre de lignes et le premier octet part
+dès le premier lot.
+
+    python benchmarks/bench_streaming_json.py --rows 10000 100000
+"""
+import argparse
+import datetime
+import time
+import tracemalloc
+
+from common import print_table
+from json_stream import dumps, iter_json_array
+
+BATCH = 500  # API_STREAM_BATCH_SIZE
+
+
+def fetch(count):
+    """Lignes telles que renvoyées par le connecteur, lot par lot"""
+    for start in range(0, count, BATCH):
+        yield [
+            {'id': i, 'username': f"eleve{i}", 'role': 'student', 'nom': f"Nom{i}", 'prenom': f"Prénom{i}",
+             'email': f"eleve{i}@ecole.fr", 'class_id': i % 40, 'status': 'Actif',
+             'created_at': datetime.date(2026, 9, 1)}
+            for i in range(start, min(start + BATCH, count))
+        ]
+
+
+def buffered(count, write):
+    rows = [row for batch in fetch(count) for row in batch]  # fetchall()
+    write(dumps(rows))
+
+
+def streamed(count, write):
+    for chunk in iter_json_array(row for batch in fetch(count) for row in batch):
+        write(chunk)
+
+
+def measure(fn, count):
+    sent = {'bytes': 0, 'first': None}
+    start = time.perf_counter()
+
+    def write(data):
+        if sent['first'] is None:
+            sent['first'] = time.perf_counter() - start
+        sent['bytes'] += len(data)
+
+    tracemalloc.start()
+    fn(count, write)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return sent['bytes'] / 2**20, peak / 2**20, sent['first'] * 1000, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args()
+    table = []
+    for count in args.rows:
+        for label, fn in (('en mémoire', buffered), ('en flux', streamed)):
+            table.append([count, label, *measure(fn, count)])
+    print_table(['lignes', 'réponse', 'corps (Mo)', 'pic (Mo)', 'premier octet (ms)', 'durée (s)'], table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# benchmarks/bench_token_cache.py
+"""Vérification d'un jeton JWT: décodage complet contre cache
+
+Chaque requête authentifiée décodait et vérifiait la signature HS256 du
+jeton; TokenCache ne le fait qu'à la première présentation du jeton
+(empreinte SHA-256 puis lecture d'un dictionnaire).
+
+    python benchmarks/bench_token_cache.py --number 50000
+"""
+import argparse
+import timeit
+import warnings
+from datetime import datetime, timedelta
+
+import jwt
+
+from common import print_table
+from token_cache import TokenCache
+
+SECRET_KEY = 'cle-de-mesure-suffisamment-longue-pour-hs256'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=50000)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    exp = datetime.utcnow() + timedelta(hours=1)
+    token = jwt.encode({'sub': '42', 'role': 'teacher', 'exp': exp}, SECRET_KEY)
+
+    def decode():
+        return jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
+
+    cache = TokenCache()
+    cache.put(token, decode())
+    assert cache.get(token) == decode()
+
+    rows = []
+    for label, fn in (('jwt.decode', decode), ('TokenCache.get (succès)', lambda: cache.get(token)),
+                      ('TokenCache.get (absent)', lambda: cache.get(token + 'x'))):
+        per_call = timeit.timeit(fn, number=args.number) / args.number
+        rows.append([label, per_call * 1e6, 1 / per_call])
+    print_table(['vérification', 'µs/appel', 'appels/s'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_upload_memory.py
+"""Pic mémoire d'un upload CSV: lecture en flux contre lecture intégrale
+
+Le corps multipart est lu depuis un flux en mémoire et ses lignes CSV sont
+parcourues comme le ferait l'import. L'ancienne version lisait tout le
+corps, puis le décodait en une chaîne: le pic croît avec la taille du
+fichier. MultipartReader + TextIOWrapper doit rester à quelques blocs.
+
+    python benchmarks/bench_upload_memory.py --sizes 1 10 50
+"""
+import argparse
+import csv
+import io
+import time
+import tracemalloc
+
+from common import print_table
+from multipart import MultipartReader
+
+BOUNDARY = 'bench-boundary'
+
+
+def make_body(megabytes):
+    line = b'eleve42@ecole.fr,Math\xc3\xa9matiques,15.5,Bon travail\r\n'
+    rows = megabytes * 1024 * 1024 // len(line)
+    return (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="notes.csv"\r\n'
+        'Content-Type: text/csv\r\n\r\n'.encode()
+        + b'student_email,subject_name,grade,comments\r\n' + line * rows
+        + f'\r\n--{BOUNDARY}--\r\n'.encode()
+    )
+
+
+def read_all(body):
+    rfile = io.BytesIO(body)
+    data = rfile.read(len(body))
+    start = data.index(b'\r\n\r\n') + 4
+    end = data.rindex(f'\r\n--{BOUNDARY}--'.encode())
+    text = data[start:end].decode('utf-8')
+    return sum(1 for _ in csv.DictReader(io.StringIO(text)))
+
+
+def streamed(body):
+    upload = MultipartReader(io.BytesIO(body), BOUNDARY, len(body))
+    text = io.TextIOWrapper(upload.field('file'), encoding='utf-8', newline='')
+    count = sum(1 for _ in csv.DictReader(text))
+    upload.drain()
+    return count
+
+
+def measure(fn, body):
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = fn(body)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, peak / (1024 * 1024), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 50], help='Mo')
+    args = parser.parse_args()
+    table = []
+    for size in args.sizes:
+        body = make_body(size)
+        for label, fn in (('lecture intégrale', read_all), ('flux', streamed)):
+            rows, peak, elapsed = measure(fn, body)
+            table.append([size, label, rows, peak, elapsed])
+    print_table(['Mo', 'lecture', 'lignes', 'pic (Mo)', 'durée (s)'], table)
+
+
+if __name__ == '__main__':
+    main()
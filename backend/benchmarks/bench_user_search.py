@@ -0,0 +1,81 @@
+# benchmarks/bench_user_search.py
+"""Recherche d'utilisateurs: index trigramme contre parcours complet
+
+Sur `--users` comptes synthétiques, une page de 50 résultats est cherchée
+par TrigramIndex.search et par un parcours de toutes les lignes avec test
+de sous-chaîne (ce que fait MySQL pour LIKE '%terme%', sans index).
+`--mysql` mesure en plus search_users en SQL ('contains', 'prefix',
+'fulltext') sur la table users de DB_CONFIG, en lecture seule.
+
+    python benchmarks/bench_user_search.py --users 30000
+"""
+import argparse
+import random
+import time
+
+from common import mysql_connection, print_table, timed
+from user_search import TrigramIndex, search_users
+
+SYLLABLES = ['ma', 'ri', 'lo', 'du', 'be', 'ca', 'ne', 'to', 'sa', 'li', 'ro', 'vi', 'ga', 'mon', 'tel']
+
+
+def make_users(count):
+    rng = random.Random(1)
+    word = lambda n: ''.join(rng.choice(SYLLABLES) for _ in range(n))
+    return [(i, f"{word(2)}{i}", word(3).title(), word(2).title()) for i in range(1, count + 1)]
+
+
+def linear(users, term, limit):
+    term = term.lower()
+    found = []
+    for user_id, *fields in users:
+        if any(term in field.lower() for field in fields):
+            found.append(user_id)
+            if len(found) >= limit:
+                break
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=30000)
+    parser.add_argument('--terms', nargs='+', default=['ma', 'montel', 'rivito', 'zzz', '29999'])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--mysql', action='store_true')
+    args = parser.parse_args()
+    users = make_users(args.users)
+    index = TrigramIndex()
+    start = time.perf_counter()
+    for user in users:
+        index._add(*user)
+    print(f"{args.users} utilisateurs indexés en {time.perf_counter() - start:.2f} s")
+
+    rows = []
+    for term in args.terms:
+        expected = linear(users, term, 50)
+        assert index.search(term) == expected, term
+        rows.append([term, len(expected),
+                     timed(lambda: linear(users, term, 50), args.repeat) * 1000,
+                     timed(lambda: index.search(term), args.repeat) * 1000])
+    print_table(['terme', 'résultats', 'parcours (ms)', 'trigrammes (ms)'], rows)
+
+    if args.mysql:
+        conn = mysql_connection()
+        cursor = conn.cursor(dictionary=True)
+        rows = []
+        for term in args.terms:
+            for mode in ('contains', 'prefix', 'fulltext'):
+                try:
+                    duration = timed(lambda: search_users(cursor, term, mode=mode), args.repeat)
+                except Exception as e:  # index FULLTEXT absent
+                    rows.append([term, mode, f"erreur: {e}"])
+                    continue
+                rows.append([term, mode, duration * 1000])
+        print()
+        print_table(['terme', 'mode SQL', 'ms'], rows)
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
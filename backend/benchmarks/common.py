@@ -0,0 +1,142 @@
+# benchmarks/common.py
+"""Outils partagés par les scripts de mesure
+
+Chaque script se lance depuis backend/ (`python benchmarks/<script>.py`)
+et affiche un tableau. Les mesures dépendent de la machine: comparer les
+lignes d'un même tableau, pas des chiffres entre machines.
+"""
+import os
+import statistics
+import sys
+import time
+
+# Les modules du backend s'importent à plat (comme depuis backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def timed(fn, repeat=5):
+    """Durée médiane (s) de `fn()` sur `repeat` exécutions"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def print_table(headers, rows):
+    cells = [[str(h) for h in headers]] + [[_format(v) for v in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for n, row in enumerate(cells):
+        print('  '.join(value.rjust(width) for value, width in zip(row, widths)))
+        if n == 0:
+            print('  '.join('-' * width for width in widths))
+
+
+def _format(value):
+    if isinstance(value, float):
+        return f"{value:,.3f}" if value < 100 else f"{value:,.0f}"
+    return str(value)
+
+
+def mysql_connection():
+    """Connexion MySQL (DB_CONFIG) pour les mesures sur base réelle; quitte si indisponible"""
+    import mysql.connector
+    from config import DB_CONFIG
+    try:
+        return mysql.connector.connect(**DB_CONFIG, connection_timeout=3)
+    except mysql.connector.Error as e:
+        sys.exit(f"MySQL indisponible ({e}): cette mesure nécessite une base (MYSQL_HOST...)")
+
+
+class LatencyCursor:
+    """Curseur factice: chaque requête coûte `latency` secondes (aller-retour réseau)
+
+    `answer(sql, params)` fournit les lignes renvoyées. Sert à comparer des
+    stratégies par leur nombre d'allers-retours sans serveur MySQL.
+    """
+
+    def __init__(self, answer=lambda sql, params: [], latency=0.0002, dictionary=True):
+        self.answer = answer
+        self.latency = latency
+        self.dictionary = dictionary
+        self.queries = 0
+        self.rowcount = 0
+        self.lastrowid = 0
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        self.queries += 1
+        time.sleep(self.latency)
+        self._rows = list(self.answer(sql, params))
+        self.rowcount = len(self._rows) if sql.lstrip().upper().startswith('SELECT') else sql.count('(%s')
+        self.lastrowid += 1
+
+    def executemany(self, sql, seq):
+        seq = list(seq)
+        self.queries += len(seq)  # le connecteur envoie une requête par ligne hors INSERT simple
+        time.sleep(self.latency * len(seq))
+        self.rowcount = len(seq)
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+
+class LatencyConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self, **kwargs):
+        return self._cursor
+
+    def commit(self):
+        time.sleep(self._cursor.latency)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def school_logo(size=600):
+    """Se place dans un répertoire temporaire contenant static/school_logo.png
+
+    pdf_generator lit le logo relativement au répertoire courant, y compris
+    dans les processus de rendu (spawn), qui héritent de ce répertoire.
+    """
+    import tempfile
+    from PIL import Image
+    root = tempfile.mkdtemp(prefix='bench-pdf-')
+    os.makedirs(os.path.join(root, 'static'))
+    path = os.path.join(root, 'static', 'school_logo.png')
+    # Bruit: un logo photographique ne se compresse pas
+    Image.frombytes('RGB', (size, size), os.urandom(size * size * 3)).save(path)
+    os.chdir(root)
+    return path
+
+
+def fake_transcripts(students, grades_per_student):
+    """Lignes de la requête de generate_class_transcripts pour une classe fictive"""
+    import datetime
+    return [
+        {
+            'student_id': student, 'nom': f"Nom{student}", 'prenom': f"Prénom{student}",
+            'class_name': '3A', 'subject': f"Matière {g}", 'grade': 8 + (student + g) % 12,
+            'comments': 'Travail régulier, des progrès à confirmer au prochain trimestre',
+            'evaluation_date': datetime.date(2026, 3, 1 + g % 28),
+            'teacher_name': f"Prof{g}", 'teacher_firstname': 'Alex'
+        }
+        for student in range(1, students + 1) for g in range(grades_per_student)
+    ]
@@ -0,0 +1,88 @@
+# compression.py
+"""Négociation Accept-Encoding et compression des réponses
+
+gzip est toujours disponible; brotli (`br`) et zstd le sont si les
+paquets optionnels `brotli` / `zstandard` sont installés.
+"""
+import zlib
+from config import COMPRESSION_CONFIG
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Les PDF et ZIP sont déjà compressés
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'text/')
+
+def available_encodings():
+    """Encodages utilisables, dans l'ordre de préférence configuré"""
+    installed = {'gzip': True, 'br': brotli is not None, 'zstd': zstandard is not None}
+    return [e for e in COMPRESSION_CONFIG['encodings'] if installed.get(e)]
+
+_AVAILABLE = available_encodings()
+
+def is_compressible(content_type, size) -> bool:
+    return size >= COMPRESSION_CONFIG['min_size'] and content_type.startswith(COMPRESSIBLE_TYPES)
+
+def negotiate(accept_encoding):
+    """Encodage à utiliser pour un en-tête Accept-Encoding, ou None (identité)"""
+    if not accept_encoding or not _AVAILABLE:
+        return None
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    default = weights.get('*', 0.0)
+    best, best_q = None, 0.0
+    for encoding in _AVAILABLE:
+        q = weights.get(encoding, weights.get('x-gzip', default) if encoding == 'gzip' else default)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(COMPRESSION_CONFIG['gzip_level'], zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESSION_CONFIG['brotli_quality'])
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=COMPRESSION_CONFIG['zstd_level']).compress(data)
+    raise ValueError(f"Encodage non supporté: {encoding}")
+
+class StreamCompressor:
+    """Compression incrémentale d'un corps envoyé par morceaux"""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == 'gzip':
+            self._obj = zlib.compressobj(COMPRESSION_CONFIG['gzip_level'], zlib.DEFLATED, 31)
+        elif encoding == 'br':
+            self._obj = brotli.Compressor(quality=COMPRESSION_CONFIG['brotli_quality'])
+        elif encoding == 'zstd':
+            self._obj = zstandard.ZstdCompressor(level=COMPRESSION_CONFIG['zstd_level']).compressobj()
+        else:
+            raise ValueError(f"Encodage non supporté: {encoding}")
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self._obj.process(data)
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        if self.encoding == 'br':
+            return self._obj.finish()
+        return self._obj.flush()
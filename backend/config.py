@@ -10,3 +10,109 @@ DB_CONFIG = {
     'charset': 'utf8mb4',
     'collation': 'utf8mb4_unicode_ci'
 }
+
+# Réplicas en lecture: DB_REPLICAS="hote[:port],hote2[:port]" (mêmes identifiants)
+DB_REPLICAS = [
+    {**DB_CONFIG, 'host': host, 'port': int(port or DB_CONFIG['port'])}
+    for host, _, port in (entry.strip().partition(':')
+                          for entry in os.getenv('DB_REPLICAS', '').split(',') if entry.strip())
+]
+
+REPLICA_CONFIG = {
+    'max_lag': float(os.getenv('DB_REPLICA_MAX_LAG', 5)),               # retard toléré (s)
+    'check_interval': float(os.getenv('DB_REPLICA_CHECK_INTERVAL', 2)), # mesure du retard (s)
+    'sticky_seconds': float(os.getenv('DB_REPLICA_STICKY', 10))         # lectures sur le primaire après une écriture (s)
+}
+
+SERVER_CONFIG = {
+    'host': os.getenv('HTTP_HOST', '0.0.0.0'),
+    'port': int(os.getenv('HTTP_PORT', 8000)),
+    'workers': int(os.getenv('HTTP_WORKERS', 16)),      # 0 = serveur mono-thread
+    'queue_size': int(os.getenv('HTTP_QUEUE_SIZE', 128))
+}
+
+HTTP_KEEPALIVE_CONFIG = {
+    # Une connexion persistante occupe un worker: l'upstream keepalive de
+    # nginx doit rester inférieur à HTTP_WORKERS
+    'idle_timeout': float(os.getenv('HTTP_IDLE_TIMEOUT', 15)),     # fermeture si inactive (s)
+    'max_requests': int(os.getenv('HTTP_MAX_REQUESTS', 1000))      # requêtes par connexion
+}
+
+DB_POOL_CONFIG = {
+    'size': int(os.getenv('DB_POOL_SIZE', 10)),
+    'max_overflow': int(os.getenv('DB_POOL_OVERFLOW', 10)),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', 5)),        # attente max d'une connexion (s)
+    'ping_after': float(os.getenv('DB_POOL_PING_AFTER', 5)),  # ping si inactive depuis (s)
+    'recycle': float(os.getenv('DB_POOL_RECYCLE', 1800))      # réouverture si inactive depuis (s)
+}
+
+UPLOAD_CONFIG = {
+    'max_size': int(os.getenv('UPLOAD_MAX_SIZE', 50 * 1024 * 1024)),  # octets
+    'chunk_size': 64 * 1024
+}
+
+REPORT_CONFIG = {
+    'workers': int(os.getenv('REPORT_WORKERS', 2)),          # rendus PDF simultanés
+    'max_pending': int(os.getenv('REPORT_MAX_PENDING', 100)),
+    'job_ttl': int(os.getenv('REPORT_JOB_TTL', 600)),        # conservation des résultats (s)
+    'max_results_per_owner': int(os.getenv('REPORT_MAX_RESULTS_PER_USER', 20)),
+    'max_result_bytes': int(os.getenv('REPORT_MAX_RESULT_BYTES', 200 * 1024 * 1024))  # résultats en mémoire
+}
+
+REPORT_CACHE_CONFIG = {
+    'directory': os.getenv('REPORT_CACHE_DIR', 'reports'),
+    'max_entries': int(os.getenv('REPORT_CACHE_MAX_ENTRIES', 500)),
+    'max_bytes': int(os.getenv('REPORT_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+}
+
+BULK_REPORT_CONFIG = {
+    'workers': int(os.getenv('REPORT_BULK_WORKERS', os.cpu_count() or 1))  # processus de rendu
+}
+
+AUTH_CONFIG = {
+    'token_cache_size': int(os.getenv('AUTH_TOKEN_CACHE_SIZE', 10000))  # 0 = désactivé
+}
+
+LOGIN_CONFIG = {
+    'hash_workers': int(os.getenv('LOGIN_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2))),
+    'max_pending': int(os.getenv('LOGIN_MAX_PENDING', 64)),
+    'flush_interval': float(os.getenv('LAST_LOGIN_FLUSH_INTERVAL', 5)),  # écriture de last_login (s)
+    'batch_size': int(os.getenv('LAST_LOGIN_BATCH_SIZE', 500))
+}
+
+USER_SEARCH_CONFIG = {
+    # 'contains' (sous-chaîne, comportement historique) ou 'trigram' (sous-chaîne
+    # via index en mémoire); 'prefix' et 'fulltext' ne trouvent que les débuts de mots
+    'mode': os.getenv('USER_SEARCH_MODE', 'contains')
+}
+
+PAGINATION_CONFIG = {
+    'page_size': int(os.getenv('API_PAGE_SIZE', 100)),       # lignes par page des listes
+    'max_page_size': int(os.getenv('API_MAX_PAGE_SIZE', 1000)),
+    'stream_batch_size': int(os.getenv('API_STREAM_BATCH_SIZE', 500))  # limit=all: lignes lues par lot
+}
+
+RESPONSE_CACHE_CONFIG = {
+    'ttl': float(os.getenv('RESPONSE_CACHE_TTL', 30)),  # secondes; 0 = désactivé
+    'max_entries': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 5000))
+}
+
+HTTP_CACHE_CONFIG = {
+    # Durée de conservation des rapports PDF par le cache nginx (par jeton)
+    'report_s_maxage': int(os.getenv('HTTP_REPORT_S_MAXAGE', 60))
+}
+
+STATIC_CONFIG = {
+    'root': os.getenv('STATIC_ROOT', '/app/frontend'),
+    'cache_max_bytes': int(os.getenv('STATIC_CACHE_MAX_BYTES', 16 * 1024 * 1024)),
+    'cache_max_file_size': int(os.getenv('STATIC_CACHE_MAX_FILE_SIZE', 256 * 1024))  # au-delà: sendfile
+}
+
+COMPRESSION_CONFIG = {
+    # Ordre de préférence; br et zstd nécessitent les paquets brotli / zstandard
+    'encodings': [e.strip() for e in os.getenv('COMPRESSION_ENCODINGS', 'br,zstd,gzip').split(',') if e.strip()],
+    'min_size': int(os.getenv('COMPRESSION_MIN_SIZE', 1024)),  # octets
+    'gzip_level': int(os.getenv('COMPRESSION_GZIP_LEVEL', 6)),
+    'brotli_quality': int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5)),
+    'zstd_level': int(os.getenv('COMPRESSION_ZSTD_LEVEL', 3))
+}
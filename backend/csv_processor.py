@@ -1,13 +1,15 @@
 # csv_processor.py
 import csv
 import io
+import os
 import mysql.connector
 import bcrypt
 from datetime import datetime
-from database import db_connection
-
-# Configuration compatible avec server.py
-from config import DB_CONFIG
+from itertools import islice
+from worker_pool import LazyPool
+from database import get_connection, touch_students
+import data_versions
+import grade_aggregates
 
 
 CSV_CONFIG = {
@@ -15,14 +17,21 @@ CSV_CONFIG = {
     'class_required_fields': ['name', 'level', 'academic_year'],
     'grade_required_fields': ['student_email', 'subject_name', 'grade', 'comments'],
     'max_grade': 20,
-    'min_grade': 0
+    'min_grade': 0,
+    'row_batch_size': 1000,     # lignes lues et validées par bloc
+    'lookup_batch_size': 1000,  # clés par requête IN (...)
+    'insert_batch_size': 500,   # lignes par INSERT multi-lignes
+    'bcrypt_rounds': int(os.getenv('CSV_BCRYPT_ROUNDS', 12)),  # coût bcrypt des imports
+    # Même budget par défaut que les connexions (LOGIN_HASH_WORKERS): la moitié des cœurs
+    'hash_workers': int(os.getenv('CSV_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2))),
+    'hash_executor': os.getenv('CSV_HASH_EXECUTOR', 'thread')  # 'thread' ou 'process'
 }
 
 def process_csv(csv_data, actor_role=None):
     """Gère l'importation de données massives pour les administrateurs"""
     try:
         # Détection du type de CSV
-        reader = csv.DictReader(io.StringIO(csv_data))
+        reader = _csv_reader(csv_data)
         fieldnames = [fn.lower() for fn in reader.fieldnames]
         
         if all(field in fieldnames for field in CSV_CONFIG['user_required_fields']):
@@ -40,65 +49,89 @@ def process_csv(csv_data, actor_role=None):
         }
 
 def process_grades_csv(csv_data, teacher_id):
-    """Gère l'importation de notes par les enseignants"""
-    conn = db_connection()
+    """Gère l'importation de notes par les enseignants
+
+    `csv_data` est une chaîne ou un flux texte. Les lignes sont traitées
+    par blocs dans une transaction unique, annulée si une erreur est détectée.
+    """
+    conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     
     try:
-        reader = csv.DictReader(io.StringIO(csv_data))
+        reader = _csv_reader(csv_data)
         reader.fieldnames = [fn.lower() for fn in reader.fieldnames]
         
         # Validation des entrées
         if not all(field in reader.fieldnames for field in CSV_CONFIG['grade_required_fields']):
             raise ValueError("En-têtes CSV manquants")
 
-        grades_to_insert = []
+        students = {}
+        subjects = {}
+        aggregates = grade_aggregates.AggregateBatch()
+        touched_students = set()
         errors = []
+        inserted = 0
+        evaluation_date = datetime.now().date()
         
-        for idx, row in enumerate(reader, start=2):  # Ligne 1 = en-têtes
-            try:
-                # Validation de la note
-                grade = float(row['grade'])
-                if not CSV_CONFIG['min_grade'] <= grade <= CSV_CONFIG['max_grade']:
-                    raise ValueError(f"Note invalide ({CSV_CONFIG['min_grade']}-{CSV_CONFIG['max_grade']})")
+        for chunk in _chunks(enumerate(reader, start=2), CSV_CONFIG['row_batch_size']):  # Ligne 1 = en-têtes
+            # Validation des notes en mémoire
+            rows = []
+            for idx, row in chunk:
+                try:
+                    # Ligne courte: les champs absents valent None
+                    if any(row.get(field) is None for field in CSV_CONFIG['grade_required_fields']):
+                        raise ValueError("Champs manquants")
+                    grade = float(row['grade'])
+                    if not CSV_CONFIG['min_grade'] <= grade <= CSV_CONFIG['max_grade']:
+                        raise ValueError(f"Note invalide ({CSV_CONFIG['min_grade']}-{CSV_CONFIG['max_grade']})")
+                    rows.append((idx, row, grade))
+                except Exception as e:
+                    errors.append({'ligne': idx, 'erreur': str(e), 'donnees': row})
 
-                # Récupération ID étudiant
-                cursor.execute(
-                    "SELECT id FROM users WHERE email = %s AND role = 'student'",
-                    (row['student_email'].lower(),)
-                )
-                student = cursor.fetchone()
-                if not student:
-                    raise ValueError("Étudiant non trouvé")
+            # Résolution groupée des étudiants et des matières de l'enseignant
+            _resolve_ids(
+                cursor, students,
+                "SELECT id, email AS lookup_key FROM users WHERE role = 'student' AND email IN ({})",
+                {row['student_email'].lower() for _, row, _ in rows}
+            )
+            _resolve_ids(
+                cursor, subjects,
+                "SELECT id, name AS lookup_key FROM subjects WHERE teacher_id = %s AND name IN ({})",
+                {row['subject_name'].strip().lower() for _, row, _ in rows},
+                (teacher_id,)
+            )
 
-                # Vérification association matière/enseignant
-                cursor.execute(
-                    """SELECT s.id 
-                    FROM subjects s
-                    WHERE s.name = %s AND s.teacher_id = %s""",
-                    (row['subject_name'].strip(), teacher_id)
-                )
-                subject = cursor.fetchone()
-                if not subject:
-                    raise ValueError("Matière non attribuée à l'enseignant")
-
-                grades_to_insert.append((
-                    student['id'],
-                    subject['id'],
-                    grade,
-                    row['comments'][:255],  # Troncature des commentaires
-                    datetime.now().date()
-                ))
+            grades_to_insert = []
+            for idx, row, grade in rows:
+                student_id = students.get(row['student_email'].lower())
+                subject_id = subjects.get(row['subject_name'].strip().lower())
+                if student_id is None:
+                    errors.append({'ligne': idx, 'erreur': "Étudiant non trouvé", 'donnees': row})
+                elif subject_id is None:
+                    errors.append({'ligne': idx, 'erreur': "Matière non attribuée à l'enseignant", 'donnees': row})
+                else:
+                    grades_to_insert.append((
+                        student_id,
+                        subject_id,
+                        grade,
+                        row['comments'][:255],  # Troncature des commentaires
+                        evaluation_date
+                    ))
 
-            except Exception as e:
-                errors.append({
-                    'ligne': idx,
-                    'erreur': str(e),
-                    'donnees': row
-                })
+            # Une fois une erreur détectée l'import sera annulé: inutile d'insérer
+            if not errors:
+                inserted += _insert_rows(
+                    cursor,
+                    "INSERT INTO grades (student_id, subject_id, grade, comments, evaluation_date) VALUES {}",
+                    grades_to_insert
+                )
+                aggregates.add(values[:3] for values in grades_to_insert)
+                touched_students.update(values[0] for values in grades_to_insert)
 
-        # Insertion en masse si aucune erreur
+        # Validation globale: tout ou rien
         if errors:
+            conn.rollback()
+            errors.sort(key=lambda e: e['ligne'])
             return {
                 'success': False,
                 'message': f"{len(errors)} erreurs détectées",
@@ -106,17 +139,14 @@ def process_grades_csv(csv_data, teacher_id):
                 'inserted': 0
             }
 
-        cursor.executemany(
-            """INSERT INTO grades 
-            (student_id, subject_id, grade, comments, evaluation_date)
-            VALUES (%s, %s, %s, %s, %s)""",
-            grades_to_insert
-        )
+        # Agrégats (lignes de classe partagées) écrits en fin d'import seulement
+        touched_classes = aggregates.flush(cursor)
         conn.commit()
+        touch_students(conn, touched_students, touched_classes)
 
         return {
             'success': True,
-            'inserted': cursor.rowcount,
+            'inserted': inserted,
             'errors': []
         }
 
@@ -124,58 +154,162 @@ def process_grades_csv(csv_data, teacher_id):
         cursor.close()
         conn.close()
 
+def _csv_reader(csv_data):
+    """Crée un DictReader sur une chaîne ou sur un flux texte"""
+    if isinstance(csv_data, str):
+        csv_data = io.StringIO(csv_data)
+    return csv.DictReader(csv_data)
+
+def _chunks(items, size):
+    """Découpe un itérable en listes de `size` éléments, sans le matérialiser"""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _resolve_ids(cursor, cache, query, keys, params=()):
+    """Complète `cache` pour les clés pas encore résolues (None si introuvable)"""
+    missing = [key for key in keys if key not in cache]
+    cache.update(dict.fromkeys(missing))
+    cache.update(_lookup_ids(cursor, query, missing, params))
+
+def _lookup_ids(cursor, query, keys, params=(), exact_fallback=True):
+    """Résout des clés en identifiants via des requêtes IN (...) groupées
+
+    La requête doit sélectionner `id` et `lookup_key` (la valeur de la
+    colonne) et contenir un `{}` remplacé par les marqueurs du IN; `params`
+    précède les clés. La correspondance suit la collation de la colonne
+    (casse, accents, espaces finaux selon la table), que Python ne sait pas
+    reproduire: les valeurs renvoyées sont rapprochées des clés sans casse,
+    puis, avec `exact_fallback`, chaque clé restée sans correspondance est
+    recherchée seule, la base décidant alors de l'égalité. Pour une clé
+    ambiguë, le plus petit id est retenu.
+    """
+    found = {}
+    for chunk in _chunks(keys, CSV_CONFIG['lookup_batch_size']):
+        cursor.execute(
+            query.format(', '.join(['%s'] * len(chunk))) + " ORDER BY id",
+            tuple(params) + tuple(chunk)
+        )
+        for record in cursor.fetchall():
+            found.setdefault(record['lookup_key'].lower(), record['id'])
+    for key in keys if exact_fallback else ():
+        if key not in found:
+            cursor.execute(query.format('%s') + " ORDER BY id LIMIT 1", tuple(params) + (key,))
+            record = cursor.fetchone()
+            if record is not None:
+                found[key] = record['id']
+    return found
+
+def _insert_rows(cursor, query, rows):
+    """Insère des lignes par requêtes INSERT multi-lignes de taille bornée
+
+    La requête contient un `{}` remplacé par la liste des tuples VALUES.
+    Retourne le nombre de lignes insérées.
+    """
+    inserted = 0
+    for chunk in _chunks(rows, CSV_CONFIG['insert_batch_size']):
+        placeholders = '(' + ', '.join(['%s'] * len(chunk[0])) + ')'
+        cursor.execute(
+            query.format(', '.join([placeholders] * len(chunk))),
+            tuple(value for row in chunk for value in row)
+        )
+        inserted += cursor.rowcount
+    return inserted
+
+def _hash_password(password, rounds):
+    """Hache un mot de passe (fonction de module pour rester sérialisable)"""
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+def _hash_passwords(passwords):
+    """Hache une liste de mots de passe en parallèle
+
+    bcrypt libère le GIL pendant le calcul: un pool de threads suffit à
+    occuper les cœurs alloués. Le pool de processus reste disponible via
+    CSV_CONFIG['hash_executor'] = 'process'.
+    """
+    rounds = CSV_CONFIG['bcrypt_rounds']
+    if len(passwords) < 2:
+        return [_hash_password(password, rounds) for password in passwords]
+    with _hash_pool.executor() as executor:
+        return list(executor.map(_hash_password, passwords, [rounds] * len(passwords)))
+
+_hash_pool = LazyPool(CSV_CONFIG['hash_workers'], processes=CSV_CONFIG['hash_executor'] == 'process',
+                      name='csv-bcrypt')
+
 def _process_user_csv(reader):
     """Traitement spécifique pour les imports d'utilisateurs"""
-    conn = db_connection()
-    cursor = conn.cursor()
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
     
     try:
         inserted = 0
         errors = []
+        touched_classes = set()
+        seen_usernames = set()
+        seen_emails = set()
         
-        for idx, row in enumerate(reader, start=2):
-            try:
+        for chunk in _chunks(enumerate(reader, start=2), CSV_CONFIG['row_batch_size']):
+            candidates = []
+            for idx, row in chunk:
                 # Validation des données
                 if not all(row.values()):
-                    raise ValueError("Champs manquants")
+                    errors.append({'ligne': idx, 'erreur': "Champs manquants", 'donnees': row})
+                    continue
+                username, email = row['username'].lower(), row['email'].lower()
+                if username in seen_usernames or email in seen_emails:
+                    errors.append({'ligne': idx, 'erreur': "Doublon détecté", 'donnees': row})
+                    continue
+                seen_usernames.add(username)
+                seen_emails.add(email)
+                candidates.append((idx, row))
 
-                # Hachage du mot de passe
-                hashed_pw = bcrypt.hashpw(
-                    row['password'].encode(), 
-                    bcrypt.gensalt()
-                ).decode()
+            # Détection groupée des doublons déjà présents en base
+            existing_usernames = _lookup_ids(
+                cursor, "SELECT id, username AS lookup_key FROM users WHERE username IN ({})",
+                [row['username'].lower() for _, row in candidates],
+                # Pré-filtre: les doublons au sens de la collation sont rejetés
+                # par l'index unique à l'insertion (reprise ligne par ligne)
+                exact_fallback=False
+            )
+            existing_emails = _lookup_ids(
+                cursor, "SELECT id, email AS lookup_key FROM users WHERE email IN ({})",
+                [row['email'].lower() for _, row in candidates],
+                exact_fallback=False
+            )
+            pending = []
+            for idx, row in candidates:
+                if row['username'].lower() in existing_usernames or row['email'].lower() in existing_emails:
+                    errors.append({'ligne': idx, 'erreur': "Doublon détecté", 'donnees': row})
+                else:
+                    pending.append((idx, row))
 
-                # Insertion utilisateur
-                cursor.execute(
-                    """INSERT INTO users 
-                    (username, password_hash, role, nom, prenom, email, class_id)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                    (
-                        row['username'].lower(),
-                        hashed_pw,
-                        row['role'].lower(),
-                        row['nom'].strip().title(),
-                        row['prenom'].strip().title(),
-                        row['email'].lower(),
-                        row.get('class_id')  # Optionnel
-                    )
-                )
-                inserted += 1
-
-            except mysql.connector.IntegrityError as e:
-                errors.append({
-                    'ligne': idx,
-                    'erreur': "Doublon détecté",
-                    'donnees': row
-                })
-            except Exception as e:
-                errors.append({
-                    'ligne': idx,
-                    'erreur': str(e),
-                    'donnees': row
-                })
+            # Hachage parallèle des mots de passe
+            hashed_passwords = _hash_passwords([row['password'] for _, row in pending])
+            users_to_insert = [
+                (idx, row, (
+                    row['username'].lower(),
+                    hashed_pw,
+                    row['role'].lower(),
+                    row['nom'].strip().title(),
+                    row['prenom'].strip().title(),
+                    row['email'].lower(),
+                    row.get('class_id')  # Optionnel
+                ))
+                for (idx, row), hashed_pw in zip(pending, hashed_passwords)
+            ]
+            inserted += _insert_users(cursor, users_to_insert, errors)
+            touched_classes.update(values[6] for _, _, values in users_to_insert if values[6])
 
         conn.commit()
+        # Les effectifs des classes figurent dans les rapports de classe
+        if touched_classes:
+            data_versions.bump('class', *touched_classes)
+        if inserted:
+            data_versions.bump('users')
+        errors.sort(key=lambda e: e['ligne'])
         
         return {
             'success': len(errors) == 0,
@@ -187,9 +321,29 @@ def _process_user_csv(reader):
         cursor.close()
         conn.close()
 
+def _insert_users(cursor, users_to_insert, errors):
+    """Insère les utilisateurs par lots; en cas d'échec d'un lot, reprise
+    ligne par ligne pour attribuer l'erreur à la bonne ligne"""
+    query = "INSERT INTO users (username, password_hash, role, nom, prenom, email, class_id) VALUES {}"
+    inserted = 0
+    for chunk in _chunks(users_to_insert, CSV_CONFIG['insert_batch_size']):
+        try:
+            inserted += _insert_rows(cursor, query, [values for _, _, values in chunk])
+            continue
+        except mysql.connector.Error:
+            pass
+        for idx, row, values in chunk:
+            try:
+                inserted += _insert_rows(cursor, query, [values])
+            except mysql.connector.IntegrityError:
+                errors.append({'ligne': idx, 'erreur': "Doublon détecté", 'donnees': row})
+            except Exception as e:
+                errors.append({'ligne': idx, 'erreur': str(e), 'donnees': row})
+    return inserted
+
 def _process_class_csv(reader):
     """Traitement spécifique pour les imports de classes"""
-    conn = db_connection()
+    conn = get_connection()
     cursor = conn.cursor()
     
     try:
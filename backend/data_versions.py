@@ -0,0 +1,35 @@
+# data_versions.py
+import threading
+import time
+import uuid
+
+# Identifiant propre au processus: les versions d'un démarrage précédent
+# (ex. rapports en cache sur disque) ne peuvent pas être confondues
+_EPOCH = uuid.uuid4().hex[:8]
+_versions = {}
+_written_at = {}  # (scope, id) -> instant (monotonic) de la dernière écriture
+_lock = threading.Lock()
+
+def version(scope: str, entity_id=None) -> str:
+    """Version courante des données d'une entité ('student', 'class'...)"""
+    with _lock:
+        return f"{_EPOCH}.{_versions.get((scope, str(entity_id)), 0)}"
+
+def bump(scope: str, *entity_ids):
+    """Signale une écriture: fait avancer la version des entités données
+
+    Sans identifiant, c'est la version globale du scope (entity_id=None,
+    comme `version(scope)`) qui avance.
+    """
+    now = time.monotonic()
+    with _lock:
+        for entity_id in entity_ids or (None,):
+            key = (scope, str(entity_id))
+            _versions[key] = _versions.get(key, 0) + 1
+            _written_at[key] = now
+
+def written_within(scope: str, entity_id=None, seconds: float = 0) -> bool:
+    """Indique si l'entité a été modifiée (par ce processus) depuis moins de `seconds`"""
+    with _lock:
+        written_at = _written_at.get((scope, str(entity_id)))
+    return written_at is not None and time.monotonic() - written_at < seconds
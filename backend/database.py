@@ -2,16 +2,192 @@
 import mysql.connector
 import logging
 import os
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
 from typing import Optional, Dict, Union
-from config import DB_CONFIG
+from config import DB_CONFIG, DB_POOL_CONFIG
+import data_versions
+import grade_aggregates
+import migrations
 
 logger = logging.getLogger(__name__)
 
+class PoolTimeout(mysql.connector.Error):
+    """Aucune connexion disponible dans le délai imparti"""
+    pass
+
+class PooledConnection:
+    """Connexion empruntée au pool: close() la restitue au lieu de la fermer"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise mysql.connector.InterfaceError("Connexion déjà restituée au pool")
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+class ConnectionPool:
+    """Pool de connexions MySQL partagé par tout le processus
+
+    - `size` connexions sont conservées au repos, jusqu'à `max_overflow`
+      connexions supplémentaires peuvent être ouvertes en pointe
+    - une connexion restée inactive plus de `ping_after` secondes est
+      vérifiée (ping) avant d'être prêtée
+    - une connexion inactive depuis plus de `recycle` secondes est rouverte
+    """
+
+    def __init__(self, config, size=10, max_overflow=10, timeout=5,
+                 ping_after=5, recycle=1800):
+        self._config = config
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.recycle = recycle
+        self._idle = deque()  # (connexion, instant de restitution)
+        self._opened = 0
+        self._cond = threading.Condition()
+        self._counters = {
+            'checkouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'failed_checks': 0,
+            'waits': 0,
+            'timeouts': 0
+        }
+
+    def acquire(self) -> PooledConnection:
+        """Emprunte une connexion saine au pool"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._opened >= self.size + self.max_overflow:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters['timeouts'] += 1
+                        raise PoolTimeout("Pool de connexions MySQL épuisé")
+                    self._counters['waits'] += 1
+                    self._cond.wait(remaining)
+                self._counters['checkouts'] += 1
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                else:
+                    conn, released_at = None, None
+                    self._opened += 1
+
+            if conn is None:
+                return PooledConnection(self, self._connect())
+            conn = self._check(conn, time.monotonic() - released_at)
+            if conn is not None:
+                return PooledConnection(self, conn)
+
+    def release(self, conn):
+        """Restitue une connexion; les connexions en surnombre ou invalides sont fermées"""
+        healthy = True
+        try:
+            if conn.unread_result or not conn.is_connected():
+                healthy = False
+            elif conn.in_transaction:
+                conn.rollback()
+        except mysql.connector.Error:
+            healthy = False
+
+        with self._cond:
+            if healthy and len(self._idle) < self.size:
+                self._idle.append((conn, time.monotonic()))
+                conn = None
+            else:
+                self._opened -= 1
+            self._cond.notify()
+        if conn is not None:
+            self._close_quietly(conn)
+
+    def stats(self) -> dict:
+        """Statistiques du pool"""
+        with self._cond:
+            return {
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'opened': self._opened,
+                'idle': len(self._idle),
+                'in_use': self._opened - len(self._idle),
+                **self._counters
+            }
+
+    def _connect(self):
+        try:
+            conn = mysql.connector.connect(**self._config)
+        except mysql.connector.Error:
+            with self._cond:
+                self._opened -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._counters['created'] += 1
+        return conn
+
+    def _check(self, conn, idle_for):
+        """Vérifie une connexion inactive; retourne None si elle a été écartée"""
+        try:
+            if idle_for > self.recycle:
+                with self._cond:
+                    self._counters['recycled'] += 1
+                self._close_quietly(conn)
+                return self._connect_replacement()
+            if idle_for > self.ping_after:
+                conn.ping(reconnect=False)
+            return conn
+        except mysql.connector.Error:
+            with self._cond:
+                self._counters['failed_checks'] += 1
+                self._opened -= 1
+                self._cond.notify()
+            self._close_quietly(conn)
+            return None
+
+    def _connect_replacement(self):
+        conn = mysql.connector.connect(**self._config)
+        with self._cond:
+            self._counters['created'] += 1
+        return conn
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except mysql.connector.Error:
+            pass
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Retourne le pool du processus courant (recréé après un fork)"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool(DB_CONFIG, **DB_POOL_CONFIG)
+            _pool_pid = os.getpid()
+        return _pool
+
+def get_connection() -> PooledConnection:
+    """Emprunte une connexion au pool; close() la restitue"""
+    return get_pool().acquire()
+
 @contextmanager
 def db_connection():
     """Contexte de connexion MySQL avec gestion automatique"""
-    conn = mysql.connector.connect(**DB_CONFIG)
+    conn = get_connection()
     try:
         yield conn
     except mysql.connector.Error as e:
@@ -21,6 +197,35 @@ def db_connection():
     finally:
         conn.close()
 
+def touch_students(conn, student_ids, class_ids=None):
+    """Fait avancer la version des données des étudiants et de leurs classes
+
+    À appeler après le commit d'une écriture de notes: les rapports en cache
+    des entités concernées ne seront plus servis. `class_ids`, si les classes
+    sont déjà connues (ex. retour de `record_grades`), évite leur recherche.
+    """
+    student_ids = list(student_ids)
+    if not student_ids:
+        return
+    data_versions.bump('student', *student_ids)
+    if class_ids is not None:
+        if class_ids:
+            data_versions.bump('class', *class_ids)
+        return
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(student_ids), 1000):
+            chunk = student_ids[start:start + 1000]
+            cursor.execute(
+                f"SELECT DISTINCT class_id FROM users WHERE class_id IS NOT NULL AND id IN ({', '.join(['%s'] * len(chunk))})",
+                tuple(chunk)
+            )
+            class_ids = [row[0] for row in cursor.fetchall()]
+            if class_ids:
+                data_versions.bump('class', *class_ids)
+    finally:
+        cursor.close()
+
 def init_db():
     """Initialise la structure de la base de données"""
     with db_connection() as conn:
@@ -111,6 +316,11 @@ def init_db():
         ''')
         conn.commit()
 
+        # Index, tables ajoutées et reprises de données: migrations versionnées
+        applied = migrations.migrate(conn)
+        if applied:
+            logger.info(f"Migrations appliquées: {applied}")
+
 def add_user(
     username: str, 
     password_hash: str, 
@@ -130,6 +340,7 @@ def add_user(
                 VALUES (%s, %s, %s, %s, %s, %s, %s)
             ''', (username, password_hash, role.lower(), nom, prenom, email, class_id))
             conn.commit()
+            data_versions.bump('users')
             return cursor.lastrowid
         except mysql.connector.IntegrityError as e:
             logger.warning(f"Doublon utilisateur: {username}")
@@ -198,8 +409,11 @@ def add_grade(student_id: int, subject_id: int, grade: float, comments: str = ""
                 INSERT INTO grades (student_id, subject_id, grade, comments)
                 VALUES (%s, %s, %s, %s)
             ''', (student_id, subject_id, grade, comments))
+            grade_id = cursor.lastrowid
+            class_ids = grade_aggregates.record_grades(cursor, [(student_id, subject_id, grade)])
             conn.commit()
-            return cursor.lastrowid
+            touch_students(conn, [student_id], class_ids)
+            return grade_id
         except mysql.connector.Error as e:
             logger.error(f"Erreur ajout note: {str(e)}")
             raise
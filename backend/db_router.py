@@ -0,0 +1,159 @@
+# db_router.py
+import itertools
+import logging
+import os
+import threading
+import time
+import mysql.connector
+import data_versions
+from config import DB_REPLICAS, DB_POOL_CONFIG, REPLICA_CONFIG
+from database import ConnectionPool, get_connection
+
+logger = logging.getLogger(__name__)
+
+class _Replica:
+    def __init__(self, config):
+        self.name = f"{config['host']}:{config['port']}"
+        self.pool = ConnectionPool(config, **DB_POOL_CONFIG)
+        self.lag = None          # secondes de retard, None si inconnu
+        self.checked_at = None   # instant (monotonic) de la dernière mesure
+        self.error = None
+
+class ReadRouter:
+    """Répartition des lectures entre réplicas et primaire
+
+    Une lecture va sur un réplica (tour à tour) dont le retard mesuré est
+    au plus `max_lag` secondes; sinon, ou si aucun réplica n'est configuré
+    ou joignable, sur le primaire. Sont aussi servies par le primaire,
+    pendant `sticky_seconds`:
+    - les lectures d'un utilisateur qui vient d'écrire (read-your-writes);
+    - les lectures d'entités récemment modifiées (data_versions), pour
+      qu'un rapport mis en cache sous une nouvelle version ne soit pas
+      rendu depuis des données en retard.
+    """
+
+    def __init__(self, replicas, max_lag=5, check_interval=2, sticky_seconds=10):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        self._replicas = [_Replica(config) for config in replicas]
+        self._cycle = itertools.cycle(self._replicas) if self._replicas else None
+        self._writers = {}  # user_id -> instant de la dernière écriture
+        self._lock = threading.Lock()
+        self._counters = {'replica_reads': 0, 'primary_reads': 0, 'sticky_reads': 0, 'fallbacks': 0}
+
+    def note_write(self, user_id):
+        """Les lectures de `user_id` iront sur le primaire pendant sticky_seconds"""
+        now = time.monotonic()
+        with self._lock:
+            self._writers[str(user_id)] = now
+            # Purge des entrées expirées pour borner la table
+            if len(self._writers) > 10000:
+                limit = now - self.sticky_seconds
+                self._writers = {k: t for k, t in self._writers.items() if t >= limit}
+
+    def connection(self, user_id=None, entities=()):
+        """Emprunte une connexion de lecture; `entities`: [(scope, id)] lues"""
+        if not self._replicas:
+            return self._primary('primary_reads')
+        if self._is_sticky(user_id, entities):
+            return self._primary('sticky_reads')
+        for _ in range(len(self._replicas)):
+            with self._lock:
+                replica = next(self._cycle)
+            if not self._healthy(replica):
+                continue
+            try:
+                conn = replica.pool.acquire()
+            except mysql.connector.Error as e:
+                self._mark_down(replica, e)
+                continue
+            self._count('replica_reads')
+            return conn
+        return self._primary('fallbacks')
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'replicas': [
+                    {'name': r.name, 'lag': r.lag, 'error': r.error, 'pool': r.pool.stats()}
+                    for r in self._replicas
+                ],
+                'max_lag': self.max_lag,
+                **self._counters
+            }
+
+    def _primary(self, counter):
+        self._count(counter)
+        return get_connection()
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _is_sticky(self, user_id, entities):
+        if user_id is not None:
+            with self._lock:
+                written_at = self._writers.get(str(user_id))
+            if written_at is not None and time.monotonic() - written_at < self.sticky_seconds:
+                return True
+        return any(data_versions.written_within(scope, entity_id, self.sticky_seconds)
+                   for scope, entity_id in entities)
+
+    def _healthy(self, replica):
+        """Retard du réplica acceptable (mesuré au plus toutes les check_interval s)"""
+        with self._lock:
+            fresh = replica.checked_at is not None and time.monotonic() - replica.checked_at < self.check_interval
+            if fresh:
+                return replica.lag is not None and replica.lag <= self.max_lag
+            # Une seule mesure à la fois: les autres utilisent la précédente
+            replica.checked_at = time.monotonic()
+        try:
+            replica.lag = self._measure_lag(replica)
+            replica.error = None if replica.lag is not None else "Réplication arrêtée ou non configurée"
+        except mysql.connector.Error as e:
+            self._mark_down(replica, e)
+        return replica.lag is not None and replica.lag <= self.max_lag
+
+    @staticmethod
+    def _measure_lag(replica):
+        conn = replica.pool.acquire()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except mysql.connector.ProgrammingError:
+                cursor.execute("SHOW SLAVE STATUS")  # MySQL < 8.0.22
+            status = cursor.fetchone()
+            cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+        if not status:
+            return None
+        lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+        return float(lag) if lag is not None else None
+
+    def _mark_down(self, replica, error):
+        logger.warning(f"Réplica {replica.name} indisponible: {str(error)}")
+        with self._lock:
+            replica.lag = None
+            replica.error = str(error)
+            replica.checked_at = time.monotonic()
+
+_router = None
+_router_pid = None
+_router_lock = threading.Lock()
+
+def get_router() -> ReadRouter:
+    """Retourne le routeur du processus courant (recréé après un fork)"""
+    global _router, _router_pid
+    with _router_lock:
+        if _router is None or _router_pid != os.getpid():
+            _router = ReadRouter(DB_REPLICAS, **REPLICA_CONFIG)
+            _router_pid = os.getpid()
+        return _router
+
+def get_read_connection(user_id=None, entities=()):
+    """Connexion pour une lecture tolérant un léger retard; close() la restitue"""
+    return get_router().connection(user_id, entities)
@@ -0,0 +1,199 @@
+# grade_aggregates.py
+"""Agrégats de notes tenus à jour à chaque écriture
+
+grade_aggregates: par étudiant et matière; class_grade_aggregates: par classe
+(classe de l'étudiant au moment de la note). Chacun conserve nombre, somme,
+somme des carrés, minimum et maximum: moyenne et écart-type s'en déduisent
+sans parcourir `grades`.
+
+Reconstruction complète (après une dérive, une suppression manuelle...):
+    python grade_aggregates.py
+"""
+from decimal import Decimal
+
+_LOOKUP_BATCH = 1000
+_UPSERT_BATCH = 500
+
+_UPDATE_CLAUSE = """
+    grade_count = grade_count + VALUES(grade_count),
+    grade_sum = grade_sum + VALUES(grade_sum),
+    grade_sumsq = grade_sumsq + VALUES(grade_sumsq),
+    grade_min = LEAST(grade_min, VALUES(grade_min)),
+    grade_max = GREATEST(grade_max, VALUES(grade_max))
+"""
+
+STUDENT_TABLE = '''
+    CREATE TABLE IF NOT EXISTS grade_aggregates (
+        student_id INT NOT NULL,
+        subject_id INT NOT NULL,
+        grade_count INT NOT NULL,
+        grade_sum DECIMAL(12,2) NOT NULL,
+        grade_sumsq DECIMAL(16,4) NOT NULL,
+        grade_min DECIMAL(4,2) NOT NULL,
+        grade_max DECIMAL(4,2) NOT NULL,
+        PRIMARY KEY (student_id, subject_id),
+        INDEX idx_subject (subject_id),
+        FOREIGN KEY (student_id)
+            REFERENCES users(id)
+            ON DELETE CASCADE,
+        FOREIGN KEY (subject_id)
+            REFERENCES subjects(id)
+            ON DELETE CASCADE
+    ) ENGINE=InnoDB
+'''
+
+CLASS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS class_grade_aggregates (
+        class_id INT PRIMARY KEY,
+        grade_count INT NOT NULL,
+        grade_sum DECIMAL(14,2) NOT NULL,
+        grade_sumsq DECIMAL(18,4) NOT NULL,
+        grade_min DECIMAL(4,2) NOT NULL,
+        grade_max DECIMAL(4,2) NOT NULL,
+        FOREIGN KEY (class_id)
+            REFERENCES classes(id)
+            ON DELETE CASCADE
+    ) ENGINE=InnoDB
+'''
+
+def _fold(totals, key, grade):
+    entry = totals.get(key)
+    if entry is None:
+        totals[key] = [1, grade, grade * grade, grade, grade]
+    else:
+        entry[0] += 1
+        entry[1] += grade
+        entry[2] += grade * grade
+        entry[3] = min(entry[3], grade)
+        entry[4] = max(entry[4], grade)
+
+def _upsert(cursor, table, key_columns, totals):
+    columns = key_columns + ('grade_count', 'grade_sum', 'grade_sumsq', 'grade_min', 'grade_max')
+    # Ordre des clés constant: deux transactions verrouillent les lignes dans
+    # le même ordre et ne peuvent pas s'interbloquer
+    rows = [(*(key if isinstance(key, tuple) else (key,)), *values) for key, values in sorted(totals.items())]
+    placeholder = f"({', '.join(['%s'] * len(columns))})"
+    for start in range(0, len(rows), _UPSERT_BATCH):
+        chunk = rows[start:start + _UPSERT_BATCH]
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([placeholder] * len(chunk))} "
+            f"ON DUPLICATE KEY UPDATE {_UPDATE_CLAUSE}",
+            tuple(value for row in chunk for value in row)
+        )
+
+class AggregateBatch:
+    """Notes d'une transaction, reportées dans les agrégats juste avant le commit
+
+    La ligne d'agrégat d'une classe est partagée par toutes les écritures
+    de notes de la classe: l'écrire en fin de transaction (et non au fil
+    d'un import) limite la durée du verrou.
+    """
+
+    def __init__(self):
+        self._per_subject = {}
+        self._students = set()
+
+    def add(self, grades):
+        """Ajoute des notes (student_id, subject_id, note); les notes NULL sont
+        ignorées, comme dans `rebuild()`"""
+        for student_id, subject_id, grade in grades:
+            self._students.add(student_id)
+            if grade is None:
+                continue
+            _fold(self._per_subject, (student_id, subject_id), Decimal(str(grade)))
+
+    def flush(self, cursor) -> set:
+        """Écrit les agrégats (avant le commit); retourne les classes des étudiants concernés"""
+        per_subject, self._per_subject = self._per_subject, {}
+        students, self._students = self._students, set()
+        if not students:
+            return set()
+        class_of = student_classes(cursor, students)
+
+        per_class = {}
+        for (student_id, _), (count, total, sumsq, low, high) in per_subject.items():
+            class_id = class_of.get(student_id)
+            if class_id is None:
+                continue
+            entry = per_class.get(class_id)
+            if entry is None:
+                per_class[class_id] = [count, total, sumsq, low, high]
+            else:
+                entry[0] += count
+                entry[1] += total
+                entry[2] += sumsq
+                entry[3] = min(entry[3], low)
+                entry[4] = max(entry[4], high)
+
+        _upsert(cursor, 'grade_aggregates', ('student_id', 'subject_id'), per_subject)
+        _upsert(cursor, 'class_grade_aggregates', ('class_id',), per_class)
+        return set(class_of.values())
+
+def student_classes(cursor, student_ids) -> dict:
+    """Classe de chaque étudiant (ceux sans classe sont absents)"""
+    student_ids = list(student_ids)
+    class_of = {}
+    for start in range(0, len(student_ids), _LOOKUP_BATCH):
+        chunk = student_ids[start:start + _LOOKUP_BATCH]
+        cursor.execute(
+            f"SELECT id, class_id FROM users WHERE class_id IS NOT NULL AND id IN ({', '.join(['%s'] * len(chunk))})",
+            tuple(chunk)
+        )
+        for row in cursor.fetchall():
+            if isinstance(row, dict):
+                row = (row['id'], row['class_id'])
+            class_of[row[0]] = row[1]
+    return class_of
+
+def record_grades(cursor, grades) -> set:
+    """Ajoute des notes (student_id, subject_id, note) aux agrégats
+
+    À appeler dans la transaction qui insère les notes, juste avant le
+    commit. Retourne les classes des étudiants concernés.
+    """
+    batch = AggregateBatch()
+    batch.add(grades)
+    return batch.flush(cursor)
+
+def rebuild(conn):
+    """Recalcule tous les agrégats depuis `grades`; retourne (lignes étudiant, lignes classe)"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM grade_aggregates")
+        cursor.execute("""
+            INSERT INTO grade_aggregates
+                (student_id, subject_id, grade_count, grade_sum, grade_sumsq, grade_min, grade_max)
+            SELECT student_id, subject_id, COUNT(*), SUM(grade), SUM(grade * grade), MIN(grade), MAX(grade)
+            FROM grades
+            WHERE grade IS NOT NULL
+            GROUP BY student_id, subject_id
+        """)
+        students = cursor.rowcount
+        cursor.execute("DELETE FROM class_grade_aggregates")
+        cursor.execute("""
+            INSERT INTO class_grade_aggregates
+                (class_id, grade_count, grade_sum, grade_sumsq, grade_min, grade_max)
+            SELECT u.class_id, SUM(a.grade_count), SUM(a.grade_sum), SUM(a.grade_sumsq),
+                   MIN(a.grade_min), MAX(a.grade_max)
+            FROM grade_aggregates a
+            JOIN users u ON a.student_id = u.id
+            WHERE u.class_id IS NOT NULL
+            GROUP BY u.class_id
+        """)
+        classes = cursor.rowcount
+        conn.commit()
+        return students, classes
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+if __name__ == '__main__':
+    from database import get_connection
+    conn = get_connection()
+    try:
+        students, classes = rebuild(conn)
+    finally:
+        conn.close()
+    print(f"Agrégats reconstruits: {students} étudiant/matière, {classes} classes")
@@ -0,0 +1,85 @@
+# http_pool.py
+import json
+import logging
+import queue
+import threading
+from http.server import HTTPServer
+
+logger = logging.getLogger(__name__)
+
+
+class PooledHTTPServer(HTTPServer):
+    """Serveur HTTP servant les requêtes via un pool de threads borné
+
+    Les connexions acceptées sont placées dans une file d'attente bornée
+    consommée par `workers` threads. Quand la file est pleine, la connexion
+    reçoit immédiatement une réponse 503 au lieu de s'accumuler.
+    """
+
+    def __init__(self, server_address, handler_class, workers=8, queue_size=64):
+        # Backlog du listen() aligné sur la taille de la file
+        self.request_queue_size = queue_size
+        super().__init__(server_address, handler_class)
+        self._pending = queue.Queue(maxsize=queue_size)
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"http-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._workers:
+            thread.start()
+
+    def process_request(self, request, client_address):
+        """Confie la connexion au pool au lieu de la traiter dans la boucle d'acceptation"""
+        try:
+            self._pending.put_nowait((request, client_address))
+        except queue.Full:
+            logger.warning(f"File d'attente HTTP pleine, connexion rejetée: {client_address}")
+            self._reject(request)
+
+    def _worker(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def _reject(self, request):
+        body = json.dumps({'error': 'Serveur surchargé'}).encode('utf-8')
+        try:
+            request.sendall(
+                b"HTTP/1.0 503 Service Unavailable\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Retry-After: 1\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+            )
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def stats(self) -> dict:
+        """Retourne l'état du pool (threads, connexions en attente)"""
+        return {
+            'workers': len(self._workers),
+            'queued': self._pending.qsize(),
+            'queue_size': self._pending.maxsize
+        }
+
+    def server_close(self):
+        super().server_close()
+        for _ in self._workers:
+            self._pending.put(None)
+        for thread in self._workers:
+            thread.join()
+
+
+def create_server(handler_class, host='0.0.0.0', port=8000, workers=8, queue_size=64):
+    """Crée le serveur HTTP: pool de threads si workers > 0, sinon mono-thread"""
+    if workers <= 0:
+        return HTTPServer((host, port), handler_class)
+    return PooledHTTPServer((host, port), handler_class, workers=workers, queue_size=queue_size)
@@ -0,0 +1,45 @@
+# json_stream.py
+import datetime
+import decimal
+import json
+
+
+def json_default(value):
+    """Sérialisation des types renvoyés par MySQL (DECIMAL, DATE, TIME...)"""
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        # Les colonnes TIME sont renvoyées sous forme de timedelta
+        seconds = int(value.total_seconds())
+        sign = '-' if seconds < 0 else ''
+        hours, rest = divmod(abs(seconds), 3600)
+        return f"{sign}{hours:02d}:{rest // 60:02d}:{rest % 60:02d}"
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', 'replace')
+    raise TypeError(f"Type non sérialisable en JSON: {type(value).__name__}")
+
+_encoder = json.JSONEncoder(default=json_default)
+
+def dumps(data) -> bytes:
+    return _encoder.encode(data).encode('utf-8')
+
+def iter_json_array(rows, chunk_size=64 * 1024):
+    """Encode un itérable de lignes en tableau JSON, par blocs d'environ `chunk_size` octets"""
+    parts = [b'[']
+    size = 1
+    first = True
+    for row in rows:
+        item = _encoder.encode(row).encode('utf-8')
+        if not first:
+            parts.append(b',')
+            size += 1
+        first = False
+        parts.append(item)
+        size += len(item)
+        if size >= chunk_size:
+            yield b''.join(parts)
+            parts, size = [], 0
+    parts.append(b']')
+    yield b''.join(parts)
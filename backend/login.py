@@ -0,0 +1,144 @@
+# login.py
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import bcrypt
+from config import LOGIN_CONFIG
+from database import get_connection
+
+logger = logging.getLogger(__name__)
+
+class LoginBusy(Exception):
+    """Trop de vérifications de mot de passe en attente"""
+    pass
+
+class PasswordChecker:
+    """Vérifications bcrypt confiées à un pool de threads dédié
+
+    bcrypt libère le GIL: `workers` borne le nombre de coeurs consacrés aux
+    connexions, les autres requêtes gardent le reste. Au-delà de
+    `max_pending` vérifications en attente, LoginBusy est levée plutôt que
+    d'accumuler les requêtes.
+    """
+
+    def __init__(self, workers=2, max_pending=64):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._counters = {'checks': 0, 'rejected': 0}
+
+    def check(self, password: str, password_hash: str) -> bool:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counters['rejected'] += 1
+                raise LoginBusy("Trop de connexions simultanées")
+            self._pending += 1
+            self._counters['checks'] += 1
+        try:
+            future = self._executor.submit(bcrypt.checkpw, password.encode(), password_hash.encode())
+            return future.result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'workers': self.workers, 'max_pending': self.max_pending,
+                    'pending': self._pending, **self._counters}
+
+class LastLoginRecorder:
+    """Écritures de `last_login` regroupées
+
+    Les connexions sont notées en mémoire et écrites toutes les
+    `flush_interval` secondes par un thread de fond, en un UPDATE multi-lignes
+    par lot de `batch_size` utilisateurs. En cas d'échec, les entrées sont
+    conservées pour le passage suivant.
+    """
+
+    def __init__(self, flush_interval=5.0, batch_size=500):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending = {}  # user_id -> date de connexion
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._counters = {'recorded': 0, 'written': 0, 'flushes': 0, 'errors': 0}
+
+    def record(self, user_id):
+        with self._lock:
+            self._pending[user_id] = datetime.now()
+            self._counters['recorded'] += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='last-login', daemon=True)
+                self._thread.start()
+
+    def flush(self):
+        """Écrit immédiatement les connexions en attente"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        items = list(pending.items())
+        conn = cursor = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            for start in range(0, len(items), self.batch_size):
+                batch = items[start:start + self.batch_size]
+                cases = " ".join(["WHEN %s THEN %s"] * len(batch))
+                ids = ",".join(["%s"] * len(batch))
+                params = [value for item in batch for value in item] + [user_id for user_id, _ in batch]
+                cursor.execute(
+                    f"UPDATE users SET last_login = CASE id {cases} END WHERE id IN ({ids})",
+                    params
+                )
+            conn.commit()
+            with self._lock:
+                self._counters['written'] += len(items)
+                self._counters['flushes'] += 1
+        except Exception as e:
+            logger.error(f"Échec d'écriture de last_login: {str(e)}")
+            # Remise en file avant le rollback, qui peut échouer sur une connexion perdue
+            with self._lock:
+                self._counters['errors'] += 1
+                # Une connexion plus récente l'emporte sur l'entrée remise en file
+                for user_id, logged_at in items:
+                    self._pending.setdefault(user_id, logged_at)
+            if conn is not None:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+            if conn is not None:
+                conn.close()
+
+    def stop(self):
+        """Arrête le thread de fond après une dernière écriture"""
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'pending': len(self._pending), 'flush_interval': self.flush_interval,
+                    **self._counters}
+
+    def _run(self):
+        while not self._wakeup.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Échec d'écriture de last_login: {str(e)}")
+
+password_checker = PasswordChecker(LOGIN_CONFIG['hash_workers'], LOGIN_CONFIG['max_pending'])
+last_logins = LastLoginRecorder(LOGIN_CONFIG['flush_interval'], LOGIN_CONFIG['batch_size'])
@@ -0,0 +1,100 @@
+# migrations.py
+"""Migrations de schéma versionnées
+
+`init_db` crée les tables absentes; les évolutions de schéma (index,
+nouvelles tables, reprises de données) sont des étapes numérotées,
+appliquées dans l'ordre au démarrage et enregistrées dans `schema_version`.
+Chaque étape est idempotente: une base où elle a été appliquée
+partiellement (ou à la main) peut la rejouer sans erreur.
+
+Ajouter une migration: écrire une fonction `_xxx(cursor, conn)` et
+l'ajouter en fin de MIGRATIONS avec le numéro suivant. Ne jamais
+renuméroter ni modifier une étape déjà déployée.
+"""
+import logging
+import grade_aggregates
+
+logger = logging.getLogger(__name__)
+
+# Verrou MySQL nommé: un seul processus migre à la fois
+_LOCK_NAME = 'academy_schema_migrations'
+_LOCK_TIMEOUT = 60
+
+def _ensure_index(cursor, table, name, definition):
+    """Crée l'index s'il n'existe pas (MySQL n'a pas de CREATE INDEX IF NOT EXISTS)"""
+    cursor.execute(
+        "SELECT 1 FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s LIMIT 1",
+        (table, name)
+    )
+    if cursor.fetchone() is None:
+        cursor.execute(f"ALTER TABLE {table} ADD {definition}")
+
+def _user_search_indexes(cursor, conn):
+    # Recherche d'utilisateurs: index de préfixe et plein texte
+    _ensure_index(cursor, 'users', 'idx_nom', 'INDEX idx_nom (nom)')
+    _ensure_index(cursor, 'users', 'idx_prenom', 'INDEX idx_prenom (prenom)')
+    _ensure_index(cursor, 'users', 'ft_users_search',
+                  'FULLTEXT INDEX ft_users_search (username, nom, prenom)')
+    # Effectifs par classe (jointures groupées de /api/classes et /api/subjects)
+    _ensure_index(cursor, 'users', 'idx_class_role', 'INDEX idx_class_role (class_id, role)')
+
+def _grade_aggregates(cursor, conn):
+    cursor.execute(grade_aggregates.STUDENT_TABLE)
+    cursor.execute(grade_aggregates.CLASS_TABLE)
+    conn.commit()
+    # Reprise des notes existantes
+    grade_aggregates.rebuild(conn)
+
+def _composite_indexes(cursor, conn):
+    # Notes d'un étudiant par matière et date (bulletins, rapports détaillés)
+    _ensure_index(cursor, 'grades', 'idx_student_subject_date',
+                  'INDEX idx_student_subject_date (student_id, subject_id, evaluation_date)')
+    # Résolution des matières d'un enseignant par nom (import CSV)
+    _ensure_index(cursor, 'subjects', 'idx_teacher_name', 'INDEX idx_teacher_name (teacher_id, name)')
+    # Listes filtrées par rôle (enseignants, étudiants d'une classe)
+    _ensure_index(cursor, 'users', 'idx_role_class', 'INDEX idx_role_class (role, class_id)')
+    # Résolution des étudiants par email (import CSV)
+    _ensure_index(cursor, 'users', 'idx_email_role', 'INDEX idx_email_role (email, role)')
+
+MIGRATIONS = [
+    (1, "Index de recherche d'utilisateurs et d'effectifs", _user_search_indexes),
+    (2, "Agrégats de notes", _grade_aggregates),
+    (3, "Index composites des requêtes fréquentes", _composite_indexes),
+]
+
+def migrate(conn) -> list:
+    """Applique les migrations manquantes; retourne les numéros appliqués"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                description VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB
+        ''')
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (_LOCK_NAME, _LOCK_TIMEOUT))
+        if cursor.fetchone()[0] != 1:
+            raise RuntimeError("Verrou de migration indisponible")
+        try:
+            cursor.execute("SELECT version FROM schema_version")
+            done = {row[0] for row in cursor.fetchall()}
+            applied = []
+            for version, description, step in MIGRATIONS:
+                if version in done:
+                    continue
+                logger.info(f"Migration {version}: {description}")
+                step(cursor, conn)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                    (version, description)
+                )
+                conn.commit()
+                applied.append(version)
+            return applied
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (_LOCK_NAME,))
+            cursor.fetchall()
+    finally:
+        cursor.close()
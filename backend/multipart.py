@@ -0,0 +1,155 @@
+# multipart.py
+import io
+from email.message import Message
+
+
+class MultipartError(ValueError):
+    """Corps multipart/form-data invalide"""
+    pass
+
+
+def parse_content_type(value):
+    """Retourne (type MIME, boundary) d'un en-tête Content-Type"""
+    msg = Message()
+    msg['Content-Type'] = value or ''
+    return msg.get_content_type(), msg.get_param('boundary')
+
+
+def _field_name(content_disposition):
+    msg = Message()
+    msg['Content-Disposition'] = content_disposition or ''
+    return msg.get_param('name', header='content-disposition')
+
+
+class MultipartReader:
+    """Lecteur incrémental d'un corps multipart/form-data
+
+    Le corps est lu par blocs de `chunk_size` octets, sans jamais dépasser
+    `content_length`: la mémoire utilisée reste bornée quelle que soit la
+    taille du fichier envoyé.
+    """
+
+    def __init__(self, rfile, boundary, content_length, chunk_size=64 * 1024):
+        if not boundary:
+            raise MultipartError("Boundary multipart manquant")
+        self._rfile = rfile
+        self._remaining = content_length
+        self._chunk_size = chunk_size
+        self._delimiter = b'\r\n--' + boundary.encode('latin-1')
+        # Le premier délimiteur n'est pas précédé de CRLF: on l'ajoute
+        self._buffer = b'\r\n'
+        self._finished = False
+        self._current = None
+
+    def _fill(self):
+        """Lit un bloc supplémentaire; retourne False en fin de corps"""
+        if self._remaining <= 0:
+            return False
+        data = self._rfile.read(min(self._chunk_size, self._remaining))
+        if not data:
+            self._remaining = 0
+            return False
+        self._remaining -= len(data)
+        self._buffer += data
+        return True
+
+    def _read_body(self, size):
+        """Lit au plus `size` octets de la partie courante (b'' en fin de partie)"""
+        while True:
+            index = self._buffer.find(self._delimiter)
+            if index >= 0:
+                if index == 0:
+                    return b''
+                size = index if size < 0 else min(size, index)
+                data, self._buffer = self._buffer[:size], self._buffer[size:]
+                return data
+            # Conserver de quoi reconnaître un délimiteur à cheval sur deux blocs
+            safe = len(self._buffer) - len(self._delimiter) + 1
+            if safe > 0 and (size < 0 or safe >= size or not self._remaining):
+                size = safe if size < 0 else min(size, safe)
+                data, self._buffer = self._buffer[:size], self._buffer[size:]
+                return data
+            if not self._fill():
+                raise MultipartError("Corps multipart tronqué")
+
+    def _skip_delimiter(self):
+        """Consomme un délimiteur et la fin de sa ligne (marque la fin du corps si final)"""
+        while len(self._buffer) < len(self._delimiter) + 2:
+            if not self._fill():
+                raise MultipartError("Corps multipart tronqué")
+        self._buffer = self._buffer[len(self._delimiter):]
+        if self._buffer.startswith(b'--'):
+            self._finished = True
+            return
+        end = self._buffer.find(b'\r\n')
+        while end < 0:
+            if not self._fill():
+                raise MultipartError("Corps multipart tronqué")
+            end = self._buffer.find(b'\r\n')
+        self._buffer = self._buffer[end + 2:]
+
+    def _read_headers(self):
+        end = self._buffer.find(b'\r\n\r\n')
+        while end < 0:
+            if len(self._buffer) > 16 * 1024:
+                raise MultipartError("En-têtes de partie trop longs")
+            if not self._fill():
+                raise MultipartError("Corps multipart tronqué")
+            end = self._buffer.find(b'\r\n\r\n')
+        raw, self._buffer = self._buffer[:end], self._buffer[end + 4:]
+        headers = {}
+        for line in raw.decode('utf-8', 'replace').split('\r\n'):
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return headers
+
+    def parts(self):
+        """Itère sur les parties: (en-têtes, flux binaire du contenu)
+
+        Le flux d'une partie doit être lu avant de passer à la suivante;
+        ce qui n'a pas été lu est ignoré.
+        """
+        while True:
+            if self._current is not None:
+                self._current.close()
+            while self._read_body(self._chunk_size):
+                pass
+            self._skip_delimiter()
+            if self._finished:
+                return
+            headers = self._read_headers()
+            self._current = _PartStream(self)
+            yield headers, self._current
+
+    def field(self, name):
+        """Retourne le flux binaire du champ `name`, ou None s'il est absent"""
+        for headers, stream in self.parts():
+            if _field_name(headers.get('content-disposition')) == name:
+                return io.BufferedReader(stream, buffer_size=self._chunk_size)
+        return None
+
+    def drain(self):
+        """Consomme le reste du corps de la requête"""
+        while self._remaining > 0:
+            data = self._rfile.read(min(self._chunk_size, self._remaining))
+            if not data:
+                break
+            self._remaining -= len(data)
+        self._buffer = b''
+
+
+class _PartStream(io.RawIOBase):
+    """Flux en lecture seule sur le contenu d'une partie multipart"""
+
+    def __init__(self, reader):
+        self._reader = reader
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.closed:
+            return 0
+        data = self._reader._read_body(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
@@ -0,0 +1,95 @@
+# pagination.py
+from config import PAGINATION_CONFIG
+
+
+class ListQuery:
+    """Requête de liste paginée par clé (keyset) avec projection de champs
+
+    `columns` associe chaque champ exposé à son expression SQL, dans l'ordre
+    de sortie. La clé de pagination est toujours lue pour calculer le
+    curseur suivant, puis retirée des lignes si elle n'a pas été demandée.
+    """
+
+    def __init__(self, columns, source, where=None, key='id', distinct=False, group_by=None):
+        self.columns = columns
+        self.source = source
+        self.where = where
+        self.key = key
+        self.distinct = distinct
+        self.group_by = group_by
+
+    def parse_fields(self, value):
+        """Champs demandés par `fields=a,b` (None: tous); ValueError si inconnu"""
+        if not value:
+            return None
+        fields = [f.strip() for f in value.split(',') if f.strip()]
+        unknown = [f for f in fields if f not in self.columns]
+        if unknown:
+            raise ValueError(f"Champ inconnu: {', '.join(unknown)}")
+        return fields
+
+    def _execute(self, cursor, params, fields, after, limit, condition, condition_params):
+        selected = list(fields or self.columns)
+        if self.key not in selected:
+            selected.append(self.key)
+        select = ', '.join(f"{self.columns[f]} AS {f}" for f in selected)
+        key_expr = self.columns[self.key]
+        conditions = [c for c in (self.where, condition, f"{key_expr} > %s") if c]
+        sql = (f"SELECT {'DISTINCT ' if self.distinct else ''}{select} FROM {self.source} "
+               f"WHERE {' AND '.join(conditions)} ")
+        if self.group_by:
+            sql += f"GROUP BY {self.group_by} "
+        sql += f"ORDER BY {key_expr}"
+        args = tuple(params) + tuple(condition_params) + (after,)
+        if limit is not None:
+            sql, args = f"{sql} LIMIT %s", args + (limit,)
+        cursor.execute(sql, args)
+
+    def fetch_page(self, cursor, params=(), fields=None, after=0, limit=None,
+                   condition=None, condition_params=()):
+        """Retourne (lignes, curseur suivant ou None)"""
+        limit = limit or PAGINATION_CONFIG['page_size']
+        self._execute(cursor, params, fields, after, limit, condition, condition_params)
+        rows = cursor.fetchall()
+        next_after = rows[-1][self.key] if len(rows) == limit else None
+        if fields and self.key not in fields:
+            for row in rows:
+                del row[self.key]
+        return rows, next_after
+
+    def iter_rows(self, cursor, params=(), fields=None, after=0,
+                  condition=None, condition_params=()):
+        """Toutes les lignes après `after`, lues par lots de `stream_batch_size`
+
+        Le curseur (non bufferisé) ne garde qu'un lot en mémoire. Si l'itération
+        est interrompue, le résultat reste non lu: la connexion est alors
+        écartée par le pool plutôt que vidée.
+        """
+        self._execute(cursor, params, fields, after, None, condition, condition_params)
+        drop_key = fields and self.key not in fields
+        while True:
+            rows = cursor.fetchmany(PAGINATION_CONFIG['stream_batch_size'])
+            if not rows:
+                return
+            for row in rows:
+                if drop_key:
+                    del row[self.key]
+                yield row
+
+
+def page_params(query):
+    """(limit, after) d'une query string; limit vaut None pour `limit=all`
+
+    Lève ValueError si les paramètres sont invalides.
+    """
+    value = query.get('limit', [PAGINATION_CONFIG['page_size']])[0]
+    try:
+        limit = None if value == 'all' else int(value)
+        after = int(query.get('after', [0])[0])
+    except ValueError:
+        raise ValueError("limit (entier ou 'all') et after (entier) invalides")
+    if limit is not None and limit <= 0:
+        raise ValueError("limit doit être positif")
+    if limit is None:
+        return None, after
+    return min(limit, PAGINATION_CONFIG['max_page_size']), after
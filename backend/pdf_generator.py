@@ -2,21 +2,31 @@
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
+from reportlab.lib.units import cm, inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
 from datetime import datetime
 from reportlab.platypus import  PageBreak
 from reportlab.graphics.charts.barcharts import VerticalBarChart
 from reportlab.graphics.shapes import Drawing
 import mysql.connector
-from database import db_connection
+from db_router import get_read_connection
+from config import BULK_REPORT_CONFIG
+from worker_pool import LazyPool
 import os
+import re
+import zipfile
+from functools import lru_cache
 from io import BytesIO
+from PIL import Image as PILImage
 
 
 
 # Configuration cohérente avec les autres fichiers
 SCHOOL_LOGO = "static/school_logo.png"
+class ReportNotFound(ValueError):
+    """Élève ou classe du rapport introuvable"""
+    pass
+
 PDF_CONFIG = {
     'font_name': 'Helvetica',
     'title_size': 16,
@@ -24,12 +34,83 @@ PDF_CONFIG = {
     'body_size': 10,
     'margin': 2*cm,
     'table_header_color': colors.HexColor('#2c3e50'),
-    'accent_color': colors.HexColor('#3498db')
+    'accent_color': colors.HexColor('#3498db'),
+    'logo_size': 2*cm,
+    'logo_dpi': 150,
+    'archive_dir': os.getenv('REPORT_ARCHIVE_DIR')  # copie disque des rapports (désactivée si vide)
+}
+
+# Styles de tableaux partagés par tous les rendus (TableStyle n'est pas modifié par Table.setStyle)
+TABLE_STYLES = {
+    'header': TableStyle([
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 15)
+    ]),
+    'info': TableStyle([
+        ('FONTNAME', (0,0), (-1,-1), PDF_CONFIG['font_name']),
+        ('FONTSIZE', (0,0), (-1,-1), PDF_CONFIG['body_size']),
+        ('VALIGN', (0,0), (-1,-1), 'TOP'),
+        ('ALIGN', (0,0), (0,-1), 'RIGHT'),
+        ('TEXTCOLOR', (0,0), (0,-1), PDF_CONFIG['accent_color']),
+        ('LEFTPADDING', (0,0), (-1,-1), 0),
+        ('RIGHTPADDING', (0,0), (-1,-1), 5)
+    ]),
+    'transcript_grades': TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), PDF_CONFIG['table_header_color']),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+        ('ALIGN', (1,0), (1,-1), 'CENTER'),
+        ('FONTNAME', (0,0), (-1,0), PDF_CONFIG['font_name']+'-Bold'),
+        ('FONTSIZE', (0,0), (-1,0), PDF_CONFIG['body_size']),
+        ('BOTTOMPADDING', (0,0), (-1,0), 12),
+        ('BACKGROUND', (0,1), (-1,-1), colors.beige),
+        ('GRID', (0,0), (-1,-1), 1, colors.lightgrey)
+    ]),
+    'class_meta': TableStyle([
+        ('FONTNAME', (0,0), (-1,-1), 'Helvetica-Bold'),
+        ('BACKGROUND', (0,0), (-1,-1), colors.lightgrey),
+        ('TEXTCOLOR', (0,0), (-1,-1), colors.black),
+        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+        ('BOX', (0,0), (-1,-1), 1, colors.black)
+    ]),
+    'class_table': TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.darkblue),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,0), 12),
+        ('BOTTOMPADDING', (0,0), (-1,0), 12),
+        ('BACKGROUND', (0,1), (-1,-1), colors.beige),
+        ('GRID', (0,0), (-1,-1), 1, colors.black)
+    ]),
+    'class_stats': TableStyle([
+        ('FONTNAME', (0,0), (-1,-1), PDF_CONFIG['font_name']),
+        ('FONTSIZE', (0,0), (-1,-1), PDF_CONFIG['body_size']),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('BACKGROUND', (0,0), (-1,0), PDF_CONFIG['table_header_color']),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+        ('GRID', (0,0), (-1,-1), 1, colors.lightgrey)
+    ]),
+    'ranking': TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), PDF_CONFIG['accent_color']),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+        ('FONTNAME', (0,0), (-1,0), PDF_CONFIG['font_name']+'-Bold'),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('GRID', (0,0), (-1,-1), 1, colors.lightgrey)
+    ]),
+    'student_grades': TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), PDF_CONFIG['table_header_color']),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+        ('FONTNAME', (0,0), (-1,0), PDF_CONFIG['font_name']+'-Bold'),
+        ('FONTSIZE', (0,0), (-1,0), PDF_CONFIG['body_size']),
+        ('ALIGN', (1,0), (1,-1), 'CENTER'),
+        ('GRID', (0,0), (-1,-1), 1, colors.lightgrey),
+        ('BACKGROUND', (0,1), (-1,-1), colors.beige)
+    ])
 }
 
 def generate_grades_report(class_id: int, requester_role: str) -> bytes:
     """Génère un rapport détaillé de toutes les notes d'une classe"""
-    conn = db_connection()
+    conn = get_read_connection(entities=[('class', class_id)])
     cursor = conn.cursor(dictionary=True)
     
     try:
@@ -42,16 +123,15 @@ def generate_grades_report(class_id: int, requester_role: str) -> bytes:
         )
         class_info = cursor.fetchone()
         if not class_info:
-            raise ValueError("Classe non trouvée")
+            raise ReportNotFound("Classe non trouvée")
 
-        # Génération du fichier PDF
-        filename = f"reports/class_grades_{class_id}_{datetime.now().strftime('%Y%m%d%H%M')}.pdf"
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        # Génération du PDF en mémoire
+        buffer = BytesIO()
         
         # Utilisation de la fonction interne existante pour générer le rapport
-        _generate_detailed_report(cursor, class_info, class_id, filename)
+        _generate_detailed_report(cursor, class_info, class_id, buffer)
         
-        return open(filename, 'rb').read()
+        return _archive(buffer.getvalue(), f"class_grades_{class_id}")
 
     finally:
         cursor.close()
@@ -60,7 +140,7 @@ def generate_grades_report(class_id: int, requester_role: str) -> bytes:
 
 def generate_student_transcript(student_id, requester_role):
     """Génère un bulletin scolaire pour un étudiant"""
-    conn = db_connection()
+    conn = get_read_connection(entities=[('student', student_id)])
     cursor = conn.cursor(dictionary=True)
     
     try:
@@ -74,7 +154,7 @@ def generate_student_transcript(student_id, requester_role):
         )
         student = cursor.fetchone()
         if not student:
-            raise ValueError("Étudiant non trouvé")
+            raise ReportNotFound("Étudiant non trouvé")
 
         # Récupération des notes
         cursor.execute(
@@ -89,77 +169,152 @@ def generate_student_transcript(student_id, requester_role):
         )
         grades = cursor.fetchall()
 
-        # Création du PDF
-        filename = f"reports/transcript_{student_id}_{datetime.now().strftime('%Y%m%d%H%M')}.pdf"
-        doc = SimpleDocTemplate(filename, pagesize=A4, 
+        # Création du PDF en mémoire
+        return _archive(_render_transcript(student, grades, requester_role), f"transcript_{student_id}")
+
+    finally:
+        cursor.close()
+        conn.close()
+
+def generate_class_transcripts(class_id, requester_role, output='zip') -> bytes:
+    """Génère les bulletins de tous les élèves d'une classe
+
+    Les élèves et leurs notes sont lus en une seule requête. En sortie 'zip',
+    chaque bulletin est rendu en parallèle dans un pool de processus; en
+    sortie 'pdf', les bulletins sont assemblés dans un document unique
+    (un saut de page entre chaque élève).
+    """
+    if output not in ('zip', 'pdf'):
+        raise ValueError("Format de sortie non valide")
+
+    conn = get_read_connection(entities=[('class', class_id)])
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            """SELECT u.id AS student_id, u.nom, u.prenom, c.name AS class_name,
+                   s.name AS subject, g.grade, g.comments, g.evaluation_date,
+                   t.nom AS teacher_name, t.prenom AS teacher_firstname
+            FROM users u
+            LEFT JOIN classes c ON u.class_id = c.id
+            LEFT JOIN grades g ON g.student_id = u.id
+            LEFT JOIN subjects s ON g.subject_id = s.id
+            LEFT JOIN users t ON s.teacher_id = t.id
+            WHERE u.class_id = %s AND u.role = 'student'
+            ORDER BY u.nom, u.prenom, u.id, s.name, g.evaluation_date""",
+            (class_id,)
+        )
+        records = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    if not records:
+        raise ReportNotFound("Aucun élève dans cette classe")
+
+    # Regroupement des notes par élève
+    transcripts = []
+    for record in records:
+        if not transcripts or transcripts[-1][0]['id'] != record['student_id']:
+            student = {
+                'id': record['student_id'],
+                'nom': record['nom'],
+                'prenom': record['prenom'],
+                'class_name': record['class_name']
+            }
+            transcripts.append((student, []))
+        if record['subject'] is not None:
+            transcripts[-1][1].append({key: record[key] for key in (
+                'subject', 'grade', 'comments', 'evaluation_date', 'teacher_name', 'teacher_firstname'
+            )})
+
+    if output == 'pdf':
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4,
                               leftMargin=PDF_CONFIG['margin'],
                               rightMargin=PDF_CONFIG['margin'])
-        
         elements = []
-        styles = _create_styles()
-        
-        # En-tête
-        elements.append(_create_header(student))
-        elements.append(Spacer(1, 0.5*cm))
-        
-        # Informations étudiant
-        student_info = [
-            ["Classe:", student['class_name'] or "Non attribuée"],
-            ["Date de génération:", datetime.now().strftime('%d/%m/%Y %H:%M')],
-            ["Généré par:", f"{requester_role}"]
-        ]
-        elements.append(_create_info_table(student_info))
-        elements.append(Spacer(1, 1*cm))
-        
-        # Tableau des notes
-        if grades:
-            grade_data = [["Matière", "Note", "Commentaires", "Date", "Enseignant"]]
-            for grade in grades:
-                grade_data.append([
-                    grade['subject'],
-                    str(grade['grade']),
-                    grade['comments'][:50] + '...' if grade['comments'] else '',
-                    grade['evaluation_date'].strftime('%d/%m/%Y'),
-                    f"{grade['teacher_firstname']} {grade['teacher_name']}"
-                ])
-            
-            table = Table(grade_data, colWidths=[4*cm, 2*cm, 6*cm, 3*cm, 5*cm])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), PDF_CONFIG['table_header_color']),
-                ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-                ('ALIGN', (1,0), (1,-1), 'CENTER'),
-                ('FONTNAME', (0,0), (-1,0), PDF_CONFIG['font_name']+'-Bold'),
-                ('FONTSIZE', (0,0), (-1,0), PDF_CONFIG['body_size']),
-                ('BOTTOMPADDING', (0,0), (-1,0), 12),
-                ('BACKGROUND', (0,1), (-1,-1), colors.beige),
-                ('GRID', (0,0), (-1,-1), 1, colors.lightgrey)
-            ]))
-            elements.append(table)
-        else:
-            elements.append(Paragraph("Aucune note enregistrée", styles['BodyText']))
-        
+        for student, grades in transcripts:
+            if elements:
+                elements.append(PageBreak())
+            elements.extend(_transcript_elements(student, grades, requester_role))
         doc.build(elements)
-        return open(filename, 'rb').read()
+        return buffer.getvalue()
 
-    finally:
-        cursor.close()
-        conn.close()
+    students = [student for student, _ in transcripts]
+    buffer = BytesIO()
+    with _bulk_pool.executor() as executor:
+        pdfs = executor.map(
+            _render_transcript,
+            students,
+            [grades for _, grades in transcripts],
+            [requester_role] * len(transcripts),
+            chunksize=max(1, len(transcripts) // (BULK_REPORT_CONFIG['workers'] * 4))
+        )
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for student, pdf in zip(students, pdfs):
+                name = re.sub(r'[^\w-]+', '_', f"{student['nom']}_{student['prenom']}")
+                archive.writestr(f"bulletin_{name}_{student['id']}.pdf", pdf)
+    return buffer.getvalue()
+
+# Processus de rendu partagés par les rapports en masse
+_bulk_pool = LazyPool(BULK_REPORT_CONFIG['workers'], name='bulk-report')
 
-def generate_class_report(class_id: int, report_type: str = 'summary') -> str:
-    """Génère un rapport PDF et retourne le chemin du fichier"""
-    filename = f"reports/class_{class_id}_{datetime.now().strftime('%Y%m%d%H%M')}.pdf"
+def _render_transcript(student, grades, requester_role) -> bytes:
+    """Rend un bulletin en mémoire (exécuté dans un processus du pool)"""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4,
+                          leftMargin=PDF_CONFIG['margin'],
+                          rightMargin=PDF_CONFIG['margin'])
+    doc.build(_transcript_elements(student, grades, requester_role))
+    return buffer.getvalue()
+
+def _transcript_elements(student, grades, requester_role):
+    """Construit le contenu d'un bulletin scolaire"""
+    elements = []
+    styles = _create_styles()
     
-    # Création du répertoire si inexistant
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    # En-tête
+    elements.append(_create_header(student))
+    elements.append(Spacer(1, 0.5*cm))
     
-    doc = SimpleDocTemplate(filename, pagesize=A4)
-    styles = getSampleStyleSheet()
+    # Informations étudiant
+    student_info = [
+        ["Classe:", student['class_name'] or "Non attribuée"],
+        ["Date de génération:", datetime.now().strftime('%d/%m/%Y %H:%M')],
+        ["Généré par:", f"{requester_role}"]
+    ]
+    elements.append(_create_info_table(student_info))
+    elements.append(Spacer(1, 1*cm))
+    
+    # Tableau des notes
+    if grades:
+        grade_data = [["Matière", "Note", "Commentaires", "Date", "Enseignant"]]
+        for grade in grades:
+            grade_data.append([
+                grade['subject'],
+                str(grade['grade']),
+                grade['comments'][:50] + '...' if grade['comments'] else '',
+                grade['evaluation_date'].strftime('%d/%m/%Y'),
+                f"{grade['teacher_firstname']} {grade['teacher_name']}"
+            ])
+        
+        table = Table(grade_data, colWidths=[4*cm, 2*cm, 6*cm, 3*cm, 5*cm])
+        table.setStyle(TABLE_STYLES['transcript_grades'])
+        elements.append(table)
+    else:
+        elements.append(Paragraph("Aucune note enregistrée", styles['BodyText']))
+    return elements
+
+def generate_class_report(class_id: int, report_type: str = 'summary') -> bytes:
+    """Génère un rapport PDF de classe et retourne son contenu"""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = _sample_styles()
     elements = []
     
-    conn = db_connection()
+    conn = get_read_connection(entities=[('class', class_id)])
+    cursor = conn.cursor(dictionary=True)
     try:
-        cursor = conn.cursor(dictionary=True)
-        
         # Récupération info classe (version optimisée)
         cursor.execute("""
             SELECT c.id, c.name, c.level, c.academic_year,
@@ -172,7 +327,7 @@ def generate_class_report(class_id: int, report_type: str = 'summary') -> str:
         class_info = cursor.fetchone()
         
         if not class_info:
-            raise ValueError("Classe non trouvée")
+            raise ReportNotFound("Classe non trouvée")
         # Construction du PDF (identique à la nouvelle version)
         title_text = f"Rapport de Classe - {class_info['name']}"
         elements.append(Paragraph(title_text, styles['Title']))
@@ -183,20 +338,14 @@ def generate_class_report(class_id: int, report_type: str = 'summary') -> str:
             ["Nombre d'Élèves", class_info['student_count']]
         ]
         meta_table = Table(meta_data, colWidths=[100, 300])
-        meta_table.setStyle(TableStyle([
-            ('FONTNAME', (0,0), (-1,-1), 'Helvetica-Bold'),
-            ('BACKGROUND', (0,0), (-1,-1), colors.lightgrey),
-            ('TEXTCOLOR', (0,0), (-1,-1), colors.black),
-            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-            ('BOX', (0,0), (-1,-1), 1, colors.black)
-        ]))
+        meta_table.setStyle(TABLE_STYLES['class_meta'])
         elements.append(meta_table)
         elements.append(Spacer(1, 24))
         if report_type == 'detailed':
             cursor.execute("""
-                SELECT u.nom, u.prenom, AVG(g.grade) AS average
+                SELECT u.nom, u.prenom, SUM(a.grade_sum) / SUM(a.grade_count) AS average
                 FROM users u
-                LEFT JOIN grades g ON u.id = g.student_id
+                LEFT JOIN grade_aggregates a ON u.id = a.student_id
                 WHERE u.class_id = %s AND u.role = 'student'
                 GROUP BY u.id
                 ORDER BY u.nom, u.prenom
@@ -209,15 +358,15 @@ def generate_class_report(class_id: int, report_type: str = 'summary') -> str:
         elif report_type == 'summary':
             cursor.execute("""
                 SELECT 
-                    MAX(g.grade) AS max_grade,
-                    MIN(g.grade) AS min_grade,
-                    AVG(g.grade) AS avg_grade,
-                    COUNT(g.id) AS grade_count
-                FROM grades g
-                JOIN users u ON g.student_id = u.id
-                WHERE u.class_id = %s
+                    grade_max AS max_grade,
+                    grade_min AS min_grade,
+                    grade_sum / grade_count AS avg_grade,
+                    grade_count
+                FROM class_grade_aggregates
+                WHERE class_id = %s
             """, (class_id,))
-            stats = cursor.fetchone()
+            stats = cursor.fetchone() or {'max_grade': None, 'min_grade': None,
+                                          'avg_grade': None, 'grade_count': 0}
             student_data = [
                 ["Moyenne de Classe", f"{stats['avg_grade']:.2f}" if stats['avg_grade'] else "N/A"],
                 ["Meilleure Note", stats['max_grade'] or "N/A"],
@@ -227,24 +376,23 @@ def generate_class_report(class_id: int, report_type: str = 'summary') -> str:
         else:
             raise ValueError("Type de rapport non valide")
         table = Table(student_data, colWidths=[120, 120, 140] if report_type == 'detailed' else [200, 200])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.darkblue),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0,0), (-1,0), 12),
-            ('BOTTOMPADDING', (0,0), (-1,0), 12),
-            ('BACKGROUND', (0,1), (-1,-1), colors.beige),
-            ('GRID', (0,0), (-1,-1), 1, colors.black)
-        ]))
+        table.setStyle(TABLE_STYLES['class_table'])
         elements.append(table)
         doc.build(elements)
-        return filename
+        return _archive(buffer.getvalue(), f"class_{class_id}")
     finally:
-        if conn.is_connected():
-            cursor.close()
-            conn.close()
+        cursor.close()
+        conn.close()
+
 
+def _archive(data: bytes, name: str) -> bytes:
+    """Copie optionnelle du rapport sur disque (si PDF_CONFIG['archive_dir'] est défini)"""
+    if PDF_CONFIG['archive_dir']:
+        os.makedirs(PDF_CONFIG['archive_dir'], exist_ok=True)
+        filename = os.path.join(PDF_CONFIG['archive_dir'], f"{name}_{datetime.now().strftime('%Y%m%d%H%M')}.pdf")
+        with open(filename, 'wb') as f:
+            f.write(data)
+    return data
 
 def _create_header(student):
     """Crée l'en-tête commun à tous les documents"""
@@ -252,7 +400,7 @@ def _create_header(student):
     header = []
     
     # Logo et titre
-    logo = Image(SCHOOL_LOGO, width=2*cm, height=2*cm)
+    logo = _create_logo()
     title = Paragraph(
         f"<b>BULLETIN SCOLAIRE</b><br/>"
         f"{student['prenom']} {student['nom']}",
@@ -263,49 +411,62 @@ def _create_header(student):
         [logo, title]
     ], colWidths=[3*cm, 15*cm])
     
-    header_table.setStyle(TableStyle([
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 15)
-    ]))
+    header_table.setStyle(TABLE_STYLES['header'])
     
     return header_table
 
 def _create_info_table(data):
     """Crée un tableau d'informations formaté"""
-    style = TableStyle([
-        ('FONTNAME', (0,0), (-1,-1), PDF_CONFIG['font_name']),
-        ('FONTSIZE', (0,0), (-1,-1), PDF_CONFIG['body_size']),
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('ALIGN', (0,0), (0,-1), 'RIGHT'),
-        ('TEXTCOLOR', (0,0), (0,-1), PDF_CONFIG['accent_color']),
-        ('LEFTPADDING', (0,0), (-1,-1), 0),
-        ('RIGHTPADDING', (0,0), (-1,-1), 5)
-    ])
-    
     table = Table(data, colWidths=[4*cm, 12*cm])
-    table.setStyle(style)
+    table.setStyle(TABLE_STYLES['info'])
     return table
 
+@lru_cache(maxsize=None)
 def _create_styles():
-    """Définit les styles de paragraphe"""
+    """Définit les styles de paragraphe (construits une fois par processus, en lecture seule)"""
     styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(
+    # Remplace le style 'Title' fourni par la feuille d'exemple
+    styles.byName['Title'] = ParagraphStyle(
         name='Title',
         fontName=PDF_CONFIG['font_name']+'-Bold',
         fontSize=PDF_CONFIG['title_size'],
         alignment=1,
         spaceAfter=20
-    ))
+    )
     return styles
 
-def _generate_class_summary(cursor, class_info, class_id, filename):
+@lru_cache(maxsize=None)
+def _sample_styles():
+    """Feuille de styles d'exemple ReportLab, partagée en lecture seule"""
+    return getSampleStyleSheet()
+
+@lru_cache(maxsize=None)
+def _logo_bytes():
+    """Logo lu et ramené une fois pour toutes à sa taille d'affichage
+
+    ReportLab recompresse les pixels de l'image dans chaque document: un
+    logo pleine résolution coûte plusieurs centaines de millisecondes par PDF.
+    """
+    size = round(PDF_CONFIG['logo_size'] / inch * PDF_CONFIG['logo_dpi'])
+    with PILImage.open(SCHOOL_LOGO) as img:
+        img.thumbnail((size, size))
+        buffer = BytesIO()
+        img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def _create_logo():
+    """Logo de l'école, décodé depuis la copie en mémoire"""
+    return Image(BytesIO(_logo_bytes()), width=PDF_CONFIG['logo_size'], height=PDF_CONFIG['logo_size'])
+
+def _generate_class_summary(cursor, class_info, class_id, output):
     """Génère un rapport sommaire de classe"""
     try:
         # Récupération des données de la classe
         cursor.execute(
-            """SELECT u.id, u.nom, u.prenom, COUNT(g.id) as nb_notes, AVG(g.grade) as moyenne
+            """SELECT u.id, u.nom, u.prenom, COALESCE(SUM(a.grade_count), 0) as nb_notes,
+                SUM(a.grade_sum) / SUM(a.grade_count) as moyenne
             FROM users u
-            LEFT JOIN grades g ON u.id = g.student_id
+            LEFT JOIN grade_aggregates a ON u.id = a.student_id
             WHERE u.class_id = %s AND u.role = 'student'
             GROUP BY u.id""",
             (class_id,))
@@ -313,18 +474,17 @@ def _generate_class_summary(cursor, class_info, class_id, filename):
         # Statistiques générales
         cursor.execute(
             """SELECT 
-                COUNT(DISTINCT u.id) as total_eleves,
-                COUNT(g.id) as total_notes,
-                AVG(g.grade) as moyenne_classe,
-                MAX(g.grade) as meilleure_note,
-                MIN(g.grade) as plus_basse_note
-            FROM users u
-            LEFT JOIN grades g ON u.id = g.student_id
-            WHERE u.class_id = %s AND u.role = 'student'""",
-            (class_id,))
+                (SELECT COUNT(*) FROM users WHERE class_id = %s AND role = 'student') as total_eleves,
+                a.grade_count as total_notes,
+                a.grade_sum / a.grade_count as moyenne_classe,
+                a.grade_max as meilleure_note,
+                a.grade_min as plus_basse_note
+            FROM (SELECT 1) AS one
+            LEFT JOIN class_grade_aggregates a ON a.class_id = %s""",
+            (class_id, class_id))
         stats = cursor.fetchone()
         # Préparation du PDF
-        doc = SimpleDocTemplate(filename, pagesize=A4, 
+        doc = SimpleDocTemplate(output, pagesize=A4, 
                               leftMargin=PDF_CONFIG['margin'],
                               rightMargin=PDF_CONFIG['margin'])
         elements = []
@@ -341,14 +501,7 @@ def _generate_class_summary(cursor, class_info, class_id, filename):
             ["Meilleure note", stats['meilleure_note'] or "N/A"],
             ["Plus basse note", stats['plus_basse_note'] or "N/A"]
         ], colWidths=[6*cm, 6*cm])
-        stats_table.setStyle(TableStyle([
-            ('FONTNAME', (0,0), (-1,-1), PDF_CONFIG['font_name']),
-            ('FONTSIZE', (0,0), (-1,-1), PDF_CONFIG['body_size']),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('BACKGROUND', (0,0), (-1,0), PDF_CONFIG['table_header_color']),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-            ('GRID', (0,0), (-1,-1), 1, colors.lightgrey)
-        ]))
+        stats_table.setStyle(TABLE_STYLES['class_stats'])
         elements.append(stats_table)
         elements.append(Spacer(1, 1*cm))
         # Graphique des moyennes
@@ -389,20 +542,14 @@ def _generate_class_summary(cursor, class_info, class_id, filename):
                 ])
             
             rank_table = Table(rank_data, colWidths=[2*cm, 10*cm, 4*cm])
-            rank_table.setStyle(TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), PDF_CONFIG['accent_color']),
-                ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-                ('FONTNAME', (0,0), (-1,0), PDF_CONFIG['font_name']+'-Bold'),
-                ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                ('GRID', (0,0), (-1,-1), 1, colors.lightgrey)
-            ]))
+            rank_table.setStyle(TABLE_STYLES['ranking'])
             elements.append(rank_table)
         doc.build(elements)
-        return filename
+        return output
     except Exception as e:
         raise RuntimeError(f"Erreur de génération du rapport: {str(e)}")
 
-def _generate_detailed_report(cursor, class_info, class_id, filename):
+def _generate_detailed_report(cursor, class_info, class_id, output):
     """Génère un rapport détaillé avec toutes les notes"""
     try:
         # Récupération des données
@@ -423,7 +570,7 @@ def _generate_detailed_report(cursor, class_info, class_id, filename):
             (class_id,))
         grades_data = cursor.fetchall()
         # Préparation du PDF
-        doc = SimpleDocTemplate(filename, pagesize=A4, 
+        doc = SimpleDocTemplate(output, pagesize=A4, 
                               leftMargin=PDF_CONFIG['margin'],
                               rightMargin=PDF_CONFIG['margin'])
         elements = []
@@ -460,7 +607,7 @@ def _generate_detailed_report(cursor, class_info, class_id, filename):
         if student_grades:
             elements.append(_create_student_grade_table(student_grades))
         doc.build(elements)
-        return filename
+        return output
     except Exception as e:
         raise RuntimeError(f"Erreur de génération du rapport détaillé: {str(e)}")
 def _create_class_header(class_info):
@@ -468,7 +615,7 @@ def _create_class_header(class_info):
     styles = _create_styles()
     header = []
     
-    logo = Image(SCHOOL_LOGO, width=2*cm, height=2*cm)
+    logo = _create_logo()
     title_text = (
         f"<b>RAPPORT DE CLASSE</b><br/>"
         f"Classe: {class_info['name']}<br/>"
@@ -480,10 +627,7 @@ def _create_class_header(class_info):
         [logo, title]
     ], colWidths=[3*cm, 15*cm])
     
-    header_table.setStyle(TableStyle([
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 15)
-    ]))
+    header_table.setStyle(TABLE_STYLES['header'])
     
     return header_table
 
@@ -493,14 +637,6 @@ def _create_student_grade_table(grades_data):
     table_data = [headers] + grades_data
     
     table = Table(table_data, colWidths=[5*cm, 3*cm, 7*cm, 4*cm])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), PDF_CONFIG['table_header_color']),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-        ('FONTNAME', (0,0), (-1,0), PDF_CONFIG['font_name']+'-Bold'),
-        ('FONTSIZE', (0,0), (-1,0), PDF_CONFIG['body_size']),
-        ('ALIGN', (1,0), (1,-1), 'CENTER'),
-        ('GRID', (0,0), (-1,-1), 1, colors.lightgrey),
-        ('BACKGROUND', (0,1), (-1,-1), colors.beige)
-    ]))
+    table.setStyle(TABLE_STYLES['student_grades'])
     
     return table
\ No newline at end of file
@@ -0,0 +1,147 @@
+# report_cache.py
+import hashlib
+import logging
+import os
+import threading
+import data_versions
+from config import REPORT_CACHE_CONFIG
+from pdf_generator import generate_student_transcript, generate_class_report, generate_class_transcripts
+
+logger = logging.getLogger(__name__)
+
+class ReportCache:
+    """Cache disque des rapports PDF, adressé par contenu
+
+    La clé combine le type de rapport, l'entité, la variante et la version
+    des données de l'entité: une écriture (note, import CSV) fait avancer la
+    version et rend les anciens fichiers inaccessibles. Le répertoire est
+    borné en nombre de fichiers et en taille, les moins récemment servis
+    étant supprimés en premier.
+    """
+
+    def __init__(self, directory='reports', max_entries=500, max_bytes=200 * 1024 * 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get_or_render(self, kind, entity_id, report_type, render) -> bytes:
+        """Retourne le rapport en cache, ou le génère via `render()` et le stocke"""
+        key = self._key(kind, entity_id, report_type)
+        path = os.path.join(self.directory, f"{key}.pdf")
+        # Un seul rendu par clé: les demandes concurrentes attendent le premier
+        with self._lock:
+            key_lock = self._inflight.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                data = self._read(path)
+                if data is not None:
+                    self._count('hits')
+                    return data
+                self._count('misses')
+                data = render()
+                self._write(path, data)
+                return data
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        with self._lock:
+            return {
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries),
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                **self._counters
+            }
+
+    def _key(self, kind, entity_id, report_type):
+        raw = f"{kind}:{entity_id}:{report_type}:{data_versions.version(kind, entity_id)}"
+        return f"{kind}_{hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]}"
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        # La date de modification sert d'horodatage LRU
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Supprimé entre-temps par _evict(): le contenu est déjà lu
+            pass
+        return data
+
+    def _write(self, path, data):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _entries(self):
+        """(chemin, taille, date d'accès) des PDF du répertoire"""
+        entries = []
+        try:
+            scan = os.scandir(self.directory)
+        except FileNotFoundError:
+            return entries
+        with scan:
+            for entry in scan:
+                if entry.name.endswith('.pdf'):
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((entry.path, st.st_size, st.st_mtime))
+        return entries
+
+    def _evict(self):
+        """Supprime les rapports les moins récemment servis au-delà des limites"""
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for path, size, _ in entries:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            count -= 1
+            total -= size
+            self._count('evictions')
+
+report_cache = ReportCache(**REPORT_CACHE_CONFIG)
+
+def cached_student_transcript(student_id, requester_role) -> bytes:
+    """Bulletin d'un étudiant, servi depuis le cache si ses notes n'ont pas changé"""
+    return report_cache.get_or_render(
+        'student', student_id, requester_role,
+        lambda: generate_student_transcript(student_id, requester_role)
+    )
+
+def cached_class_report(class_id, report_type='summary') -> bytes:
+    """Rapport de classe, servi depuis le cache si les notes de la classe n'ont pas changé"""
+    return report_cache.get_or_render(
+        'class', class_id, report_type,
+        lambda: generate_class_report(class_id, report_type)
+    )
+
+def cached_class_transcripts(class_id, requester_role, output='zip') -> bytes:
+    """Bulletins de toute une classe (ZIP ou PDF unique), servis depuis le cache"""
+    return report_cache.get_or_render(
+        'class', class_id, f"transcripts-{output}-{requester_role}",
+        lambda: generate_class_transcripts(class_id, requester_role, output)
+    )
@@ -0,0 +1,171 @@
+# report_jobs.py
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from report_cache import cached_student_transcript, cached_class_report, cached_class_transcripts
+from config import REPORT_CONFIG
+
+logger = logging.getLogger(__name__)
+
+class QueueFull(Exception):
+    """Trop de rapports en attente de génération"""
+    pass
+
+class ReportJob:
+    """Demande de génération de rapport et son état"""
+
+    def __init__(self, kind, params, owner):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.owner = str(owner)
+        self.status = 'pending'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def content_type(self) -> str:
+        if self.kind == 'class_transcripts' and self.params.get('output') == 'zip':
+            return 'application/zip'
+        return 'application/pdf'
+
+    def to_dict(self) -> dict:
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'error': self.error
+        }
+
+def _render_student(params):
+    return cached_student_transcript(params['student_id'], params['requester_role'])
+
+def _render_class(params):
+    return cached_class_report(params['class_id'], params['report_type'])
+
+def _render_class_transcripts(params):
+    return cached_class_transcripts(params['class_id'], params['requester_role'], params['output'])
+
+RENDERERS = {
+    'student': _render_student,
+    'class': _render_class,
+    'class_transcripts': _render_class_transcripts
+}
+
+class ReportJobQueue:
+    """File de génération de rapports PDF servie par un pool de workers
+
+    Le nombre de rendus simultanés est borné par `workers`, y compris pour
+    les rapports demandés de façon synchrone (`render`), le nombre de
+    demandes en attente par `max_pending`. Les jobs terminés sont conservés
+    `job_ttl` secondes pour permettre le téléchargement du résultat, dans
+    la limite de `max_results_per_owner` résultats par demandeur et de
+    `max_result_bytes` au total (les plus anciens sont supprimés d'abord).
+    """
+
+    def __init__(self, workers=2, max_pending=100, job_ttl=600, max_results_per_owner=20,
+                 max_result_bytes=200 * 1024 * 1024):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-worker')
+        self.workers = workers
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self.max_results_per_owner = max_results_per_owner
+        self.max_result_bytes = max_result_bytes
+        self._jobs = {}
+        self._waiting = 0  # rendus synchrones en attente ou en cours
+        self._result_bytes = 0
+        self._lock = threading.Lock()
+
+    def submit(self, kind, params, owner) -> ReportJob:
+        """Enregistre un job et le confie au pool"""
+        if kind not in RENDERERS:
+            raise ValueError("Type de rapport non valide")
+        job = ReportJob(kind, params, owner)
+        with self._lock:
+            self._purge()
+            if self._pending() >= self.max_pending:
+                raise QueueFull("Trop de rapports en cours de génération")
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def render(self, kind, params) -> bytes:
+        """Génère un rapport via le pool et attend le résultat (requêtes synchrones)"""
+        with self._lock:
+            if self._pending() >= self.max_pending:
+                raise QueueFull("Trop de rapports en cours de génération")
+            self._waiting += 1
+        try:
+            return self._executor.submit(RENDERERS[kind], params).result()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def get(self, job_id, owner):
+        """Retourne le job s'il existe et appartient au demandeur"""
+        with self._lock:
+            self._purge()
+            job = self._jobs.get(job_id)
+        if job is None or job.owner != str(owner):
+            return None
+        return job
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {'workers': self.workers, 'max_pending': self.max_pending, 'jobs': counts,
+                    'waiting': self._waiting, 'result_bytes': self._result_bytes}
+
+    def _run(self, job):
+        job.status = 'running'
+        try:
+            job.result = RENDERERS[job.kind](job.params)
+            job.status = 'done'
+        except Exception as e:
+            logger.error(f"Échec de génération du rapport {job.id}: {str(e)}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                if job.result is not None:
+                    self._result_bytes += len(job.result)
+                self._limit_results(job.owner)
+
+    def _pending(self):
+        """Jobs en attente ou en cours et rendus synchrones (verrou tenu)"""
+        return self._waiting + sum(1 for j in self._jobs.values() if j.status in ('pending', 'running'))
+
+    def _purge(self):
+        """Supprime les jobs terminés depuis plus de job_ttl secondes (verrou tenu)"""
+        limit = time.time() - self.job_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < limit]
+        for job_id in expired:
+            self._drop(job_id)
+
+    def _limit_results(self, owner):
+        """Applique les limites de résultats conservés (verrou tenu)"""
+        finished = sorted((job for job in self._jobs.values() if job.finished_at is not None),
+                          key=lambda job: job.finished_at)
+        owned = [job for job in finished if job.owner == owner]
+        for job in owned[:max(0, len(owned) - self.max_results_per_owner)]:
+            self._drop(job.id)
+        for job in finished:
+            if self._result_bytes <= self.max_result_bytes:
+                break
+            if job.id in self._jobs:
+                self._drop(job.id)
+
+    def _drop(self, job_id):
+        job = self._jobs.pop(job_id)
+        if job.result is not None:
+            self._result_bytes -= len(job.result)
+
+report_jobs = ReportJobQueue(**REPORT_CONFIG)
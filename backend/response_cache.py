@@ -0,0 +1,85 @@
+# response_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_etag(body: bytes) -> str:
+    """ETag fort calculé sur le contenu de la réponse"""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+def etag_matches(if_none_match, etag) -> bool:
+    """Comparaison faible d'un en-tête If-None-Match (liste ou '*') à un ETag"""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    strip = lambda tag: tag.strip()[2:] if tag.strip().startswith('W/') else tag.strip()
+    return strip(etag) in (strip(tag) for tag in if_none_match.split(','))
+
+
+class CachedResponse:
+    __slots__ = ('version', 'body', 'headers', 'etag', 'expires_at', 'variants')
+
+    def __init__(self, version, body, headers, etag, expires_at):
+        self.version = version
+        self.body = body
+        self.headers = headers
+        self.etag = etag
+        self.expires_at = expires_at
+        self.variants = {}  # encodage -> corps compressé, calculé à la première demande
+
+
+class ResponseCache:
+    """Cache LRU en mémoire des réponses JSON par utilisateur
+
+    Une entrée est associée aux versions (data_versions) des données dont
+    elle dépend: une écriture les fait avancer et l'entrée n'est plus
+    servie. `ttl` borne la durée de vie pour les modifications faites hors
+    de ce processus.
+    """
+
+    def __init__(self, ttl=30, max_entries=5000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'invalidations': 0, 'not_modified': 0}
+
+    def get(self, key, version):
+        """Réponse en cache pour `key` si elle est à jour, sinon None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            if entry.version != version or entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                self._counters['invalidations'] += 1
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return entry
+
+    def put(self, key, version, body, headers=None) -> CachedResponse:
+        entry = CachedResponse(version, body, dict(headers or {}), make_etag(body),
+                               time.monotonic() + self.ttl)
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def count_not_modified(self):
+        with self._lock:
+            self._counters['not_modified'] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'ttl': self.ttl, **self._counters}
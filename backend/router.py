@@ -0,0 +1,115 @@
+# router.py
+
+
+class Route:
+    """Route HTTP: méthode, motif, handler et exigences d'accès"""
+
+    __slots__ = ('method', 'pattern', 'handler', 'roles', 'db', 'auth', 'versions',
+                 'cache_control', 'etag')
+
+    def __init__(self, method, pattern, handler, roles=None, db=False, auth=True, versions=None,
+                 cache_control=None, etag=None):
+        self.method = method
+        self.pattern = pattern
+        self.handler = handler
+        self.roles = frozenset(roles) if roles else None
+        self.db = db        # False, True (primaire) ou 'read' (réplica toléré)
+        self.auth = auth    # False: route publique, sans jeton
+        # Réponses mises en cache par utilisateur: payload -> [(scope, id)]
+        # des données (data_versions) dont dépend la réponse
+        self.versions = versions
+        # En-tête Cache-Control des réponses 200 (défaut du dispatcher si None)
+        self.cache_control = cache_control
+        # ETag calculable avant le handler (ctx -> str ou None): un client ou
+        # un proxy à jour reçoit 304 sans que la réponse soit produite
+        self.etag = etag
+
+    def allows(self, role) -> bool:
+        return self.roles is None or role in self.roles
+
+
+class RequestContext:
+    """Données d'une requête transmises aux handlers"""
+
+    __slots__ = ('payload', 'query', 'params', 'conn', 'cursor')
+
+    def __init__(self, payload, query, params, conn=None, cursor=None):
+        self.payload = payload
+        self.query = query
+        self.params = params
+        self.conn = conn
+        self.cursor = cursor
+
+
+class _Node:
+    __slots__ = ('children', 'param', 'routes')
+
+    def __init__(self):
+        self.children = {}
+        self.param = None  # (nom du paramètre, noeud)
+        self.routes = {}   # méthode -> Route
+
+
+class Router:
+    """Table de routage compilée
+
+    Les chemins fixes sont résolus par un dictionnaire; les motifs à
+    paramètres (`/api/report/student/<student_id>`) par un arbre de segments.
+    Un segment fixe est prioritaire sur un paramètre.
+    """
+
+    def __init__(self):
+        self._exact = {}
+        self._root = _Node()
+
+    def add(self, method, pattern, handler, **options) -> Route:
+        route = Route(method, pattern, handler, **options)
+        if '<' not in pattern:
+            self._exact[(method, pattern)] = route
+            return route
+        node = self._root
+        for segment in pattern.strip('/').split('/'):
+            if segment.startswith('<') and segment.endswith('>'):
+                name = segment[1:-1]
+                if node.param is None:
+                    node.param = (name, _Node())
+                elif node.param[0] != name:
+                    raise ValueError(f"Paramètres concurrents pour {pattern}")
+                node = node.param[1]
+            else:
+                node = node.children.setdefault(segment, _Node())
+        node.routes[method] = route
+        return route
+
+    def route(self, method, pattern, **options):
+        """Décorateur enregistrant une méthode de handler"""
+        def decorator(handler):
+            self.add(method, pattern, handler, **options)
+            return handler
+        return decorator
+
+    def get(self, pattern, **options):
+        return self.route('GET', pattern, **options)
+
+    def post(self, pattern, **options):
+        return self.route('POST', pattern, **options)
+
+    def match(self, method, path):
+        """Retourne (route, paramètres) ou (None, {}) si aucune route ne correspond"""
+        route = self._exact.get((method, path))
+        if route is not None:
+            return route, {}
+        params = {}
+        node = self._root
+        for segment in path.strip('/').split('/'):
+            child = node.children.get(segment)
+            if child is None:
+                if node.param is None or not segment:
+                    return None, {}
+                name, child = node.param
+                params[name] = segment
+            node = child
+        route = node.routes.get(method)
+        if route is None:
+            return None, {}
+        return route, params
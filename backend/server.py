@@ -1,33 +1,181 @@
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import BaseHTTPRequestHandler
 import json
+import logging
 import jwt
-import mysql.connector
-from urllib.parse import urlparse, parse_qs
-import bcrypt
-import cgi
+from urllib.parse import urlparse, parse_qs, parse_qsl, urlencode
+import io
 from csv_processor import process_csv, process_grades_csv
-from pdf_generator import generate_grades_report, generate_student_transcript, generate_class_report
-from database import init_db
+from report_cache import report_cache
+from pdf_generator import ReportNotFound
+from database import init_db, get_connection, get_pool, add_class, add_subject, add_grade
+from db_router import get_router, get_read_connection
 from datetime import datetime, timedelta
-from config import DB_CONFIG
+from config import SERVER_CONFIG, HTTP_KEEPALIVE_CONFIG, UPLOAD_CONFIG, AUTH_CONFIG, RESPONSE_CACHE_CONFIG, HTTP_CACHE_CONFIG, STATIC_CONFIG
+from http_pool import create_server
+from multipart import MultipartReader, MultipartError, parse_content_type
+from report_jobs import report_jobs, QueueFull
+from router import Router, RequestContext
+import json_stream
+import data_versions
+from response_cache import ResponseCache, etag_matches, make_etag
+from compression import is_compressible, negotiate, compress, StreamCompressor
+from static_files import StaticFiles, parse_range
+from token_cache import TokenCache
+from login import password_checker, last_logins, LoginBusy
+from user_search import search_users, iter_users, USERS
+from pagination import ListQuery, page_params
 
 # Configuration JWT
 SECRET_KEY = "votre_secret_key_complexe"
 TOKEN_EXPIRATION = 3600  # 1 heure
 
+logger = logging.getLogger(__name__)
+
+ROUTES = Router()
+# Jetons déjà vérifiés: les appels répétés d'un tableau de bord évitent le HMAC
+token_cache = TokenCache(AUTH_CONFIG['token_cache_size'])
+# Réponses des tableaux de bord (routes déclarant `versions`)
+api_cache = ResponseCache(**RESPONSE_CACHE_CONFIG)
+static_files = StaticFiles(**STATIC_CONFIG)
+
+# Politiques de cache HTTP. Les réponses authentifiées portent toujours
+# `Vary: Authorization`; nginx indexe son cache par jeton.
+PRIVATE_REVALIDATE = 'private, no-cache'  # navigateur seul, revalidation par ETag
+NO_STORE = 'no-store'
+REPORT_CACHE = f"max-age=0, s-maxage={HTTP_CACHE_CONFIG['report_s_maxage']}"
+
+def _version_etag(*parts):
+    """ETag fort dérivé de la clé d'un rapport et de la version de ses données"""
+    return make_etag(':'.join(str(part) for part in parts).encode('utf-8'))
+
+def _student_report_etag(ctx):
+    student_id = ctx.params['student_id']
+    return _version_etag('student', student_id, ctx.payload['role'],
+                         data_versions.version('student', student_id))
+
+def _class_report_etag(ctx):
+    class_id = ctx.query.get('class_id', [None])[0]
+    if not class_id:
+        return None
+    return _version_etag('class', class_id, ctx.query.get('type', ['summary'])[0],
+                         data_versions.version('class', class_id))
+
+def _class_transcripts_etag(ctx):
+    class_id = ctx.query.get('class_id', [None])[0]
+    if not class_id:
+        return None
+    return _version_etag('class-transcripts', class_id, ctx.query.get('format', ['zip'])[0],
+                         ctx.payload['role'], data_versions.version('class', class_id))
+
+# Listes paginées: champ exposé -> expression SQL
+STUDENT_GRADES = ListQuery({
+    'id': 'g.id',
+    'subject': 's.name',
+    'grade': 'g.grade',
+    'evaluation_date': 'g.evaluation_date',
+    'teacher': "CONCAT(t.prenom,' ',t.nom)",
+    'class_name': 'c.name'
+}, """grades g
+         JOIN subjects s ON g.subject_id=s.id
+         JOIN users t ON s.teacher_id=t.id
+         JOIN classes c ON s.class_id=c.id""", where='g.student_id=%s')
+
+# Effectifs et nombres de matières: une jointure groupée (index users(class_id, role))
+# plutôt qu'une sous-requête COUNT par ligne
+TEACHER_SUBJECTS = ListQuery({
+    'id': 's.id',
+    'name': 's.name',
+    'class_name': 'c.name',
+    'student_count': 'COUNT(u.id)'
+}, """subjects s
+         JOIN classes c ON s.class_id=c.id
+         LEFT JOIN users u ON u.class_id=c.id AND u.role='student'""",
+    where='s.teacher_id=%s', group_by='s.id')
+
+CLASSES = ListQuery({
+    'id': 'c.id',
+    'name': 'c.name',
+    'level': 'c.level',
+    'academic_year': 'c.academic_year',
+    'student_count': 'COUNT(u.id)'
+}, "classes c LEFT JOIN users u ON u.class_id=c.id AND u.role='student'", group_by='c.id')
+
+TEACHER_STUDENTS = ListQuery({
+    'id': 'u.id',
+    'nom': 'u.nom',
+    'prenom': 'u.prenom',
+    'email': 'u.email',
+    'class_name': 'c.name'
+}, """users u
+         JOIN classes c ON u.class_id=c.id
+         JOIN subjects s ON c.id=s.class_id""", where="s.teacher_id=%s AND u.role='student'", distinct=True)
+
+TEACHERS = ListQuery({
+    'id': 't.id',
+    'nom': 't.nom',
+    'prenom': 't.prenom',
+    'email': 't.email',
+    'subject_count': 'COUNT(s.id)'
+}, "users t LEFT JOIN subjects s ON s.teacher_id=t.id", where="t.role='teacher'", group_by='t.id')
+
 class RESTRequestHandler(BaseHTTPRequestHandler):
-    def _set_headers(self, status_code=200, content_type='application/json'):
+    # Connexions persistantes: chaque réponse porte Content-Length ou est
+    # envoyée en chunks
+    protocol_version = 'HTTP/1.1'
+    timeout = HTTP_KEEPALIVE_CONFIG['idle_timeout']
+    # En-têtes et corps sont écrits séparément: sans TCP_NODELAY, Nagle et
+    # l'ACK retardé ajoutent ~40 ms aux réponses d'une connexion réutilisée
+    disable_nagle_algorithm = True
+    _requests_left = 0
+    _body_read = False
+    # (clé, versions) de la réponse en cours à mettre en cache
+    _cache_slot = None
+    # Politique de cache de la requête API en cours (None hors API)
+    _cache_control = None
+    _vary_auth = False
+    _etag = None
+
+    def _set_headers(self, status_code=200, content_type='application/json', content_length=None, headers=None):
         self.send_response(status_code)
-        self.send_header('Content-Type', content_type)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        if content_length is not None:
+            self.send_header('Content-Length', str(content_length))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.send_header('Access-Control-Allow-Origin', 'http://localhost')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Authorization, Content-Type, X-Requested-With')
         self.send_header('Access-Control-Allow-Credentials', 'true')
+        self.send_header('Access-Control-Expose-Headers', 'X-Next-After')
+        if self.command == 'POST' and not self._body_read and int(self.headers.get('Content-Length') or 0):
+            # Corps non lu (réponse d'erreur): il serait pris pour la requête suivante
+            self.close_connection = True
+        if self.close_connection and self.request_version == 'HTTP/1.1':
+            self.send_header('Connection', 'close')
+        if self._cache_control:
+            self.send_header('Cache-Control',
+                             self._cache_control if status_code in (200, 304) else NO_STORE)
+            if self._vary_auth:
+                self.send_header('Vary', 'Authorization')
         self.end_headers()
 
+    def handle(self):
+        self._requests_left = HTTP_KEEPALIVE_CONFIG['max_requests']
+        super().handle()
+
+    def parse_request(self) -> bool:
+        if not super().parse_request():
+            return False
+        self._requests_left -= 1
+        if self._requests_left <= 0:
+            self.close_connection = True
+        return True
+
     def _parse_json(self):
         length = int(self.headers.get('Content-Length', 0))
         body = self.rfile.read(length).decode('utf-8')
+        self._body_read = True
         try:
             return json.loads(body)
         except json.JSONDecodeError:
@@ -43,249 +191,515 @@ class RESTRequestHandler(BaseHTTPRequestHandler):
         token = self._get_token()
         if not token:
             return False
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-            if payload.get('exp', 0) < datetime.utcnow().timestamp():
+        payload = token_cache.get(token)
+        if payload is None:
+            try:
+                payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
+            except jwt.PyJWTError:
                 return False
-            if roles and payload.get('role') not in roles:
+            if payload.get('exp', 0) < datetime.utcnow().timestamp():
                 return False
-            return payload
-        except jwt.PyJWTError:
+            token_cache.put(token, payload)
+        if roles and payload.get('role') not in roles:
             return False
+        return payload
 
     def _db_connection(self):
-        return mysql.connector.connect(**DB_CONFIG)
+        return get_connection()
 
-    def _send_response(self, code, data, content_type='application/json'):
-        self._set_headers(code, content_type)
-        if content_type == 'application/json':
-            self.wfile.write(json.dumps(data).encode('utf-8'))
-        else:
-            self.wfile.write(data)
+    def _send_page(self, ctx, list_query, params=(), paginate=True):
+        """Répond avec une page de `list_query` (limit/after/fields de la requête)
+
+        Avec `paginate=False`, une requête sans `limit` reçoit la liste
+        entière en une réponse (clients qui ne suivent pas X-Next-After).
+        """
+        try:
+            limit, after = page_params(ctx.query)
+            fields = list_query.parse_fields(ctx.query.get('fields', [''])[0])
+        except ValueError as e:
+            return self._send_response(400, {'error':str(e)})
+        if not paginate and 'limit' not in ctx.query:
+            return self._send_response(200, list(list_query.iter_rows(ctx.cursor, params, fields, after)))
+        if limit is None:
+            return self._send_stream(json_stream.iter_json_array(
+                list_query.iter_rows(ctx.cursor, params, fields, after)))
+        rows, next_after = list_query.fetch_page(ctx.cursor, params, fields, after, limit)
+        return self._send_rows(rows, next_after)
+
+    def _send_rows(self, rows, next_after):
+        headers = {'X-Next-After': str(next_after)} if next_after is not None else None
+        return self._send_response(200, rows, headers=headers)
+
+    def _send_stream(self, chunks, content_type='application/json'):
+        """Envoie un corps produit au fil de l'eau
+
+        En HTTP/1.1 le corps est découpé en chunks; sinon sa fin est marquée
+        par la fermeture de la connexion. Une erreur en cours d'envoi tronque
+        la réponse (pas de chunk final) et ferme la connexion. Le corps est
+        compressé à la volée si le client l'accepte.
+        """
+        chunked = self.request_version == 'HTTP/1.1' and self.protocol_version == 'HTTP/1.1'
+        headers = {'Transfer-Encoding': 'chunked'} if chunked else {}
+        compressor = None
+        if is_compressible(content_type, float('inf')):
+            headers['Vary'] = 'Accept-Encoding'
+            encoding = negotiate(self.headers.get('Accept-Encoding'))
+            if encoding:
+                compressor = StreamCompressor(encoding)
+                headers['Content-Encoding'] = encoding
+        if not chunked:
+            self.close_connection = True
+        self._set_headers(200, content_type, headers=headers)
+
+        def write(data):
+            if not data:
+                return
+            if chunked:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+            else:
+                self.wfile.write(data)
+
+        try:
+            for chunk in chunks:
+                write(compressor.compress(chunk) if compressor else chunk)
+            if compressor:
+                write(compressor.flush())
+            if chunked:
+                self.wfile.write(b'0\r\n\r\n')
+        except Exception as e:
+            logger.error(f"Réponse interrompue pour {self.path}: {str(e)}")
+            self.close_connection = True
+
+    def _not_modified(self, etag, headers=None) -> bool:
+        """Répond 304 si l'ETag correspond à l'en-tête If-None-Match de la requête"""
+        if not etag_matches(self.headers.get('If-None-Match'), etag):
+            return False
+        # Pas de Content-Type: un 304 ne décrit pas de représentation
+        self._set_headers(304, None, headers={**(headers or {}), 'ETag': etag})
+        return True
+
+    def _write_body(self, code, body, content_type, headers=None, etag=None, variants=None) -> bool:
+        """Envoie un corps complet avec compression négociée et validation par ETag
+
+        `variants` conserve les corps déjà compressés (cache de réponses).
+        Retourne True si une réponse 304 a été envoyée à la place.
+        """
+        headers = dict(headers or {})
+        if is_compressible(content_type, len(body)):
+            headers['Vary'] = 'Accept-Encoding'
+            encoding = negotiate(self.headers.get('Accept-Encoding'))
+            if encoding:
+                encoded = variants.get(encoding) if variants is not None else None
+                if encoded is None:
+                    encoded = compress(body, encoding)
+                    if variants is not None:
+                        variants[encoding] = encoded
+                body = encoded
+                headers['Content-Encoding'] = encoding
+                if etag:
+                    # Un ETag fort distinct par représentation
+                    etag = f'{etag[:-1]}-{encoding}"'
+        if etag:
+            if self._not_modified(etag, {'Vary': headers['Vary']} if 'Vary' in headers else None):
+                return True
+            headers['ETag'] = etag
+        self._set_headers(code, content_type, len(body), headers)
+        self.wfile.write(body)
+        return False
+
+    def _send_cached(self, entry):
+        """Envoie une réponse du cache, ou 304 si le client en a déjà la version"""
+        if self._write_body(200, entry.body, 'application/json', entry.headers, entry.etag, entry.variants):
+            api_cache.count_not_modified()
+
+    def _send_response(self, code, data, content_type='application/json', headers=None):
+        body = json_stream.dumps(data) if content_type == 'application/json' else data
+        if code == 200 and self._cache_slot is not None:
+            key, version = self._cache_slot
+            self._cache_slot = None
+            return self._send_cached(api_cache.put(key, version, body, headers))
+        etag = None
+        if code == 200 and self.command == 'GET' and self._cache_control and self._cache_control != NO_STORE:
+            etag = self._etag or make_etag(body)
+        self._write_body(code, body, content_type, headers, etag)
+
+    def _send_static(self, path):
+        """Fichier du frontend: 304, intervalle (206) ou fichier entier
+
+        Les petits fichiers sont servis depuis la mémoire (compressés si le
+        client l'accepte), les autres par sendfile.
+        """
+        entry = static_files.get(path)
+        if entry is None:
+            return self._send_response(404, {'error': 'Fichier non trouvé'})
+        mime = self._guess_mime_type(path)
+        headers = {'Accept-Ranges': 'bytes'}
+        byte_range = None
+        # If-Range: intervalle servi seulement si le client a la version courante
+        if_range = self.headers.get('If-Range')
+        if not if_range or if_range.strip() == entry.etag:
+            try:
+                byte_range = parse_range(self.headers.get('Range'), entry.size)
+            except ValueError:
+                return self._send_response(416, {'error': 'Intervalle non satisfiable'},
+                                           headers={'Content-Range': f'bytes */{entry.size}'})
+        if byte_range is None and entry.body is not None:
+            return self._write_body(200, entry.body, mime, headers, entry.etag, entry.variants)
+        if self._not_modified(entry.etag):
+            return
+        status, (start, end) = (206, byte_range) if byte_range else (200, (0, entry.size - 1))
+        if byte_range:
+            headers['Content-Range'] = f'bytes {start}-{end}/{entry.size}'
+        headers['ETag'] = entry.etag
+        length = end - start + 1
+        self._set_headers(status, mime, length, headers)
+        if entry.body is not None:
+            self.wfile.write(entry.body[start:end + 1])
+            return
+        try:
+            with open(entry.path, 'rb') as f:
+                sent = self.connection.sendfile(f, start, length)
+        except OSError as e:
+            logger.error(f"Envoi de {path} interrompu: {str(e)}")
+            sent = -1
+        if sent != length:
+            # Fichier tronqué entre-temps: Content-Length annoncé non tenu
+            self.close_connection = True
+
+    def _send_report(self, kind, params, content_type='application/pdf'):
+        """Génère un rapport via la file (workers bornés) et l'envoie"""
+        try:
+            report = report_jobs.render(kind, params)
+        except QueueFull as e:
+            return self._send_response(503, {'error':str(e)})
+        except ReportNotFound as e:
+            return self._send_response(404, {'error':str(e)})
+        except ValueError as e:
+            return self._send_response(400, {'error':str(e)})
+        return self._send_response(200, report, content_type=content_type)
 
     def do_OPTIONS(self):
+        self._cache_control = None
         self._set_headers(204)
 
     def do_GET(self):
-        parsed = urlparse(self.path)
-        path = parsed.path
-        query = parse_qs(parsed.query)
+        path = urlparse(self.path).path
+        self._cache_control = None
 
         # Static files
         if path.startswith('/static/'):
-            try:
-                with open(f"/app/frontend{path}", 'rb') as f:
-                    mime = self._guess_mime_type(path)
-                    self._send_response(200, f.read(), content_type=mime)
+            return self._send_static(path)
+
+        return self._dispatch('GET')
+
+    def do_POST(self):
+        self._body_read = False
+        return self._dispatch('POST')
+
+    def _dispatch(self, method):
+        parsed = urlparse(self.path)
+        # Réponses d'erreur et d'écriture: jamais mises en cache
+        self._cache_control, self._vary_auth, self._etag = NO_STORE, False, None
+        self._cache_slot = None
+        route, params = ROUTES.match(method, parsed.path)
+        if route is None:
+            return self._send_response(404, {'error':'Endpoint non trouvé'})
+
+        payload = None
+        if route.auth:
+            payload = self._verify_token()
+            if not payload:
+                return self._send_response(401, {'error': 'Non autorisé'})
+            if not route.allows(payload['role']):
+                # GET: a route reserved to another role is reported as missing
+                if method == 'GET':
+                    return self._send_response(404, {'error':'Endpoint non trouvé'})
+                return self._send_response(401, {'error':'Non autorisé'})
+
+        self._vary_auth = route.auth
+        if method == 'GET':
+            self._cache_control = route.cache_control or PRIVATE_REVALIDATE
+
+        if route.versions and payload:
+            # Versions lues avant la requête: une écriture concurrente
+            # invalide l'entrée produite
+            key = (route.pattern, str(payload['sub']),
+                   urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True))))
+            version = tuple(data_versions.version(scope, entity_id)
+                            for scope, entity_id in route.versions(payload))
+            entry = api_cache.get(key, version)
+            if entry is not None:
+                return self._send_cached(entry)
+            self._cache_slot = (key, version)
+
+        ctx = RequestContext(payload, parse_qs(parsed.query), params)
+        if route.etag and method == 'GET':
+            self._etag = route.etag(ctx)
+            if self._not_modified(self._etag):
                 return
-            except FileNotFoundError:
-                return self._send_response(404, {'error': 'Fichier non trouvé'})
 
-        # Health check
-        if path == '/api/health':
-            return self._send_response(200, {'status': 'OK'})
+        if not route.db:
+            return self._run(route, ctx)
+
+        if route.db == 'read':
+            # Réplica sauf écriture récente de l'utilisateur, de ses notes
+            # (étudiant) ou de la liste des comptes (import)
+            ctx.conn = get_read_connection(
+                payload['sub'], [('student', payload['sub']), ('users', None)])
+        else:
+            ctx.conn = self._db_connection()
+        ctx.cursor = ctx.conn.cursor(dictionary=True)
+        try:
+            return self._run(route, ctx)
+        finally:
+            try:
+                ctx.cursor.close()
+            except Exception:
+                # Résultat non lu (flux interrompu): le pool écartera la connexion
+                pass
+            ctx.conn.close()
+
+    def _run(self, route, ctx):
+        try:
+            return route.handler(self, ctx)
+        finally:
+            # Read-your-writes: les lectures suivantes de l'auteur iront sur le primaire
+            if route.method == 'POST' and ctx.payload:
+                get_router().note_write(ctx.payload['sub'])
+
+    # Health check
+    @ROUTES.get('/api/health', auth=False, cache_control=NO_STORE)
+    def _health(self, ctx):
+        return self._send_response(200, {'status': 'OK'})
+
+    # Admin: runtime statistics
+    @ROUTES.get('/api/stats', roles={'admin'}, cache_control=NO_STORE)
+    def _stats(self, ctx):
+        stats = {
+            'db_pool': get_pool().stats(),
+            'db_replicas': get_router().stats(),
+            'report_jobs': report_jobs.stats(),
+            'report_cache': report_cache.stats(),
+            'auth_tokens': token_cache.stats(),
+            'response_cache': api_cache.stats(),
+            'static_files': static_files.stats(),
+            'login': {'bcrypt': password_checker.stats(), 'last_login': last_logins.stats()}
+        }
+        if hasattr(self.server, 'stats'):
+            stats['http'] = self.server.stats()
+        return self._send_response(200, stats)
+
+    # Report job: status, or the PDF once rendered
+    @ROUTES.get('/api/report-jobs/<job_id>', roles={'teacher','admin'}, cache_control=NO_STORE)
+    def _report_job(self, ctx):
+        job = report_jobs.get(ctx.params['job_id'], ctx.payload['sub'])
+        if not job:
+            return self._send_response(404, {'error':'Rapport non trouvé'})
+        if job.status == 'done':
+            return self._send_response(200, job.result, content_type=job.content_type)
+        return self._send_response(500 if job.status == 'failed' else 202, job.to_dict())
+
+    # Admin: list users
+    @ROUTES.get('/api/users', roles={'admin'}, db='read')
+    def _list_users(self, ctx):
+        term = ctx.query.get('search', [''])[0].strip()
+        try:
+            limit, after = page_params(ctx.query)
+            fields = USERS.parse_fields(ctx.query.get('fields', [''])[0])
+        except ValueError as e:
+            return self._send_response(400, {'error':str(e)})
+        if limit is None:
+            return self._send_stream(json_stream.iter_json_array(
+                iter_users(ctx.cursor, term, after, fields)))
+        rows, next_after = search_users(ctx.cursor, term, after, limit, fields)
+        return self._send_rows(rows, next_after)
+
+    # Student: grades
+    @ROUTES.get('/api/grades', roles={'student'}, db='read',
+                versions=lambda payload: [('student', payload['sub'])])
+    def _student_grades(self, ctx):
+        # Le tableau de bord étudiant attend toutes ses notes: pas de page par défaut
+        return self._send_page(ctx, STUDENT_GRADES, (ctx.payload['sub'],), paginate=False)
+
+    # Student: schedule
+    @ROUTES.get('/api/schedule', roles={'student'}, db='read',
+                versions=lambda payload: [('schedule', None)])
+    def _student_schedule(self, ctx):
+        ctx.cursor.execute(
+            """
+            SELECT s.name, sch.day, sch.start_time, sch.end_time
+            FROM schedule sch
+                     JOIN subjects s ON sch.subject_id=s.id
+                     JOIN classes c ON s.class_id=c.id
+            WHERE c.id=(SELECT class_id FROM users WHERE id=%s)
+            """, (ctx.payload['sub'],))
+        return self._send_response(200, ctx.cursor.fetchall())
+
+    # Teacher: subjects
+    @ROUTES.get('/api/subjects', roles={'teacher'}, db='read')
+    def _teacher_subjects(self, ctx):
+        return self._send_page(ctx, TEACHER_SUBJECTS, (ctx.payload['sub'],))
+
+    # Admin: classes
+    @ROUTES.get('/api/classes', roles={'admin'}, db='read')
+    def _list_classes(self, ctx):
+        return self._send_page(ctx, CLASSES)
+
+    # Teacher: students in their subjects
+    @ROUTES.get('/api/students', roles={'teacher'}, db='read')
+    def _teacher_students(self, ctx):
+        return self._send_page(ctx, TEACHER_STUDENTS, (ctx.payload['sub'],))
 
-        # Protected
-        payload = self._verify_token()
-        if not payload:
-            return self._send_response(401, {'error': 'Non autorisé'})
+    # Report: student transcript
+    @ROUTES.get('/api/report/student/<student_id>', roles={'teacher','admin'},
+                cache_control=REPORT_CACHE, etag=_student_report_etag)
+    def _student_transcript(self, ctx):
+        return self._send_report('student', {'student_id': ctx.params['student_id'],
+                                              'requester_role': ctx.payload['role']})
 
-        conn = self._db_connection()
+    # Admin: list teachers
+    @ROUTES.get('/api/teachers', roles={'admin'}, db='read')
+    def _list_teachers(self, ctx):
+        return self._send_page(ctx, TEACHERS)
+
+    # Admin: class report (summary or detailed)
+    @ROUTES.get('/api/class-report', roles={'admin'},
+                cache_control=REPORT_CACHE, etag=_class_report_etag)
+    def _class_report(self, ctx):
+        class_id = ctx.query.get('class_id',[None])[0]
+        rpt_type = ctx.query.get('type',['summary'])[0]
+        if not class_id:
+            return self._send_response(400, {'error':'class_id requis'})
+        return self._send_report('class', {'class_id': class_id, 'report_type': rpt_type})
+
+    # Admin: every transcript of a class, as a ZIP or a single PDF
+    @ROUTES.get('/api/class-transcripts', roles={'admin'},
+                cache_control=REPORT_CACHE, etag=_class_transcripts_etag)
+    def _class_transcripts(self, ctx):
+        class_id = ctx.query.get('class_id',[None])[0]
+        output = ctx.query.get('format',['zip'])[0]
+        if not class_id or output not in ('zip','pdf'):
+            return self._send_response(400, {'error':'class_id et format (zip|pdf) requis'})
+        return self._send_report('class_transcripts', {'class_id': class_id,
+                                                       'requester_role': ctx.payload['role'],
+                                                       'output': output},
+                                 'application/zip' if output == 'zip' else 'application/pdf')
+
+    # Login
+    @ROUTES.post('/api/login', auth=False)
+    def _login(self, ctx):
+        data = self._parse_json()
+        if not data or not all(k in data for k in ('username','password')):
+            return self._send_response(400, {'error':'username et password requis'})
+        # Comptes créés par un import récent: lecture sur le primaire
+        conn = get_read_connection(entities=[('users', None)])
         cursor = conn.cursor(dictionary=True)
         try:
-            # Admin: list users
-            if path == '/api/users' and payload['role'] == 'admin':
-                term = query.get('search', [''])[0]
-                cursor.execute(
-                    """
-                    SELECT id, username, role, nom, prenom, email, class_id,
-                           CASE WHEN last_login > DATE_SUB(NOW(), INTERVAL 6 MONTH) THEN 'Actif' ELSE 'Inactif' END AS status
-                    FROM users
-                    WHERE username LIKE %s OR nom LIKE %s OR prenom LIKE %s
-                    """, (f"%{term}%", f"%{term}%", f"%{term}%"))
-                return self._send_response(200, cursor.fetchall())
-
-            # Student: grades
-            if path == '/api/grades' and payload['role'] == 'student':
-                cursor.execute(
-                    """
-                    SELECT s.name AS subject, g.grade, g.evaluation_date,
-                           CONCAT(t.prenom,' ',t.nom) AS teacher, c.name AS class_name
-                    FROM grades g
-                             JOIN subjects s ON g.subject_id=s.id
-                             JOIN users t ON s.teacher_id=t.id
-                             JOIN classes c ON s.class_id=c.id
-                    WHERE g.student_id=%s
-                    """, (payload['sub'],))
-                return self._send_response(200, cursor.fetchall())
-
-            # Student: schedule
-            if path == '/api/schedule' and payload['role'] == 'student':
-                cursor.execute(
-                    """
-                    SELECT s.name, sch.day, sch.start_time, sch.end_time
-                    FROM schedule sch
-                             JOIN subjects s ON sch.subject_id=s.id
-                             JOIN classes c ON s.class_id=c.id
-                    WHERE c.id=(SELECT class_id FROM users WHERE id=%s)
-                    """, (payload['sub'],))
-                return self._send_response(200, cursor.fetchall())
-
-            # Teacher: subjects
-            if path == '/api/subjects' and payload['role'] == 'teacher':
-                cursor.execute(
-                    """
-                    SELECT s.id, s.name, c.name AS class_name,
-                           (SELECT COUNT(*) FROM users WHERE class_id=c.id AND role='student') AS student_count
-                    FROM subjects s
-                             JOIN classes c ON s.class_id=c.id
-                    WHERE s.teacher_id=%s
-                    """, (payload['sub'],))
-                return self._send_response(200, cursor.fetchall())
-
-            # Admin: classes
-            if path == '/api/classes' and payload['role'] == 'admin':
-                cursor.execute(
-                    """
-                    SELECT id, name, level, academic_year,
-                           (SELECT COUNT(*) FROM users WHERE class_id=classes.id AND role='student') AS student_count
-                    FROM classes
-                    """
-                )
-                return self._send_response(200, cursor.fetchall())
-
-            # Teacher: students in their subjects
-            if path == '/api/students' and payload['role'] == 'teacher':
-                cursor.execute(
-                    """
-                    SELECT DISTINCT u.id, u.nom, u.prenom, u.email, c.name AS class_name
-                    FROM users u
-                             JOIN classes c ON u.class_id=c.id
-                             JOIN subjects s ON c.id=s.class_id
-                    WHERE s.teacher_id=%s AND u.role='student'
-                    """, (payload['sub'],))
-                return self._send_response(200, cursor.fetchall())
-
-            # Report: student transcript
-            if path.startswith('/api/report/student/') and payload['role'] in ['teacher','admin']:
-                student_id = path.split('/')[-1]
-                report = generate_student_transcript(student_id, payload['role'])
-                with open(report,'rb') as f:
-                    return self._send_response(200, f.read(), content_type='application/pdf')
-
-            # Admin: list teachers
-            if path == '/api/teachers' and payload['role'] == 'admin':
-                cursor.execute(
-                    """
-                    SELECT id, nom, prenom, email,
-                           (SELECT COUNT(*) FROM subjects WHERE teacher_id=users.id) AS subject_count
-                    FROM users WHERE role='teacher'
-                    """
-                )
-                return self._send_response(200, cursor.fetchall())
-
-            # Admin: class report (summary or detailed)
-            if path == '/api/class-report' and payload['role'] == 'admin':
-                class_id = query.get('class_id',[None])[0]
-                rpt_type = query.get('type',['summary'])[0]
-                if not class_id:
-                    return self._send_response(400, {'error':'class_id requis'})
-                report = generate_class_report(class_id, rpt_type)
-                with open(report,'rb') as f:
-                    return self._send_response(200, f.read(), content_type='application/pdf')
-
-            # Not found
-            return self._send_response(404, {'error':'Endpoint non trouvé'})
+            cursor.execute('SELECT id,password_hash,role FROM users WHERE username=%s',
+                           (data['username'],))
+            user = cursor.fetchone()
         finally:
             cursor.close()
             conn.close()
-
-    def do_POST(self):
-        parsed = urlparse(self.path)
-        path = parsed.path
-
-        # Login
-        if path == '/api/login':
-            data = self._parse_json()
-            if not data or not all(k in data for k in ('username','password')):
-                return self._send_response(400, {'error':'username et password requis'})
-            conn = self._db_connection()
-            cursor = conn.cursor(dictionary=True)
-            try:
-                cursor.execute('SELECT id,password_hash,role FROM users WHERE username=%s',
-                               (data['username'],))
-                user = cursor.fetchone()
-                if not user or not bcrypt.checkpw(data['password'].encode(), user['password_hash'].encode()):
-                    return self._send_response(401, {'error':'Non autorisé'})
-                exp = datetime.utcnow() + timedelta(seconds=TOKEN_EXPIRATION)
-                token = jwt.encode({'sub':user['id'],'role':user['role'],'exp':exp}, SECRET_KEY)
-                cursor.execute('UPDATE users SET last_login=NOW() WHERE id=%s',(user['id'],))
-                conn.commit()
-                return self._send_response(200, {'token':token})
-            finally:
-                cursor.close()
-                conn.close()
-
-        # File upload
-        if path == '/api/upload':
-            payload = self._verify_token(['teacher','admin'])
-            if not payload:
+        # La connexion est rendue au pool avant le calcul bcrypt
+        try:
+            if not user or not password_checker.check(data['password'], user['password_hash']):
                 return self._send_response(401, {'error':'Non autorisé'})
-            ctype, pdict = cgi.parse_header(self.headers.get('Content-Type',''))
-            if ctype != 'multipart/form-data':
-                return self._send_response(400, {'error':'multipart/form-data requis'})
-            form = cgi.FieldStorage(fp=self.rfile, headers=self.headers,
-                                    environ={'REQUEST_METHOD':'POST'})
-            file_item = form['file'] if 'file' in form else None
-            if not file_item or not file_item.file:
+        except LoginBusy as e:
+            return self._send_response(503, {'error':str(e)})
+        exp = datetime.utcnow() + timedelta(seconds=TOKEN_EXPIRATION)
+        token = jwt.encode({'sub':user['id'],'role':user['role'],'exp':exp}, SECRET_KEY)
+        last_logins.record(user['id'])
+        return self._send_response(200, {'token':token})
+
+    # File upload
+    @ROUTES.post('/api/upload', roles={'teacher','admin'})
+    def _upload(self, ctx):
+        ctype, boundary = parse_content_type(self.headers.get('Content-Type',''))
+        if ctype != 'multipart/form-data':
+            return self._send_response(400, {'error':'multipart/form-data requis'})
+        length = int(self.headers.get('Content-Length', 0))
+        if length > UPLOAD_CONFIG['max_size']:
+            self.close_connection = True
+            return self._send_response(413, {'error':'Fichier trop volumineux'})
+        try:
+            upload = MultipartReader(self.rfile, boundary, length, UPLOAD_CONFIG['chunk_size'])
+            file_item = upload.field('file')
+            if not file_item:
                 return self._send_response(400, {'error':'Fichier manquant'})
-            data = file_item.file.read().decode('utf-8')
-            try:
-                if payload['role']=='admin':
-                    result = process_csv(data)
-                else:
-                    result = process_grades_csv(data, payload['sub'])
-                return self._send_response(201, result)
-            except Exception as e:
-                return self._send_response(500, {'error':str(e)})
-
-        # Create class (admin)
-        if path == '/api/classes':
-            payload = self._verify_token(['admin'])
-            data = self._parse_json()
-            if not payload or not data or not all(k in data for k in ('name','level','academic_year')):
-                return self._send_response(400, {'error':'Données manquantes'})
-            try:
-                cid = add_class(data['name'], data['level'], data['academic_year'])
-                return self._send_response(201, {'id':cid})
-            except Exception as e:
-                return self._send_response(500, {'error':str(e)})
-
-        # Create subject (admin)
-        if path == '/api/subjects':
-            payload = self._verify_token(['admin'])
-            data = self._parse_json()
-            if not payload or not data or not all(k in data for k in ('name','teacher_id','class_id')):
-                return self._send_response(400, {'error':'Données manquantes'})
-            try:
-                sid = add_subject(data['name'], data['teacher_id'], data['class_id'])
-                return self._send_response(201, {'id':sid})
-            except Exception as e:
-                return self._send_response(500, {'error':str(e)})
-
-        # Add grade (teacher)
-        if path == '/api/grades':
-            payload = self._verify_token(['teacher'])
-            data = self._parse_json()
-            if not payload or not data or not all(k in data for k in ('student_id','subject_id','grade')):
-                return self._send_response(400, {'error':'Données manquantes'})
-            try:
-                gid = add_grade(data['student_id'], data['subject_id'], data['grade'], data.get('comments',''))
-                return self._send_response(201, {'id':gid})
-            except Exception as e:
-                return self._send_response(500, {'error':str(e)})
+            # Les lignes sont décodées et traitées au fil de la lecture du corps
+            data = io.TextIOWrapper(file_item, encoding='utf-8', newline='')
+            if ctx.payload['role']=='admin':
+                result = process_csv(data)
+            else:
+                result = process_grades_csv(data, ctx.payload['sub'])
+            upload.drain()
+            self._body_read = True
+            return self._send_response(201, result)
+        except MultipartError as e:
+            self.close_connection = True
+            return self._send_response(400, {'error':str(e)})
+        except Exception as e:
+            self.close_connection = True
+            return self._send_response(500, {'error':str(e)})
+
+    # Report job submission (teacher/admin)
+    @ROUTES.post('/api/report-jobs', roles={'teacher','admin'})
+    def _submit_report_job(self, ctx):
+        data = self._parse_json()
+        if not data:
+            return self._send_response(400, {'error':'Données manquantes'})
+        role = ctx.payload['role']
+        if data.get('kind') == 'student' and 'student_id' in data:
+            params = {'student_id': data['student_id'], 'requester_role': role}
+        elif data.get('kind') == 'class' and 'class_id' in data and role == 'admin':
+            params = {'class_id': data['class_id'], 'report_type': data.get('type','summary')}
+        elif data.get('kind') == 'class_transcripts' and 'class_id' in data and role == 'admin':
+            params = {'class_id': data['class_id'], 'requester_role': role,
+                      'output': data.get('format','zip')}
+        else:
+            return self._send_response(400, {'error':'Données manquantes'})
+        try:
+            job = report_jobs.submit(data['kind'], params, ctx.payload['sub'])
+            return self._send_response(202, job.to_dict())
+        except QueueFull as e:
+            return self._send_response(503, {'error':str(e)})
+
+    # Create class (admin)
+    @ROUTES.post('/api/classes', roles={'admin'})
+    def _create_class(self, ctx):
+        data = self._parse_json()
+        if not data or not all(k in data for k in ('name','level','academic_year')):
+            return self._send_response(400, {'error':'Données manquantes'})
+        try:
+            cid = add_class(data['name'], data['level'], data['academic_year'])
+            return self._send_response(201, {'id':cid})
+        except Exception as e:
+            return self._send_response(500, {'error':str(e)})
 
-        return self._send_response(404, {'error':'Endpoint non trouvé'})
+    # Create subject (admin)
+    @ROUTES.post('/api/subjects', roles={'admin'})
+    def _create_subject(self, ctx):
+        data = self._parse_json()
+        if not data or not all(k in data for k in ('name','teacher_id','class_id')):
+            return self._send_response(400, {'error':'Données manquantes'})
+        try:
+            sid = add_subject(data['name'], data['teacher_id'], data['class_id'])
+            return self._send_response(201, {'id':sid})
+        except Exception as e:
+            return self._send_response(500, {'error':str(e)})
+
+    # Add grade (teacher)
+    @ROUTES.post('/api/grades', roles={'teacher'})
+    def _add_grade(self, ctx):
+        data = self._parse_json()
+        if not data or not all(k in data for k in ('student_id','subject_id','grade')):
+            return self._send_response(400, {'error':'Données manquantes'})
+        try:
+            gid = add_grade(data['student_id'], data['subject_id'], data['grade'], data.get('comments',''))
+            return self._send_response(201, {'id':gid})
+        except Exception as e:
+            return self._send_response(500, {'error':str(e)})
 
     def _guess_mime_type(self, path):
         if path.endswith('.js'):
@@ -302,6 +716,11 @@ class RESTRequestHandler(BaseHTTPRequestHandler):
 
 if __name__ == '__main__':
     init_db()
-    server = HTTPServer(('0.0.0.0', 8000), RESTRequestHandler)
-    print("Serveur démarré sur http://0.0.0.0:8000")
-    server.serve_forever()
\ No newline at end of file
+    server = create_server(RESTRequestHandler, **SERVER_CONFIG)
+    print(f"Serveur démarré sur http://{SERVER_CONFIG['host']}:{SERVER_CONFIG['port']} "
+          f"({SERVER_CONFIG['workers']} workers)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        last_logins.stop()
\ No newline at end of file
@@ -0,0 +1,127 @@
+# static_files.py
+import os
+import threading
+from collections import OrderedDict
+from response_cache import make_etag
+
+
+class StaticFile:
+    __slots__ = ('path', 'size', 'mtime_ns', 'etag', 'body', 'variants')
+
+    def __init__(self, path, size, mtime_ns, etag, body=None):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.etag = etag
+        self.body = body    # None: fichier trop gros, envoyé par sendfile
+        self.variants = {}  # encodage -> corps compressé, calculé à la première demande
+
+
+class StaticFiles:
+    """Fichiers du frontend servis par le backend
+
+    Les chemins sont résolus sous `root` (liens symboliques compris): tout
+    chemin qui en sort est refusé. Les petits fichiers sont gardés en
+    mémoire (LRU borné en octets) avec leur ETag et leurs variantes
+    compressées; les autres sont envoyés par sendfile sans passer par
+    Python. Un changement de taille ou de date de modification invalide
+    l'entrée.
+    """
+
+    def __init__(self, root='/app/frontend', cache_max_bytes=16 * 1024 * 1024,
+                 cache_max_file_size=256 * 1024):
+        self.root = os.path.realpath(root)
+        self.cache_max_bytes = cache_max_bytes
+        self.cache_max_file_size = cache_max_file_size
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def resolve(self, relative_path):
+        """Chemin réel du fichier sous la racine, ou None"""
+        if '\0' in relative_path:
+            return None
+        path = os.path.realpath(os.path.join(self.root, relative_path.lstrip('/')))
+        if os.path.commonpath([self.root, path]) != self.root:
+            return None
+        return path
+
+    def get(self, relative_path):
+        """StaticFile à jour pour le chemin demandé, ou None s'il n'existe pas"""
+        path = self.resolve(relative_path)
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not os.path.isfile(path):
+            return None
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and (entry.size, entry.mtime_ns) == (st.st_size, st.st_mtime_ns):
+                self._entries.move_to_end(path)
+                self._counters['hits'] += 1
+                return entry
+        if st.st_size > self.cache_max_file_size:
+            return StaticFile(path, st.st_size, st.st_mtime_ns,
+                              f'"{st.st_size:x}-{st.st_mtime_ns:x}"')
+        try:
+            with open(path, 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        entry = StaticFile(path, len(body), st.st_mtime_ns, make_etag(body), body)
+        self._store(entry)
+        return entry
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.cache_max_bytes,
+                **self._counters
+            }
+
+    def _store(self, entry):
+        with self._lock:
+            self._counters['misses'] += 1
+            old = self._entries.pop(entry.path, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[entry.path] = entry
+            self._bytes += entry.size
+            while self._bytes > self.cache_max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._counters['evictions'] += 1
+
+
+def parse_range(range_header, size):
+    """(début, fin incluse) d'un en-tête Range à intervalle unique
+
+    Retourne None si l'en-tête est absent ou non géré (plusieurs
+    intervalles: le fichier entier est alors envoyé) et lève ValueError
+    si l'intervalle n'est pas satisfiable.
+    """
+    if not size or not range_header or not range_header.startswith('bytes=') or ',' in range_header:
+        return None
+    first, sep, last = range_header[6:].strip().partition('-')
+    if not sep:
+        return None
+    try:
+        if not first:
+            # Suffixe: les `last` derniers octets
+            length = int(last)
+            if length <= 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise ValueError(f"Intervalle non satisfiable: {range_header}")
+    return start, min(end, size - 1)
@@ -0,0 +1,54 @@
+# tests/test_compression.py
+import gzip
+import zlib
+
+import pytest
+
+import compression
+from compression import StreamCompressor, compress, is_compressible, negotiate
+
+
+@pytest.fixture(autouse=True)
+def gzip_only(monkeypatch):
+    # Indépendant des paquets optionnels installés
+    monkeypatch.setattr(compression, '_AVAILABLE', ['gzip'])
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None),
+    ('', None),
+    ('gzip', 'gzip'),
+    ('GZIP', 'gzip'),
+    ('deflate, gzip;q=0.5', 'gzip'),
+    ('gzip;q=0', None),
+    ('*', 'gzip'),
+    ('*;q=0', None),
+    ('gzip;q=0, *', None),
+    ('x-gzip', 'gzip'),
+    ('br', None),
+    ('gzip;q=abc', None),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header) == expected
+
+
+def test_preference_order_breaks_ties(monkeypatch):
+    monkeypatch.setattr(compression, '_AVAILABLE', ['br', 'gzip'])
+    assert negotiate('gzip, br') == 'br'
+    assert negotiate('gzip, br;q=0.5') == 'gzip'
+
+
+def test_is_compressible():
+    size = compression.COMPRESSION_CONFIG['min_size']
+    assert is_compressible('application/json', size)
+    assert is_compressible('text/css', size)
+    assert not is_compressible('application/json', size - 1)
+    assert not is_compressible('application/pdf', size)
+
+
+def test_gzip_round_trip():
+    data = b'{"grade": 12}' * 1000
+    assert gzip.decompress(compress(data, 'gzip')) == data
+    stream = StreamCompressor('gzip')
+    chunks = b''.join(stream.compress(data[i:i + 100]) for i in range(0, len(data), 100)) + stream.flush()
+    assert zlib.decompress(chunks, 31) == data
@@ -0,0 +1,92 @@
+# tests/test_csv_processor.py
+import pytest
+
+import csv_processor
+
+HEADER = 'student_email,subject_name,grade,comments\n'
+
+
+class StubCursor:
+    """Curseur factice: étudiants et matières connus, requêtes enregistrées
+
+    Les recherches groupées comparent sans casse; les recherches d'une
+    seule clé imitent une collation insensible aux accents.
+    """
+
+    def __init__(self, students, subjects):
+        self.tables = {'users': students, 'subjects': subjects}
+        self.executed = []
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        self.executed.append((sql, params))
+        table = 'users' if 'FROM users' in sql else 'subjects'
+        keys = params[1:] if table == 'subjects' else params
+        fold = lambda value: value.lower().replace('ç', 'c').replace('é', 'e')
+        if len(keys) == 1 and 'LIMIT 1' in sql:
+            match = lambda name, key: fold(name) == fold(key)
+        else:
+            match = lambda name, key: name.lower() == key
+        self._rows = [{'id': id_, 'lookup_key': name} for name, id_ in self.tables[table].items()
+                      if any(match(name, key) for key in keys)]
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def close(self):
+        pass
+
+
+class StubConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.committed = self.rolled_back = False
+
+    def cursor(self, **kwargs):
+        return self._cursor
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db(monkeypatch):
+    cursor = StubCursor({'a@x.com': 1}, {'Français': 10})
+    conn = StubConnection(cursor)
+    monkeypatch.setattr(csv_processor, 'get_connection', lambda: conn)
+    return conn
+
+
+@pytest.mark.parametrize('line', ['a@x.com,Français,12', 'a@x.com,Français', 'a@x.com'])
+def test_short_or_incomplete_row_is_reported_on_its_line(db, line):
+    result = csv_processor.process_grades_csv(HEADER + 'a@x.com,Français,15,bien\n' + line + '\n', 5)
+    assert result['success'] is False
+    assert [(e['ligne'], e['erreur']) for e in result['errors']] == [(3, 'Champs manquants')]
+    assert db.rolled_back and not db.committed
+
+
+def test_lookup_falls_back_to_the_database_collation():
+    cursor = StubCursor({}, {'Français': 10})
+    found = csv_processor._lookup_ids(
+        cursor, "SELECT id, name AS lookup_key FROM subjects WHERE teacher_id = %s AND name IN ({})",
+        ['français', 'francais', 'histoire'], (5,))
+    assert found == {'français': 10, 'francais': 10}
+    # Une requête groupée, puis une par clé non résolue
+    assert len(cursor.executed) == 3
+
+
+def test_lookup_without_fallback():
+    cursor = StubCursor({'Élise@x.com': 3}, {})
+    found = csv_processor._lookup_ids(
+        cursor, "SELECT id, email AS lookup_key FROM users WHERE email IN ({})",
+        ['elise@x.com'], exact_fallback=False)
+    assert found == {} and len(cursor.executed) == 1
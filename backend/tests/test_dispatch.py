@@ -0,0 +1,127 @@
+# tests/test_dispatch.py
+import io
+import json
+from datetime import datetime, timedelta
+from email.message import Message
+
+import jwt
+import pytest
+
+import server
+
+
+class CountingConnection:
+    """Connexion factice: compte les ouvertures et les requêtes"""
+
+    def __init__(self, counter):
+        self.counter = counter
+        counter['connections'] += 1
+
+    def cursor(self, **kwargs):
+        return self
+
+    def execute(self, sql, params=()):
+        self.counter['queries'].append(sql)
+
+    def fetchall(self):
+        return []
+
+    def fetchmany(self, size):
+        return []
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def counter(monkeypatch):
+    counter = {'connections': 0, 'queries': []}
+    open_connection = lambda *args, **kwargs: CountingConnection(counter)
+    monkeypatch.setattr(server, 'get_connection', open_connection)
+    monkeypatch.setattr(server, 'get_read_connection', open_connection)
+    monkeypatch.setattr(server.RESTRequestHandler, '_db_connection', lambda self: open_connection())
+    return counter
+
+
+class FakeHandler(server.RESTRequestHandler):
+    """Handler sans socket: requête en mémoire, réponse dans wfile"""
+
+    def __init__(self, method, path, headers=None, body=b''):
+        self.command = method
+        self.path = path
+        self.request_version = 'HTTP/1.1'
+        self.requestline = f'{method} {path} HTTP/1.1'
+        self.client_address = ('127.0.0.1', 0)
+        self.close_connection = False
+        self.headers = Message()
+        for name, value in (headers or {}).items():
+            self.headers[name] = value
+        if body:
+            self.headers['Content-Length'] = str(len(body))
+        self.rfile = io.BytesIO(body)
+        self.wfile = io.BytesIO()
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def status(self):
+        return int(self.wfile.getvalue().split(b' ', 2)[1])
+
+
+def token(role, user_id='1'):
+    exp = datetime.utcnow() + timedelta(minutes=5)
+    return 'Bearer ' + jwt.encode({'sub': user_id, 'role': role, 'exp': exp}, server.SECRET_KEY)
+
+
+def request(method, path, headers=None, body=b''):
+    handler = FakeHandler(method, path, headers, body)
+    if method == 'GET':
+        handler.do_GET()
+    else:
+        handler.do_POST()
+    return handler
+
+
+@pytest.mark.parametrize('method, path, headers, status', [
+    ('GET', '/api/unknown', {}, 404),
+    ('POST', '/api/unknown', {}, 404),
+    ('GET', '/api/report/student/1/extra', {}, 404),
+    ('GET', '/api/teachers', {}, 401),
+    ('GET', '/api/teachers', {'Authorization': 'Bearer invalide'}, 401),
+    ('GET', '/api/teachers', {'Authorization': token('student')}, 404),
+    ('POST', '/api/grades', {'Authorization': token('student')}, 401),
+])
+def test_rejected_requests_never_touch_the_database(counter, method, path, headers, status):
+    handler = request(method, path, headers, b'{}' if method == 'POST' else b'')
+    assert handler.status == status
+    assert counter == {'connections': 0, 'queries': []}
+
+
+def test_matched_route_uses_one_connection(counter):
+    handler = request('GET', '/api/teachers', {'Authorization': token('admin')})
+    assert handler.status == 200
+    assert counter['connections'] == 1 and len(counter['queries']) == 1
+
+
+def test_unread_post_body_closes_the_connection(counter):
+    handler = request('POST', '/api/unknown', {}, json.dumps({'a': 1}).encode())
+    assert handler.close_connection
+    assert b'Connection: close' in handler.wfile.getvalue()
+
+
+@pytest.mark.parametrize('path, error, status', [
+    ('/api/report/student/999', server.ReportNotFound("Étudiant non trouvé"), 404),
+    ('/api/class-report?class_id=999', server.ReportNotFound("Classe non trouvée"), 404),
+    ('/api/class-report?class_id=1&type=x', ValueError("Type de rapport non valide"), 400),
+    ('/api/class-transcripts?class_id=999', server.ReportNotFound("Classe non trouvée"), 404),
+    ('/api/class-report?class_id=1', server.QueueFull("Trop de rapports"), 503),
+])
+def test_report_errors_are_answered(counter, monkeypatch, path, error, status):
+    def render(kind, params):
+        raise error
+    monkeypatch.setattr(server.report_jobs, 'render', render)
+    handler = request('GET', path, {'Authorization': token('admin')})
+    assert handler.status == status
+    body = handler.wfile.getvalue().split(b'\r\n\r\n', 1)[1]
+    assert json.loads(body) == {'error': str(error)}
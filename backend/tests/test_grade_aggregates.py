@@ -0,0 +1,47 @@
+# tests/test_grade_aggregates.py
+from decimal import Decimal
+
+from grade_aggregates import AggregateBatch, record_grades
+
+
+class RecordingCursor:
+    def __init__(self, classes):
+        self.classes = classes
+        self.executed = []
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        self.executed.append((' '.join(sql.split()), params))
+        if sql.startswith('SELECT id, class_id'):
+            self._rows = [(sid, self.classes[sid]) for sid in params if sid in self.classes]
+
+    def fetchall(self):
+        return self._rows
+
+
+def upserts(cursor, table):
+    return [params for sql, params in cursor.executed if sql.startswith(f'INSERT INTO {table} ')]
+
+
+def test_batch_writes_sorted_aggregates_once_with_one_class_lookup():
+    cursor = RecordingCursor({1: 20, 2: 10, 3: 20})
+    batch = AggregateBatch()
+    batch.add([(3, 7, 12), (1, 7, 8)])
+    batch.add([(2, 5, 15), (1, 7, 10), (1, 9, None)])
+    assert cursor.executed == []  # rien n'est écrit avant flush()
+
+    assert batch.flush(cursor) == {10, 20}
+    lookups = [sql for sql, _ in cursor.executed if sql.startswith('SELECT')]
+    assert len(lookups) == 1
+    subject_rows = upserts(cursor, 'grade_aggregates')[0]
+    assert subject_rows[0::7] == (1, 2, 3)  # triées par (étudiant, matière)
+    assert subject_rows[2:7] == (2, Decimal('18'), Decimal('164'), Decimal('8'), Decimal('10'))
+    class_rows = upserts(cursor, 'class_grade_aggregates')[0]
+    assert class_rows[0::6] == (10, 20)
+    assert class_rows[6:12] == (20, 3, Decimal('30'), Decimal('308'), Decimal('8'), Decimal('12'))
+
+
+def test_null_grades_touch_classes_without_aggregating():
+    cursor = RecordingCursor({1: 20})
+    assert record_grades(cursor, [(1, 7, None)]) == {20}
+    assert upserts(cursor, 'grade_aggregates') == []
@@ -0,0 +1,64 @@
+# tests/test_list_queries.py
+import re
+
+import mysql.connector
+import pytest
+
+from config import DB_CONFIG
+from server import TEACHER_SUBJECTS, CLASSES, TEACHERS
+
+# (requête, paramètres) des listes avec effectifs agrégés
+COUNTED_LISTS = {
+    'teacher_subjects': (TEACHER_SUBJECTS, (1,)),
+    'classes': (CLASSES, ()),
+    'teachers': (TEACHERS, ()),
+}
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, sql, params=()):
+        self.executed.append((' '.join(sql.split()), params))
+
+    def fetchall(self):
+        return []
+
+
+def generated_sql(query, params):
+    cursor = RecordingCursor()
+    query.fetch_page(cursor, params, after=0, limit=100)
+    return cursor.executed[0]
+
+
+@pytest.mark.parametrize('name', COUNTED_LISTS)
+def test_counts_use_a_grouped_join(name):
+    query, params = COUNTED_LISTS[name]
+    sql, _ = generated_sql(query, params)
+    assert not re.search(r'\(\s*SELECT\s+COUNT', sql, re.IGNORECASE)
+    assert 'LEFT JOIN' in sql
+    # Regroupement sur la clé primaire de la table listée
+    assert f"GROUP BY {query.columns['id']} " in sql
+
+
+@pytest.fixture(scope='module')
+def mysql_cursor():
+    try:
+        conn = mysql.connector.connect(**DB_CONFIG, connection_timeout=2)
+    except mysql.connector.Error as e:
+        pytest.skip(f"MySQL indisponible: {e}")
+    cursor = conn.cursor(dictionary=True)
+    yield cursor
+    cursor.close()
+    conn.close()
+
+
+@pytest.mark.parametrize('name', COUNTED_LISTS)
+def test_explain_has_no_dependent_subquery(mysql_cursor, name):
+    query, params = COUNTED_LISTS[name]
+    sql, args = generated_sql(query, params)
+    mysql_cursor.execute(f"EXPLAIN {sql}", args)
+    plan = mysql_cursor.fetchall()
+    assert plan
+    assert not [row for row in plan if 'DEPENDENT' in (row.get('select_type') or '')]
@@ -0,0 +1,58 @@
+# tests/test_multipart.py
+import io
+
+import pytest
+
+from multipart import MultipartReader, MultipartError, parse_content_type
+
+BOUNDARY = 'XyZ123'
+
+
+def body(*parts, final=True):
+    out = b''
+    for name, content in parts:
+        out += (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"'
+                f'; filename="{name}.csv"\r\n\r\n').encode() + content + b'\r\n'
+    if final:
+        out += f'--{BOUNDARY}--\r\n'.encode()
+    return out
+
+
+def reader(data, chunk_size=7):
+    return MultipartReader(io.BytesIO(data), BOUNDARY, len(data), chunk_size)
+
+
+def test_parse_content_type():
+    assert parse_content_type(f'multipart/form-data; boundary={BOUNDARY}') == ('multipart/form-data', BOUNDARY)
+    assert parse_content_type('') == ('text/plain', None)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 64 * 1024])
+def test_field_is_read_whatever_the_chunk_size(chunk_size):
+    content = b'email,grade\r\n' + b'a@b.fr,12\r\n' * 50
+    data = body(('other', b'ignored --XyZ12 not a delimiter'), ('file', content))
+    assert reader(data, chunk_size).field('file').read() == content
+
+
+def test_missing_field():
+    assert reader(body(('other', b'x'))).field('file') is None
+
+
+def test_truncated_body():
+    data = body(('file', b'x' * 100), final=False)[:-20]
+    with pytest.raises(MultipartError):
+        reader(data).field('file').read()
+
+
+def test_missing_boundary():
+    with pytest.raises(MultipartError):
+        MultipartReader(io.BytesIO(b''), None, 0)
+
+
+def test_reads_never_go_past_content_length():
+    data = body(('file', b'abc'))
+    rfile = io.BytesIO(data + b'GET /next HTTP/1.1\r\n')
+    upload = MultipartReader(rfile, BOUNDARY, len(data), 5)
+    assert upload.field('file').read() == b'abc'
+    upload.drain()
+    assert rfile.read() == b'GET /next HTTP/1.1\r\n'
@@ -0,0 +1,77 @@
+# tests/test_pagination.py
+import pytest
+
+from config import PAGINATION_CONFIG
+from pagination import ListQuery, page_params
+
+
+class RecordingCursor:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.executed = []
+
+    def execute(self, sql, params=()):
+        self.executed.append((' '.join(sql.split()), params))
+
+    def fetchall(self):
+        return self.rows
+
+
+QUERY = ListQuery({'id': 'u.id', 'nom': 'u.nom', 'total': 'COUNT(s.id)'},
+                  'users u LEFT JOIN subjects s ON s.teacher_id=u.id',
+                  where="u.role=%s", group_by='u.id')
+
+
+def test_page_sql():
+    cursor = RecordingCursor()
+    QUERY.fetch_page(cursor, ('teacher',), after=10, limit=5)
+    assert cursor.executed == [(
+        "SELECT u.id AS id, u.nom AS nom, COUNT(s.id) AS total "
+        "FROM users u LEFT JOIN subjects s ON s.teacher_id=u.id "
+        "WHERE u.role=%s AND u.id > %s GROUP BY u.id ORDER BY u.id LIMIT %s",
+        ('teacher', 10, 5)
+    )]
+
+
+def test_projection_keeps_the_key_for_the_cursor():
+    rows = [{'nom': 'A', 'id': 1}, {'nom': 'B', 'id': 2}]
+    cursor = RecordingCursor(rows)
+    page, next_after = QUERY.fetch_page(cursor, ('teacher',), fields=['nom'], limit=2)
+    assert cursor.executed[0][0].startswith("SELECT u.nom AS nom, u.id AS id FROM")
+    assert page == [{'nom': 'A'}, {'nom': 'B'}] and next_after == 2
+
+
+def test_extra_condition_and_distinct():
+    query = ListQuery({'id': 'u.id'}, 'users u', distinct=True)
+    cursor = RecordingCursor()
+    query.fetch_page(cursor, (), after=0, limit=3, condition='u.nom LIKE %s', condition_params=('a%',))
+    assert cursor.executed == [(
+        "SELECT DISTINCT u.id AS id FROM users u WHERE u.nom LIKE %s AND u.id > %s ORDER BY u.id LIMIT %s",
+        ('a%', 0, 3)
+    )]
+
+
+def test_last_page_has_no_cursor():
+    page, next_after = QUERY.fetch_page(RecordingCursor([{'id': 1}]), ('teacher',), limit=2)
+    assert next_after is None
+
+
+def test_unknown_field():
+    with pytest.raises(ValueError):
+        QUERY.parse_fields('nom,password_hash')
+
+
+@pytest.mark.parametrize('query, expected', [
+    ({}, (PAGINATION_CONFIG['page_size'], 0)),
+    ({'limit': ['all']}, (None, 0)),
+    ({'limit': ['5'], 'after': ['7']}, (5, 7)),
+    ({'limit': [str(PAGINATION_CONFIG['max_page_size'] + 1)]}, (PAGINATION_CONFIG['max_page_size'], 0)),
+])
+def test_page_params(query, expected):
+    assert page_params(query) == expected
+
+
+@pytest.mark.parametrize('query', [{'limit': ['0']}, {'limit': ['x']}, {'after': ['y']}])
+def test_invalid_page_params(query):
+    with pytest.raises(ValueError):
+        page_params(query)
@@ -0,0 +1,49 @@
+# tests/test_router.py
+import pytest
+from router import Router
+
+
+def handler(*args):
+    pass
+
+
+@pytest.fixture
+def router():
+    r = Router()
+    r.add('GET', '/api/grades', handler)
+    r.add('POST', '/api/grades', handler)
+    r.add('GET', '/api/report/student/<student_id>', handler)
+    r.add('GET', '/api/report/student/latest', handler)
+    return r
+
+
+def test_exact_path(router):
+    route, params = router.match('GET', '/api/grades')
+    assert route.pattern == '/api/grades' and params == {}
+
+
+def test_method_is_part_of_the_match(router):
+    assert router.match('POST', '/api/grades')[0].method == 'POST'
+    assert router.match('DELETE', '/api/grades') == (None, {})
+
+
+def test_parameter_is_captured(router):
+    route, params = router.match('GET', '/api/report/student/42')
+    assert route.pattern == '/api/report/student/<student_id>'
+    assert params == {'student_id': '42'}
+
+
+def test_fixed_segment_wins_over_parameter(router):
+    route, params = router.match('GET', '/api/report/student/latest')
+    assert route.pattern == '/api/report/student/latest' and params == {}
+
+
+@pytest.mark.parametrize('path', ['/api/unknown', '/api/report/student', '/api/report/student/',
+                                  '/api/report/student/1/extra', '/'])
+def test_unmatched_paths(router, path):
+    assert router.match('GET', path) == (None, {})
+
+
+def test_conflicting_parameter_names_are_rejected(router):
+    with pytest.raises(ValueError):
+        router.add('GET', '/api/report/student/<id>/pdf', handler)
@@ -0,0 +1,64 @@
+# tests/test_static_files.py
+import os
+
+import pytest
+
+from static_files import StaticFiles, parse_range
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None),
+    ('bytes=0-9', (0, 9)),
+    ('bytes=10-', (10, 99)),
+    ('bytes=-10', (90, 99)),
+    ('bytes=-500', (0, 99)),
+    ('bytes=50-500', (50, 99)),
+    ('bytes=0-1,5-6', None),
+    ('items=0-9', None),
+    ('bytes=a-b', None),
+    ('bytes=-0', None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize('header', ['bytes=100-', 'bytes=9-5'])
+def test_unsatisfiable_range(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 100)
+
+
+def test_empty_file_has_no_range():
+    assert parse_range('bytes=0-9', 0) is None
+
+
+@pytest.fixture
+def static(tmp_path):
+    root = tmp_path / 'frontend'
+    (root / 'static').mkdir(parents=True)
+    (root / 'static' / 'app.js').write_bytes(b'console.log(1);')
+    (root / 'static' / 'big.bin').write_bytes(b'x' * 64)
+    (tmp_path / 'secret.txt').write_text('secret')
+    os.symlink(tmp_path / 'secret.txt', root / 'static' / 'link.txt')
+    return StaticFiles(str(root), cache_max_bytes=32, cache_max_file_size=32)
+
+
+@pytest.mark.parametrize('path', ['/static/../../secret.txt', '/static/link.txt', '/static/',
+                                  '/static/missing.js', '/static/app.js\0'])
+def test_paths_outside_root_or_missing(static, path):
+    assert static.get(path) is None
+
+
+def test_small_files_are_cached_and_revalidated(static):
+    entry = static.get('/static/app.js')
+    assert entry.body == b'console.log(1);'
+    assert static.get('/static/app.js') is entry
+    with open(entry.path, 'ab') as f:
+        f.write(b'//')
+    assert static.get('/static/app.js').body == b'console.log(1);//'
+
+
+def test_large_files_are_not_kept_in_memory(static):
+    entry = static.get('/static/big.bin')
+    assert entry.body is None and entry.size == 64
+    assert static.stats()['entries'] == 0
@@ -0,0 +1,40 @@
+# tests/test_user_search.py
+import pytest
+
+import user_search
+from config import USER_SEARCH_CONFIG
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, sql, params=()):
+        self.executed.append((sql, params))
+
+    def fetchall(self):
+        return []
+
+
+def test_default_mode_matches_substrings():
+    assert USER_SEARCH_CONFIG['mode'] == 'contains'
+    cursor = RecordingCursor()
+    user_search.search_users(cursor, 'ane')
+    sql, params = cursor.executed[0]
+    assert 'username LIKE %s' in sql
+    assert params[:3] == ('%ane%',) * 3
+
+
+@pytest.mark.parametrize('mode, term, pattern', [
+    ('contains', '50%_x', '%50\\%\\_x%'),
+    ('prefix', 'ane', 'ane%'),
+    ('fulltext', 'an', 'an%'),  # mots trop courts: repli sur le préfixe
+])
+def test_like_patterns(mode, term, pattern):
+    clause, params = user_search._search_clause(term, mode)
+    assert params == (pattern,) * 3
+
+
+def test_fulltext_clause():
+    clause, params = user_search._search_clause('martin dupont', 'fulltext')
+    assert clause.startswith('MATCH(') and params == ('+martin* +dupont*',)
@@ -0,0 +1,24 @@
+# tests/test_worker_pool.py
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from worker_pool import LazyPool
+
+
+def test_pool_is_created_once_and_shared():
+    pool = LazyPool(2, processes=False, name='test')
+    with pool.executor() as first, pool.executor() as second:
+        assert first is second
+        assert list(first.map(abs, [-1, -2])) == [1, 2]
+
+
+def test_broken_process_pool_is_replaced():
+    pool = LazyPool(1)
+    with pytest.raises(BrokenProcessPool):
+        with pool.executor() as executor:
+            list(executor.map(os._exit, [1]))
+    with pool.executor() as replacement:
+        assert replacement is not executor
+        assert list(replacement.map(abs, [-3])) == [3]
@@ -0,0 +1,65 @@
+# token_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenCache:
+    """Cache LRU borné des jetons JWT déjà vérifiés
+
+    Les jetons sont indexés par leur empreinte SHA-256 (le jeton lui-même
+    n'est pas conservé). Une entrée n'est jamais servie au-delà de son `exp`:
+    elle est alors retirée et le jeton repasse par la vérification complète.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # empreinte -> (payload, exp)
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'expirations': 0, 'evictions': 0}
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token):
+        """Payload d'un jeton vérifié et non expiré, sinon None"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            payload, exp = entry
+            if exp <= time.time():
+                del self._entries[key]
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return payload
+
+    def put(self, token, payload):
+        """Mémorise le payload d'un jeton dont la signature vient d'être vérifiée"""
+        exp = payload.get('exp')
+        if not exp or self.max_entries <= 0:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (payload, exp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hit_rate': round(self._counters['hits'] / lookups, 4) if lookups else None,
+                **self._counters
+            }
@@ -0,0 +1,138 @@
+# user_search.py
+import bisect
+import re
+import threading
+from array import array
+import data_versions
+from config import USER_SEARCH_CONFIG
+from pagination import ListQuery
+
+# Liste de /api/users; le statut n'est calculé que pour les lignes de la page
+USERS = ListQuery({
+    'id': 'id',
+    'username': 'username',
+    'role': 'role',
+    'nom': 'nom',
+    'prenom': 'prenom',
+    'email': 'email',
+    'class_id': 'class_id',
+    'status': "CASE WHEN last_login > DATE_SUB(NOW(), INTERVAL 6 MONTH) THEN 'Actif' ELSE 'Inactif' END"
+}, 'users')
+
+# Longueur minimale d'un mot indexé par FULLTEXT (innodb_ft_min_token_size)
+_FT_MIN_TOKEN = 3
+
+def _escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def _search_clause(term, mode):
+    """Condition SQL et paramètres d'une recherche 'contains', 'prefix' ou 'fulltext'"""
+    if mode == 'fulltext':
+        words = [w for w in re.split(r'[\s+\-<>()~*"@]+', term) if w]
+        if words and all(len(w) >= _FT_MIN_TOKEN for w in words):
+            query = ' '.join(f"+{w}*" for w in words)
+            return "MATCH(username, nom, prenom) AGAINST (%s IN BOOLEAN MODE)", (query,)
+        # Mots trop courts pour l'index FULLTEXT: recherche par préfixe
+        mode = 'prefix'
+    pattern = _escape_like(term) + '%'
+    if mode == 'contains':
+        pattern = '%' + pattern
+    return "(username LIKE %s OR nom LIKE %s OR prenom LIKE %s)", (pattern, pattern, pattern)
+
+class TrigramIndex:
+    """Index en mémoire des trigrammes de username/nom/prenom
+
+    Chargé au premier appel puis complété à chaque nouvelle version 'users'
+    des données, en ne lisant que les identifiants supérieurs au dernier
+    indexé. Les listes de postings sont triées par identifiant: la plus
+    courte sert de candidats, vérifiés ensuite par recherche de sous-chaîne.
+    """
+
+    def __init__(self):
+        self._texts = {}           # id -> "username\0nom\0prenom" en minuscules
+        self._ids = array('l')     # identifiants indexés, croissants
+        self._postings = {}        # trigramme -> array('l') d'identifiants croissants
+        self._max_id = 0
+        self._version = None
+        self._lock = threading.Lock()
+
+    def refresh(self, cursor):
+        """Indexe les utilisateurs insérés depuis le dernier appel"""
+        current = data_versions.version('users')
+        with self._lock:
+            if current == self._version:
+                return
+            cursor.execute(
+                "SELECT id, username, nom, prenom FROM users WHERE id > %s ORDER BY id",
+                (self._max_id,)
+            )
+            for row in cursor.fetchall():
+                self._add(row['id'], row['username'], row['nom'], row['prenom'])
+            self._version = current
+
+    def _add(self, user_id, *fields):
+        text = '\0'.join((f or '').lower() for f in fields)
+        self._texts[user_id] = text
+        self._ids.append(user_id)
+        self._max_id = user_id
+        for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            if '\0' not in gram:
+                self._postings.setdefault(gram, array('l')).append(user_id)
+
+    def search(self, term, after=0, limit=50):
+        """Identifiants (> after, croissants) dont un champ contient `term`"""
+        term = term.lower()
+        with self._lock:
+            candidates = self._ids
+            if len(term) >= 3:
+                grams = {term[i:i + 3] for i in range(len(term) - 2)}
+                postings = [self._postings.get(g) for g in grams]
+                if not all(postings):
+                    return []
+                candidates = min(postings, key=len)
+            found = []
+            for i in range(bisect.bisect_right(candidates, after), len(candidates)):
+                user_id = candidates[i]
+                if term in self._texts[user_id]:
+                    found.append(user_id)
+                    if len(found) >= limit:
+                        break
+            return found
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'users': len(self._ids), 'trigrams': len(self._postings)}
+
+trigram_index = TrigramIndex()
+
+def search_users(cursor, term='', after=0, limit=50, fields=None, mode=None):
+    """Page d'utilisateurs triés par id, après `after`, filtrés par `term`
+
+    Retourne (lignes, curseur suivant ou None).
+    """
+    mode = mode or USER_SEARCH_CONFIG['mode']
+    if not term:
+        return USERS.fetch_page(cursor, fields=fields, after=after, limit=limit)
+    if mode == 'trigram':
+        trigram_index.refresh(cursor)
+        ids = trigram_index.search(term, after, limit)
+        if not ids:
+            return [], None
+        rows, _ = USERS.fetch_page(cursor, fields=fields, after=after, limit=limit,
+                                   condition=f"id IN ({','.join(['%s'] * len(ids))})",
+                                   condition_params=ids)
+        return rows, (ids[-1] if len(ids) == limit else None)
+    clause, params = _search_clause(term, mode)
+    return USERS.fetch_page(cursor, fields=fields, after=after, limit=limit,
+                            condition=clause, condition_params=params)
+
+def iter_users(cursor, term='', after=0, fields=None, mode=None):
+    """Tous les utilisateurs après `after` filtrés par `term`, lus par lots"""
+    mode = mode or USER_SEARCH_CONFIG['mode']
+    if not term:
+        return USERS.iter_rows(cursor, fields=fields, after=after)
+    # L'index trigramme renvoie des identifiants par page: pour un export
+    # complet, la même recherche par sous-chaîne est faite en SQL
+    clause, params = _search_clause(term, 'contains' if mode == 'trigram' else mode)
+    return USERS.iter_rows(cursor, fields=fields, after=after,
+                           condition=clause, condition_params=params)
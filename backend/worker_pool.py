@@ -0,0 +1,52 @@
+# worker_pool.py
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+
+class LazyPool:
+    """Pool d'exécution partagé, créé à la première utilisation
+
+    En mode processus, les workers sont lancés en 'spawn': le serveur est
+    multi-thread et un fork pourrait hériter de verrous tenus par d'autres
+    threads. Un pool dont un processus a disparu (ex. OOM) est écarté et
+    recréé à l'utilisation suivante.
+    """
+
+    def __init__(self, max_workers, processes=True, name='pool'):
+        self.max_workers = max_workers
+        self.processes = processes
+        self.name = name
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def executor(self):
+        """Fournit l'executor partagé; le réinitialise si BrokenProcessPool en sort"""
+        executor = self._get()
+        try:
+            yield executor
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise
+
+    def _get(self):
+        with self._lock:
+            if self._executor is None:
+                if self.processes:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix=self.name)
+            return self._executor
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)